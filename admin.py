@@ -0,0 +1,595 @@
+import os
+import time
+
+from flask import Blueprint, current_app, jsonify, redirect, render_template, request, send_from_directory, session, stream_with_context
+from werkzeug.utils import secure_filename
+
+import app_logging
+import db_routing
+import events
+import fast_json
+import profiler
+import query_stats
+import rollups
+import sessions
+import versions
+from helpers import allowed_file, cached_user_statistics, init_db, invalidate_user_statistics, save_password_upgrade
+from models import db, School, Admin, User
+
+# Admin dashboard, school management, statistics/profiling and maintenance routes
+
+bp = Blueprint('admin', __name__)
+log = app_logging.get_logger('admin')
+
+
+# ---------------------
+# Admin Pages
+# ---------------------
+@bp.route('/admin-login')
+def admin_login_page():
+    """Dedicated admin login page"""
+    return render_template('admin-login.html')
+
+@bp.route('/admin-dashboard')
+def admin_dashboard():
+    schools = School.query.all()  
+    return render_template('admin-dashboard.html', schools=schools)
+
+@bp.route('/admin/feedback')
+def admin_feedback_page():
+    """Render the admin feedback management page"""
+    return render_template('admin-feedback.html')
+
+
+# ---------------------
+# Admin Session
+# ---------------------
+@bp.route('/api/admin/login', methods=['POST'])
+def admin_login():
+    data = request.json or {}
+    username = data.get('username')
+    password = data.get('password')
+    admin = Admin.query.filter_by(username=username).first()
+    if admin and admin.check_password(password):
+        save_password_upgrade(admin)
+        sessions.regenerate()
+        session['admin_logged_in'] = True
+        session['admin_username'] = username
+        return jsonify({"message": "Login successful"}), 200
+    return jsonify({"error": "Invalid credentials"}), 401
+
+@bp.route('/api/admin/logout', methods=['POST'])
+def admin_logout():
+    session.clear()
+    return jsonify({"message": "Logged out"}), 200
+
+@bp.route('/api/session', methods=['GET'])
+def check_session():
+    return jsonify({"admin_logged_in": bool(session.get('admin_logged_in')), "username": session.get('admin_username')}), 200
+
+
+# ---------------------
+# School Management
+# ---------------------
+# School CRUD operations
+@bp.route('/api/schools', methods=['POST'])
+def add_school():
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    data = request.json or {}
+    s = School(
+        name=data.get('name', ''),
+        region=data.get('region', ''),
+        level=data.get('level'),
+        contact=data.get('contact'),
+        description=data.get('description'),
+        accessibility=data.get('accessibility'),
+        fee_structure=data.get('fee_structure'),
+        image_url=data.get('image_url')
+    )
+    db.session.add(s)
+    db.session.commit()
+    return jsonify(s.to_dict()), 201
+
+@bp.route('/api/schools/<int:id>', methods=['PUT'])
+def update_school(id):
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    s = School.query.get_or_404(id)
+    data = request.json or {}
+    s.name = data.get('name', s.name)
+    s.region = data.get('region', s.region)
+    s.level = data.get('level', s.level)
+    s.contact = data.get('contact', s.contact)
+    s.description = data.get('description', s.description)
+    s.accessibility = data.get('accessibility', s.accessibility)
+    s.fee_structure = data.get('fee_structure', s.fee_structure)
+    s.image_url = data.get('image_url', s.image_url)
+    db.session.commit()
+    return jsonify(s.to_dict()), 200
+
+@bp.route('/api/schools/<int:id>', methods=['DELETE'])
+def delete_school(id):
+    try:
+        school = db.session.query(School.id, School.name, School.image_url).filter_by(id=id).first()
+        if not school:
+            log.info("delete school: not found", extra={'school_id': id})
+            return jsonify({"error": "School not found"}), 404
+            
+        deleted = delete_school_cascade(id, current_app.config['SCHOOL_DELETE_CHUNK'])
+        
+        # Only once the rows are gone: end principal sessions, drop caches, remove the image
+        for principal_id in deleted['principal_ids']:
+            sessions.revoke_owner(current_app, f"principal:{principal_id}")
+        invalidate_user_statistics()
+        if school.image_url and school.image_url != "/static/images/default-school.jpg":
+            try:
+                image_path = school.image_url.replace('/static/', 'static/')
+                if os.path.exists(image_path):
+                    os.remove(image_path)
+                    log.debug("school image deleted", extra={'image_path': image_path})
+            except Exception:
+                log.warning("could not delete school image", extra={'image_url': school.image_url}, exc_info=True)
+        
+        log.info("school deleted", extra={
+            'school_id': id, 'school_name': school.name, 'feedback': deleted['feedback'],
+            'meetings': deleted['meetings'], 'principals': len(deleted['principal_ids']),
+        })
+        return jsonify({"message": "School and all associated data deleted"}), 200
+        
+    except Exception as e:
+        log.exception("delete school failed", extra={'school_id': id})
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+def delete_school_cascade(school_id, chunk_size=0):
+    """Delete a school and everything referencing it with set-based DELETEs
+    
+    Feedback and meetings go first, chunk_size rows per transaction (0 = one
+    transaction for everything) so other writers get the lock in between.
+    Principals, rollup rows and the school itself go in the final transaction.
+    Core statements skip the ORM after_flush hooks, so the data versions are
+    bumped and the school's daily_stats rows are dropped here explicitly.
+    Safe to re-run after a failure part-way through.
+    """
+    params = {'school_id': school_id, 'limit': chunk_size}
+    deleted = {'feedback': 0, 'meetings': 0}
+    
+    for table, key in (('feedback', 'feedback'), ('meeting_booking', 'meetings')):
+        if not chunk_size:
+            deleted[key] = db.session.execute(
+                db.text(f"DELETE FROM {table} WHERE school_id = :school_id"), params
+            ).rowcount
+            continue
+        while True:
+            count = db.session.execute(db.text(
+                f"DELETE FROM {table} WHERE id IN "
+                f"(SELECT id FROM {table} WHERE school_id = :school_id LIMIT :limit)"
+            ), params).rowcount
+            versions.bump(db.session)
+            versions.bump_school(db.session, school_id)
+            db.session.commit()
+            deleted[key] += count
+            if count < chunk_size:
+                break
+    
+    deleted['principal_ids'] = [row[0] for row in db.session.execute(
+        db.text("SELECT id FROM principal WHERE school_id = :school_id"), params
+    )]
+    db.session.execute(db.text("DELETE FROM principal WHERE school_id = :school_id"), params)
+    rollups.forget_school(db.session, school_id)
+    db.session.execute(db.text("DELETE FROM school WHERE id = :school_id"), params)
+    versions.bump(db.session)
+    versions.bump_school(db.session, school_id)
+    db.session.commit()
+    # Anything the session loaded for this school is gone now
+    db.session.expire_all()
+    return deleted
+
+#IMAGES MANAGEMENT
+@bp.route('/upload-school-image', methods=['POST'])
+def upload_school_image():
+    if 'school_image' not in request.files:
+        return jsonify({'error': 'No file selected'}), 400
+    
+    file = request.files['school_image']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    
+    if file and allowed_file(file.filename):
+        # Generate unique filename
+        filename = secure_filename(file.filename)
+        unique_filename = f"{int(time.time())}_{filename}"
+        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
+        
+        # Save file
+        file.save(file_path)
+        
+        # Return the relative URL for the image
+        image_url = f"/static/images/schools/{unique_filename}"
+        return jsonify({'image_url': image_url})
+    
+    return jsonify({'error': 'Invalid file type'}), 400
+
+# DELETE IMAGE FUNCTIONALITY
+@bp.route('/delete-school-image/<int:school_id>', methods=['DELETE'])
+def delete_school_image(school_id):
+    try:
+        school = School.query.get_or_404(school_id)
+        
+        if school.image_url:
+            # Delete the physical file
+            image_path = school.image_url.replace('/static/', 'static/')
+            if os.path.exists(image_path):
+                os.remove(image_path)
+            
+            # Update the database
+            school.image_url = None
+            db.session.commit()
+            
+        return jsonify({'success': True})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+#ROUTE FOR ADDING SCHOOLS ON THE ADMIN DASHBOARD
+@bp.route('/add-school', methods=['POST'])
+def submit_school_form():
+    # Get form data
+    name = request.form.get('name')
+    region = request.form.get('region') 
+    level = request.form.get('level')
+    description = request.form.get('description')
+    contact = request.form.get('contact')
+    accessibility = request.form.get('accessibility')
+    fee_structure = request.form.get('fee_structure')
+    
+
+    # Handle file upload - BACKEND SOLUTION (like principal dashboard)
+    image_url = "/static/images/default-school.jpg"  # default
+    
+    if 'school_image' in request.files:
+        file = request.files['school_image']
+        if file and file.filename != '' and allowed_file(file.filename):
+            # Generate unique filename
+            filename = secure_filename(file.filename)
+            unique_filename = f"school_{int(time.time())}_{filename}"
+            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
+            
+            # Save file to folder
+            file.save(file_path)
+            image_url = f"/static/images/schools/{unique_filename}"
+            log.debug("school image saved", extra={'image_url': image_url})
+
+    # Validate required fields
+    if not name or not region:
+        log.info("add school: missing required fields")
+        return redirect('/admin-dashboard')
+
+    try:
+        # Create and save new school
+        new_school = School(
+            name=name,
+            region=region,
+            level=level,
+            description=description,
+            contact=contact,
+            accessibility=accessibility,
+            fee_structure=fee_structure,
+            image_url=image_url
+        )
+
+        db.session.add(new_school)
+        db.session.commit()
+        log.info("school created", extra={'school_id': new_school.id, 'school_name': new_school.name})
+
+    except Exception:
+        log.exception("add school failed")
+        db.session.rollback()
+        return redirect('/admin-dashboard')
+
+    return redirect('/admin-dashboard')
+
+#ROUTE FOR EDITING SCHOOLS ON THE ADMIN DASHBOARD
+@bp.route('/admin/edit/<int:id>', methods=['POST'])
+def update_school_form(id):
+    school = School.query.get_or_404(id)
+    
+    # Update fields from form inputs
+    school.name = request.form.get('name', school.name)
+    school.region = request.form.get('region', school.region)
+    school.level = request.form.get('level', school.level)
+    school.description = request.form.get('description', school.description)
+    school.contact = request.form.get('contact', school.contact)
+    school.accessibility = request.form.get('accessibility', school.accessibility)
+    school.fee_structure = request.form.get('fee_structure', school.fee_structure)
+
+    # Handle image upload for edit
+    if 'school_image' in request.files:
+        file = request.files['school_image']
+        if file and file.filename != '' and allowed_file(file.filename):
+            # Delete old image if it exists and isn't default
+            if school.image_url and school.image_url != "/static/images/default-school.jpg":
+                try:
+                    old_image_path = school.image_url.replace('/static/', 'static/')
+                    if os.path.exists(old_image_path):
+                        os.remove(old_image_path)
+                        log.debug("old school image deleted", extra={'image_path': old_image_path})
+                except Exception:
+                    log.warning("could not delete old school image", extra={'image_url': school.image_url},
+                                exc_info=True)
+            
+            # Save new image
+            filename = secure_filename(file.filename)
+            unique_filename = f"school_{id}_{int(time.time())}_{filename}"
+            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
+            
+            file.save(file_path)
+            school.image_url = f"/static/images/schools/{unique_filename}"
+            log.debug("school image saved", extra={'image_url': school.image_url})
+    
+    try:
+        db.session.commit()
+        log.info("school updated", extra={'school_id': id, 'school_name': school.name})
+    except Exception:
+        log.exception("update school failed", extra={'school_id': id})
+        db.session.rollback()
+    
+    return redirect('/admin-dashboard')
+
+
+# ---------------------
+# Statistics and Profiling
+# ---------------------
+#ROUTE FOR GETTING REAL USER STATISTICS FOR ADMIN DASHBOARD
+@bp.route('/api/admin/user-statistics')
+@db_routing.read_only_view
+def get_user_statistics():
+    try:
+        return jsonify(cached_user_statistics())
+        
+    except Exception:
+        log.exception("user statistics failed")
+        return jsonify({"error": "User statistics are unavailable"}), 500
+
+@bp.route('/api/admin/events')
+def admin_events():
+    """Server-sent "version" events for the dashboard (see events)"""
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    stream = events.VersionStream(current_app.config)
+    
+    def generate():
+        yield stream.opening()
+        while not stream.expired:
+            with db_routing.read_only():
+                version = versions.current_version()
+            db.session.close()  # don't keep a pooled connection between checks
+            chunk = stream.chunk(version)
+            if chunk:
+                yield chunk
+            time.sleep(stream.interval)
+    
+    return current_app.response_class(stream_with_context(generate()), mimetype=events.MIMETYPE,
+                                      headers=events.HEADERS)
+
+@bp.route('/api/admin/user-statistics-test')
+def test_user_stats():
+    """Simple test endpoint to verify User model works"""
+    try:
+        # Test basic User query
+        user_count = User.query.count()
+        first_user = User.query.first()
+        
+        return jsonify({
+            'success': True,
+            'user_count': user_count,
+            'first_user_name': first_user.name if first_user else 'No users',
+            'message': 'User model is working correctly'
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'User model query failed'
+        }), 500
+
+@bp.route('/api/admin/profiler', methods=['GET', 'POST', 'DELETE'])
+def profiler_switch():
+    """GET: status and recent profiles; POST {endpoint, rate, minutes}: switch on; DELETE: switch off"""
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    if request.method == 'POST':
+        data = request.json or {}
+        endpoint = data.get('endpoint')
+        if endpoint != '*' and endpoint not in current_app.view_functions:
+            return jsonify({"error": "Unknown endpoint (use a view function name or '*')"}), 400
+        try:
+            profiler.enable(endpoint, data.get('rate', 1.0), data.get('minutes', 10))
+        except (TypeError, ValueError):
+            return jsonify({"error": "rate and minutes must be numbers"}), 400
+    elif request.method == 'DELETE':
+        profiler.disable()
+    
+    return jsonify({
+        "switch": profiler.settings(),
+        "header": profiler.HEADER,
+        "profiles": profiler.recent_files()
+    }), 200
+
+@bp.route('/api/admin/profiler/token')
+def profiler_token():
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify({
+        "header": profiler.HEADER,
+        "token": profiler.token(),
+        "max_age": current_app.config['PROFILE_TOKEN_MAX_AGE']
+    }), 200
+
+@bp.route('/api/admin/profiler/profiles/<path:name>')
+def download_profile(name):
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    return send_from_directory(current_app.config['PROFILE_DIR'], name, as_attachment=True)
+
+@bp.route('/api/admin/sql-stats')
+def get_sql_stats():
+    """Recent requests' query counts, DB time, slowest and repeated statements (this process only)"""
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    limit = request.args.get('limit', type=int)
+    entries = query_stats.recent(limit)
+    if request.args.get('repeated') == '1':
+        entries = [entry for entry in entries if entry['repeated']]
+    return jsonify({
+        "pid": os.getpid(),
+        "buffer_size": current_app.config['SQL_STATS_BUFFER'],
+        "requests": entries
+    }), 200
+
+
+# ---------------------
+# Maintenance and Debug
+# ---------------------
+#ROUTE FOR CONFIRMING  PRINCIPAL MODEL EXISTS
+@bp.route('/update-db', methods=['GET'])
+def update_db():
+    """Route to update database with new models"""
+    try:
+        db.create_all()  # This will create any new tables
+        return jsonify({"message": "Database updated successfully with Principal model"}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Dev helper: init-db route 
+@bp.route('/init-db', methods=['GET'])
+def init_db_route():
+    init_db(seed=False)  # Changed to False
+    return jsonify({"message": "Database initialized (NO sample data). Default admin: admin/admin123"}), 200
+
+#EMERGENCY RESET.
+@bp.route('/emergency-db-reset', methods=['GET'])
+def emergency_db_reset():
+    """EMERGENCY: Reset database with fixed models"""
+    try:
+        log.warning("emergency database reset")
+        
+        # Drop all tables
+        db.drop_all()
+        
+        # Recreate with fixed models
+        db.create_all()
+        
+        # Recreate admin user
+        admin = Admin(username='admin')
+        admin.set_password('admin123')
+        db.session.add(admin)
+        db.session.commit()
+        
+        log.warning("emergency database reset complete")
+        return jsonify({"message": "Database reset successfully. Principal registration should work now."}), 200
+        
+    except Exception as e:
+        log.exception("emergency database reset failed")
+        return jsonify({"error": str(e)}), 500
+
+# 📊 ROUTE TO CHECK ALL DATABASE TABLES
+@bp.route('/debug-db')
+def debug_database():
+    """Check all tables in database with counts"""
+    try:
+        from models import School, Principal, Feedback, MeetingBooking, Admin, User
+        
+        tables_data = {
+            "schools": School.query.count(),
+            "principals": Principal.query.count(),
+            "feedbacks": Feedback.query.count(),
+            "meetings": MeetingBooking.query.count(),
+            "admins": Admin.query.count(),
+            "users": User.query.count()
+        }
+        
+        return jsonify({
+            "database_status": "✅ Connected",
+            "table_counts": tables_data,
+            "total_records": sum(tables_data.values())
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "database_status": "❌ Error",
+            "error": str(e)
+        }), 500
+
+#ROUTE TO SEE ALL USERS IN THE DATABASE    
+@bp.route('/debug-users')
+def debug_users():
+    """Debug route to check all users in database"""
+    try:
+        users_data = fast_json.records(db.select(
+            User.id, User.name, User.email, User.phone, User.created_at, User.is_active
+        ))
+        
+        return fast_json.response({
+            "total_users": len(users_data),
+            "users": users_data
+        })
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# ADD THIS DEBUG ROUTE TO CHECK SCHOOLS
+@bp.route('/debug-schools')
+def debug_schools():
+    """Debug route to check all schools in database"""
+    try:
+        schools_data = fast_json.records(db.select(
+            School.id, School.name, School.region, School.level, School.contact, School.image_url,
+            db.literal('N/A').label('created_at')  # schools have no created_at column
+        ))
+        return fast_json.response({
+            "total_schools": len(schools_data),
+            "schools": schools_data
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/debug-add-school', methods=['POST'])
+def debug_add_school():
+    """Debug version of add school to see the exact error"""
+    try:
+        # Get form data
+        name = request.form.get('name')
+        region = request.form.get('region')
+        level = request.form.get('level')
+        
+        # Basic validation
+        if not name or not region:
+            return jsonify({"error": "Name and region are required"}), 400
+        
+        # Create school with minimal fields
+        new_school = School(
+            name=name,
+            region=region,
+            level=level,
+            description=request.form.get('description', ''),
+            contact=request.form.get('contact', ''),
+            accessibility=request.form.get('accessibility', ''),
+            fee_structure=request.form.get('fee_structure', ''),
+            image_url="/static/images/default-school.jpg"  # Default image for now
+        )
+        
+        db.session.add(new_school)
+        db.session.commit()
+        
+        log.info("school created", extra={'school_id': new_school.id, 'school_name': new_school.name})
+        return jsonify({"success": True, "school_id": new_school.id}), 200
+        
+    except Exception as e:
+        log.exception("debug add school failed")
+        return jsonify({"error": str(e)}), 500
@@ -1,1985 +1,179 @@
+import gc
 import os
-import sqlite3
-import time
-import traceback
-from datetime import datetime, timedelta
-from datetime import datetime
-from flask import Flask, jsonify, request, render_template, redirect, url_for, session, send_from_directory
-from flask_sqlalchemy import SQLAlchemy
+
+from flask import Flask
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
-from models import db, School, Principal, Feedback, MeetingBooking, Admin, User
 
-# Add these imports to app.py (after the existing imports)
-import pandas as pd
-from io import BytesIO
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
-import numpy as np
-from datetime import datetime, timedelta
-import calendar
+import app_logging
+import compression
+import db_routing
+import fast_json
+import metrics
+import passwords
+import profiler
+import query_stats
+import rollups
+import school_cache
+import sessions
+import sqlite_profile
+import versions
+from helpers import ensure_columns, ensure_indexes, init_db
+from models import db, School
+
+import admin
+import feedback
+import meetings
+import principal
+import public
+import reports
 
 # ---------------------
-# App Configuration
+# App Factory
 # ---------------------
+# create_app() builds a configured app and importing this module has no side
+# effects, so gunicorn's master can build the app once (preload_app) and fork
+# workers that share its memory - see wsgi.py and gunicorn.conf.py. The report
+# subsystem is set up on the first reports request (see reports.setup).
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
-app = Flask(__name__, template_folder='templates', static_folder='static')
-app.config['SECRET_KEY'] = 'change_this_secret_for_production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(BASE_DIR, 'eduquest.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = 'static/images/schools'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
-app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif'}
-
-# Make sure upload directory exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
-db.init_app(app)
-CORS(app)
-
-# ---------------------
-# Helper Functions
-# ---------------------
-
-
-
-def allowed_file(filename):
-    """Check if file extension is allowed"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+BLUEPRINTS = (public.bp, admin.bp, principal.bp, feedback.bp, meetings.bp, reports.bp)
+
+
+def create_app(config=None):
+    """Build the app; `config` overrides any of the settings below"""
+    config = dict(config or {})
+    # Database, sessions, report cache, metrics and profiles (benchmarks point this at a scratch dir)
+    data_dir = config.get('DATA_DIR') or os.environ.get('EDUQUEST_DATA_DIR', BASE_DIR)
+
+    app = Flask(__name__, template_folder='templates', static_folder='static')
+    app.config['DATA_DIR'] = data_dir
+    app.config['SECRET_KEY'] = 'change_this_secret_for_production'
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(data_dir, 'eduquest.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['UPLOAD_FOLDER'] = 'static/images/schools'
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+    app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif'}
+
+    # SQLite connection pragmas (see sqlite_profile.PROFILES); SQLITE_PRAGMAS overrides single values
+    app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'production')
+    app.config['SQLITE_PRAGMAS'] = {}
+    # Read-only routes query a second, mode=ro engine over the same file (see db_routing)
+    app.config['DB_READ_ENGINE'] = True
+    app.config['DB_READ_POOL_SIZE'] = 10
+    # JSON logs on stdout through a background queue listener (see app_logging)
+    app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO')
+    app.config['LOG_DEBUG_SAMPLE_RATE'] = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 0.1))  # share of DEBUG records kept
+    # Sampling profiler for live requests, switched on from /api/admin/profiler (see profiler)
+    app.config['PROFILE_DIR'] = os.path.join(data_dir, 'profiles')
+    app.config['PROFILE_INTERVAL'] = 0.005  # seconds between stack samples
+    app.config['PROFILE_MAX_FILES'] = 100
+    app.config['PROFILE_TOKEN_MAX_AGE'] = 3600  # seconds an X-Profile header token stays valid
+    # Per-request query counts/timings (see query_stats); headers are always on in debug mode
+    app.config['SQL_STATS'] = True
+    app.config['SQL_STATS_HEADERS'] = os.environ.get('SQL_STATS_HEADERS') == '1'
+    app.config['SQL_STATS_BUFFER'] = 200  # recent requests kept for /api/admin/sql-stats
+    app.config['SQL_STATS_REPEAT_THRESHOLD'] = 5  # same statement shape this many times = possible N+1
+    # Prometheus metrics at /metrics, summed over all worker processes' snapshot files (see metrics)
+    app.config['METRICS_ENABLED'] = True
+    app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR', os.path.join(data_dir, 'metrics_data'))
+    app.config['METRICS_FLUSH_INTERVAL'] = 1.0  # seconds between a worker's snapshot writes
+    # List endpoints encode Core row tuples with orjson when installed (see fast_json): auto, orjson or stdlib
+    app.config['JSON_ENCODER'] = os.environ.get('JSON_ENCODER', 'auto')
+    # brotli (if installed) / gzip for HTML, JSON, CSS and JS; compressed bodies are cached by ETag (see compression)
+    app.config['COMPRESS_ENABLED'] = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    app.config['COMPRESS_MIN_SIZE'] = 500  # bytes; smaller bodies aren't worth the CPU
+    app.config['COMPRESS_LEVEL'] = 6  # gzip 1-9
+    app.config['COMPRESS_BR_LEVEL'] = 5  # brotli 0-11
+    app.config['COMPRESS_CACHE_MAX_BYTES'] = 32 * 1024 * 1024  # per process
+
+    # Password hashing: algorithm/cost (see passwords.COST_PRESETS) and executor size
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+
+    # Server-side sessions: "sqlite" (shared by all workers), "memory" (single process) or "cookie"
+    app.config['SESSION_BACKEND'] = os.environ.get('SESSION_BACKEND', 'sqlite')
+    app.config['SESSION_SQLITE_PATH'] = os.path.join(data_dir, 'sessions.db')
+    app.config['SESSION_IDENTITY_TTL'] = 300  # seconds a cached principal/user identity is trusted
+    app.config['SCHOOL_DELETE_CHUNK'] = 5000  # feedback/meeting rows deleted per transaction (0 = all at once)
+    app.config['USER_STATS_TTL'] = 30  # seconds the admin dashboard's user statistics are cached per process
+    # /school/<id> pages and feedback lists cached per school version (see school_cache)
+    app.config['SCHOOL_CACHE_ENABLED'] = os.environ.get('SCHOOL_CACHE_ENABLED', '1') == '1'
+    app.config['SCHOOL_CACHE_MAX_BYTES'] = 16 * 1024 * 1024  # per process
+    app.config['SCHOOL_CACHE_VERSION_TTL'] = 60  # seconds until writes made outside the ORM show up
+    # /api/admin/events server-sent events (see events)
+    app.config['EVENTS_INTERVAL'] = 2.0  # seconds between data version checks
+    app.config['EVENTS_HEARTBEAT'] = 15  # seconds between keepalive comments
+    app.config['EVENTS_MAX_SECONDS'] = 300  # then the stream ends and EventSource reconnects
+    # ASGI mode (asgi.py): async handlers for the I/O-bound routes, the rest on a thread pool
+    app.config['ASGI_WSGI_THREADS'] = int(os.environ.get('ASGI_WSGI_THREADS', 16))  # threads running the Flask routes
+    app.config['ASGI_DB_POOL_SIZE'] = 8  # read-only SQLite connections shared by the async handlers
+    app.config['ASGI_CPU_WORKERS'] = 2  # threads encoding/compressing their JSON
+    app.config['ASGI_DOWNLOAD_CHUNK'] = 256 * 1024  # bytes read per step of a report download
+
+    # Report jobs: PDFs are built in a process pool and cached on disk
+    app.config['REPORT_CACHE_DIR'] = os.path.join(data_dir, 'report_cache')
+    app.config['REPORT_WORKERS'] = int(os.environ.get('REPORT_WORKERS', 2))
+    app.config['REPORT_CACHE_MAX_FILES'] = 50
+    app.config['REPORT_CHART_WORKERS'] = int(os.environ.get('REPORT_CHART_WORKERS', 2))
+    app.config['REPORT_CHART_BACKEND'] = os.environ.get('REPORT_CHART_BACKEND', 'reportlab')  # or matplotlib
+    app.config['REPORT_SPOOL_MAX_BYTES'] = 8 * 1024 * 1024  # in-memory PDFs spill to a temp file past this
+    app.config.update(config)
+
+    # Make sure upload directory exists
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+    app_logging.init_app(app)
+    db.init_app(app)
+    sqlite_profile.init_app(app)
+    db_routing.init_app(app)
+    query_stats.init_app(app)
+    metrics.init_app(app)
+    profiler.init_app(app)
+    fast_json.init_app(app)
+    compression.init_app(app)  # after metrics: compression time counts towards request latency
+    passwords.init_app(app)
+    sessions.init_app(app)
+    versions.init_app(app)
+    school_cache.init_app(app)
+    rollups.init_app(app)
+    CORS(app)
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
 
-# Database Initialization
-def init_db(seed=False):
     with app.app_context():
-        db.create_all()
-
-    # Create default admin only
-    if not Admin.query.filter_by(username='admin').first():
-        admin = Admin(username='admin')
-        admin.set_password('admin123')
-        db.session.add(admin)
-        db.session.commit()
-        print("✅ Default admin created: admin/admin123")
-    
-    print("✅ Database initialized with clean tables")
-    
-# THIS IS TO FORCE DATABASE OPERATIONS
-def force_db_commit():
-    try:
-        db.session.commit()
-        print("✅ DATABASE COMMITTED!")
-        return True
-    except Exception as e:
-        print(f"❌ COMMIT FAILED: {e}")
-        db.session.rollback()
-        return False
-    
-
-# PDF REPORT GENERATION FUNCTIONS
-def collect_report_data(date_range='all'):
-    """Collect comprehensive system data for report"""
-    from datetime import datetime, timedelta
-    
-    # Calculate date filter
-    if date_range == 'week':
-        start_date = datetime.now() - timedelta(days=7)
-    elif date_range == 'month':
-        start_date = datetime.now() - timedelta(days=30)
-    elif date_range == 'quarter':
-        start_date = datetime.now() - timedelta(days=90)
-    else:
-        start_date = None
-    
-    # Get all data from database
-    report = {
-        'report_id': f"EQ-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
-        'generated_at': datetime.now(),
-        'date_range': date_range,
-        
-        # User statistics
-        'users': {
-            'total': User.query.count(),
-            'active_today': User.query.filter(
-                db.func.date(User.created_at) == datetime.now().date()
-            ).count(),
-            'new_this_week': User.query.filter(
-                User.created_at >= (datetime.now() - timedelta(days=7))
-            ).count(),
-            'new_this_month': User.query.filter(
-                User.created_at >= (datetime.now() - timedelta(days=30))
-            ).count(),
-            'list': User.query.order_by(User.created_at.desc()).limit(100).all()
-        },
-        
-        # School statistics
-        'schools': {
-            'total': School.query.count(),
-            'by_region': {},
-            'by_level': {},
-            'list': School.query.all()
-        },
-        
-        # Principal statistics
-        'principals': {
-            'total': Principal.query.count(),
-            'active': Principal.query.filter_by(is_active=True).count(),
-            'inactive': Principal.query.filter_by(is_active=False).count(),
-            'list': Principal.query.all()
-        },
-        
-        # Feedback statistics
-        'feedback': {
-            'total': Feedback.query.count(),
-            'with_admin_reply': Feedback.query.filter(Feedback.admin_reply.isnot(None)).count(),
-            'with_principal_reply': Feedback.query.filter(Feedback.principal_reply.isnot(None)).count(),
-            'pending_reply': Feedback.query.filter(
-                Feedback.admin_reply.is_(None),
-                Feedback.principal_reply.is_(None)
-            ).count(),
-            'list': Feedback.query.order_by(Feedback.created_at.desc()).limit(200).all()
-        },
-        
-        # Meeting statistics
-        'meetings': {
-            'total': MeetingBooking.query.count(),
-            'by_status': {
-                'pending': MeetingBooking.query.filter_by(status='pending').count(),
-                'confirmed': MeetingBooking.query.filter_by(status='confirmed').count(),
-                'completed': MeetingBooking.query.filter_by(status='completed').count(),
-                'cancelled': MeetingBooking.query.filter_by(status='cancelled').count()
-            },
-            'list': MeetingBooking.query.order_by(MeetingBooking.created_at.desc()).limit(100).all()
-        },
-        
-        # Platform metrics
-        'platform': {
-            'total_entities': 0,
-            'growth_rate': 0,
-            'engagement_rate': 0
-        }
-    }
-    
-    # Calculate school distribution
-    schools = School.query.all()
-    for school in schools:
-        region = school.region or 'Unknown'
-        level = school.level or 'Unknown'
-        
-        report['schools']['by_region'][region] = report['schools']['by_region'].get(region, 0) + 1
-        report['schools']['by_level'][level] = report['schools']['by_level'].get(level, 0) + 1
-    
-    # Calculate totals
-    report['platform']['total_entities'] = (
-        report['users']['total'] + 
-        report['schools']['total'] + 
-        report['principals']['total']
-    )
-    
-    return report
-
-def create_pdf_report(report_data):
-    """Generate PDF report with comprehensive system data"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, 
-                          rightMargin=72, leftMargin=72,
-                          topMargin=72, bottomMargin=72)
-    
-    styles = getSampleStyleSheet()
-    
-    # Create custom styles safely - check if they exist first
-    custom_styles = {}
-    
-    # Define custom styles with unique names
-    if 'CustomTitle' not in styles:
-        styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#E65C00')
-        ))
-    custom_styles['Title'] = styles['CustomTitle']
-    
-    if 'CustomHeading2Orange' not in styles:
-        styles.add(ParagraphStyle(
-            name='CustomHeading2Orange',
-            parent=styles['Heading2'],
-            textColor=colors.HexColor('#E65C00'),
-            spaceAfter=12
-        ))
-    custom_styles['Heading2Orange'] = styles['CustomHeading2Orange']
-    
-    if 'CustomBodyText' not in styles:
-        styles.add(ParagraphStyle(
-            name='CustomBodyText',
-            parent=styles['BodyText'],
-            fontSize=10,
-            spaceAfter=6
-        ))
-    custom_styles['BodyText'] = styles['CustomBodyText']
-    
-    # Build the story (content)
-    story = []
-    
-    # ===== COVER PAGE =====
-    story.append(Spacer(1, 2*inch))
-    story.append(Paragraph("EDUQUEST PLATFORM", custom_styles['Title']))
-    story.append(Spacer(1, 0.5*inch))
-    story.append(Paragraph("SYSTEM ANALYTICS REPORT", custom_styles['Title']))
-    story.append(Spacer(1, inch))
-    
-    # Report details
-    details = [
-        ["Report ID:", report_data['report_id']],
-        ["Generated:", report_data['generated_at'].strftime('%B %d, %Y %I:%M %p')],
-        ["Period:", report_data['date_range'].title()],
-        ["Platform:", "EduQuest School Finder System"]
-    ]
-    
-    for label, value in details:
-        story.append(Paragraph(f"<b>{label}</b> {value}", custom_styles['BodyText']))
-    
-    story.append(Spacer(1, inch))
-    story.append(Paragraph("CONFIDENTIAL - INTERNAL USE ONLY", 
-                          ParagraphStyle(name='Confidential', 
-                                        parent=styles['Normal'],
-                                        fontSize=8,
-                                        textColor=colors.grey,
-                                        alignment=TA_CENTER)))
-    
-    story.append(PageBreak())
-    
-    # ===== EXECUTIVE SUMMARY =====
-    story.append(Paragraph("EXECUTIVE SUMMARY", custom_styles['Heading2Orange']))
-    story.append(Spacer(1, 0.2*inch))
-    
-    summary_text = f"""
-    This report provides a comprehensive overview of the EduQuest platform as of {report_data['generated_at'].strftime('%B %d, %Y')}. 
-    The platform currently serves {report_data['users']['total']} registered users across {report_data['schools']['total']} schools 
-    in Kenya. Key metrics show {report_data['users']['new_this_week']} new user registrations this week and 
-    {report_data['feedback']['total']} pieces of feedback collected from the community.
-    """
-    story.append(Paragraph(summary_text, custom_styles['BodyText']))
-    
-    # Quick Stats Table
-    quick_stats = [
-        ['METRIC', 'COUNT', 'CHANGE'],
-        ['Total Users', str(report_data['users']['total']), '+12%'],
-        ['Registered Schools', str(report_data['schools']['total']), '+5%'],
-        ['Active Principals', str(report_data['principals']['active']), '+8%'],
-        ['Feedback Received', str(report_data['feedback']['total']), '+15%'],
-        ['Meeting Requests', str(report_data['meetings']['total']), '+22%']
-    ]
-    
-    table = Table(quick_stats, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E65C00')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
-    
-    story.append(table)
-    story.append(PageBreak())
-    
-    # ===== USER STATISTICS =====
-    story.append(Paragraph("USER DEMOGRAPHICS", custom_styles['Heading2Orange']))
-    
-    # User breakdown chart (simulated with text for now)
-    users_by_type = [
-        ['User Type', 'Count', 'Percentage'],
-        ['Parents/Guardians', str(int(report_data['users']['total'] * 0.6)), '60%'],
-        ['Students', str(int(report_data['users']['total'] * 0.35)), '35%'],
-        ['Principals/Staff', str(report_data['principals']['active']), '5%']
-    ]
-    
-    user_table = Table(users_by_type, colWidths=[2*inch, 1.5*inch, 1.5*inch])
-    user_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('BACKGROUND', (0, 1), (0, -1), colors.lightblue),
-        ('BACKGROUND', (1, 1), (1, -1), colors.lightgrey),
-        ('BACKGROUND', (2, 1), (2, -1), colors.lightgreen),
-    ]))
-    
-    story.append(user_table)
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Recent user registrations (top 10)
-    story.append(Paragraph("Recent User Registrations", styles['Heading3']))
-    
-    if report_data['users']['list']:
-        user_data = [['Name', 'Email', 'Phone', 'Registered']]
-        for user in report_data['users']['list'][:10]:
-            user_data.append([
-                user.name,
-                user.email,
-                user.phone or 'N/A',
-                user.created_at.strftime('%Y-%m-%d') if user.created_at else 'N/A'
-            ])
-        
-        recent_users_table = Table(user_data, colWidths=[1.5*inch, 2*inch, 1.2*inch, 1*inch])
-        recent_users_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4A6FA5')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
-        ]))
-        
-        story.append(recent_users_table)
-    else:
-        story.append(Paragraph("No user data available", custom_styles['BodyText']))
-    
-    story.append(PageBreak())
-    
-    # ===== SCHOOL ANALYSIS =====
-    story.append(Paragraph("SCHOOL DISTRIBUTION", custom_styles['Heading2Orange']))
-    
-    # Schools by region
-    story.append(Paragraph("Schools by Region", styles['Heading3']))
-    if report_data['schools']['by_region']:
-        region_data = [['Region', 'Number of Schools', 'Percentage']]
-        total_schools = report_data['schools']['total']
-        
-        for region, count in sorted(report_data['schools']['by_region'].items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / total_schools * 100) if total_schools > 0 else 0
-            region_data.append([region, str(count), f"{percentage:.1f}%"])
-        
-        region_table = Table(region_data, colWidths=[2*inch, 1.5*inch, 1.5*inch])
-        region_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E65C00')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
-        ]))
-        
-        story.append(region_table)
-    else:
-        story.append(Paragraph("No regional data available", custom_styles['BodyText']))
-    
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Schools by level
-    story.append(Paragraph("Schools by Education Level", styles['Heading3']))
-    if report_data['schools']['by_level']:
-        level_data = [['Education Level', 'Number of Schools']]
-        
-        for level, count in sorted(report_data['schools']['by_level'].items(), key=lambda x: x[1], reverse=True):
-            level_data.append([level, str(count)])
-        
-        level_table = Table(level_data, colWidths=[3*inch, 2*inch])
-        level_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
-        ]))
-        
-        story.append(level_table)
-    
-    story.append(PageBreak())
-    
-    # ===== FEEDBACK ANALYTICS =====
-    story.append(Paragraph("FEEDBACK & ENGAGEMENT", custom_styles['Heading2Orange']))
-    
-    # Feedback statistics
-    feedback_stats = [
-        ['Metric', 'Count', 'Rate'],
-        ['Total Feedback', str(report_data['feedback']['total']), '100%'],
-        ['With Admin Reply', str(report_data['feedback']['with_admin_reply']), 
-         f"{(report_data['feedback']['with_admin_reply']/report_data['feedback']['total']*100):.1f}%" if report_data['feedback']['total'] > 0 else '0%'],
-        ['With Principal Reply', str(report_data['feedback']['with_principal_reply']),
-         f"{(report_data['feedback']['with_principal_reply']/report_data['feedback']['total']*100):.1f}%" if report_data['feedback']['total'] > 0 else '0%'],
-        ['Pending Reply', str(report_data['feedback']['pending_reply']),
-         f"{(report_data['feedback']['pending_reply']/report_data['feedback']['total']*100):.1f}%" if report_data['feedback']['total'] > 0 else '0%']
-    ]
-    
-    feedback_table = Table(feedback_stats, colWidths=[2*inch, 1.5*inch, 1.5*inch])
-    feedback_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4A6FA5')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('BACKGROUND', (0, 1), (0, -1), colors.lightblue),
-        ('BACKGROUND', (1, 1), (1, -1), colors.lightgrey),
-        ('BACKGROUND', (2, 1), (2, -1), colors.lightgreen),
-    ]))
-    
-    story.append(feedback_table)
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Recent feedback
-    story.append(Paragraph("Recent Feedback Examples", styles['Heading3']))
-    
-    if report_data['feedback']['list']:
-        for i, feedback in enumerate(report_data['feedback']['list'][:5]):
-            story.append(Paragraph(f"<b>Feedback #{i+1}</b>", custom_styles['BodyText']))
-            story.append(Paragraph(f"From: {feedback.name} ({feedback.email or 'No email'})", 
-                                 ParagraphStyle(name='SmallText', parent=styles['Normal'], fontSize=8)))
-            story.append(Paragraph(f"Message: {feedback.message[:150]}..." if len(feedback.message) > 150 else f"Message: {feedback.message}", 
-                                 custom_styles['BodyText']))
-            story.append(Paragraph(f"Date: {feedback.created_at.strftime('%Y-%m-%d %H:%M') if feedback.created_at else 'N/A'}", 
-                                 ParagraphStyle(name='SmallText', parent=styles['Normal'], fontSize=8)))
-            story.append(Spacer(1, 0.1*inch))
-    else:
-        story.append(Paragraph("No feedback data available", custom_styles['BodyText']))
-    
-    story.append(PageBreak())
-    
-    # ===== MEETING BOOKINGS =====
-    story.append(Paragraph("MEETING BOOKINGS", custom_styles['Heading2Orange']))
-    
-    # Meeting status breakdown
-    meeting_status = report_data['meetings']['by_status']
-    meeting_stats = [
-        ['Status', 'Count', 'Percentage'],
-        ['Pending', str(meeting_status['pending']), 
-         f"{(meeting_status['pending']/report_data['meetings']['total']*100):.1f}%" if report_data['meetings']['total'] > 0 else '0%'],
-        ['Confirmed', str(meeting_status['confirmed']),
-         f"{(meeting_status['confirmed']/report_data['meetings']['total']*100):.1f}%" if report_data['meetings']['total'] > 0 else '0%'],
-        ['Completed', str(meeting_status['completed']),
-         f"{(meeting_status['completed']/report_data['meetings']['total']*100):.1f}%" if report_data['meetings']['total'] > 0 else '0%'],
-        ['Cancelled', str(meeting_status['cancelled']),
-         f"{(meeting_status['cancelled']/report_data['meetings']['total']*100):.1f}%" if report_data['meetings']['total'] > 0 else '0%']
-    ]
-    
-    meeting_table = Table(meeting_stats, colWidths=[1.5*inch, 1.5*inch, 1.5*inch])
-    meeting_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E65C00')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('BACKGROUND', (0, 1), (0, -1), colors.lightblue),
-        ('BACKGROUND', (1, 1), (1, -1), colors.lightgrey),
-        ('BACKGROUND', (2, 1), (2, -1), colors.lightgreen),
-    ]))
-    
-    story.append(meeting_table)
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Recent meeting requests
-    story.append(Paragraph("Recent Meeting Requests", styles['Heading3']))
-    
-    if report_data['meetings']['list']:
-        meeting_data = [['User', 'Purpose', 'Date', 'Status']]
-        for meeting in report_data['meetings']['list'][:8]:
-            purpose = meeting.purpose[:30] + "..." if len(meeting.purpose) > 30 else meeting.purpose
-            meeting_data.append([
-                meeting.user_name,
-                purpose,
-                meeting.preferred_date.strftime('%Y-%m-%d') if meeting.preferred_date else 'N/A',
-                meeting.status.title()
-            ])
-        
-        recent_meetings_table = Table(meeting_data, colWidths=[1.5*inch, 2*inch, 1.2*inch, 1*inch])
-        recent_meetings_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
-        ]))
-        
-        story.append(recent_meetings_table)
-    
-    story.append(PageBreak())
-    
-    # ===== CONCLUSIONS & RECOMMENDATIONS =====
-    story.append(Paragraph("CONCLUSIONS & RECOMMENDATIONS", custom_styles['Heading2Orange']))
-    
-    conclusions = [
-        Paragraph("<b>Key Findings:</b>", styles['Heading3']),
-        Paragraph(f"1. Platform Growth: The system has grown to {report_data['users']['total']} users and {report_data['schools']['total']} schools.", custom_styles['BodyText']),
-        Paragraph(f"2. Engagement: {report_data['feedback']['total']} feedback entries show strong community engagement.", custom_styles['BodyText']),
-        Paragraph(f"3. Response Rate: {report_data['feedback']['with_admin_reply'] + report_data['feedback']['with_principal_reply']} feedback items have received responses.", custom_styles['BodyText']),
-        Paragraph(f"4. Meeting Activity: {report_data['meetings']['total']} meeting requests indicate active parent-school communication.", custom_styles['BodyText']),
-        Spacer(1, 0.2*inch),
-        Paragraph("<b>Recommendations:</b>", styles['Heading3']),
-        Paragraph("1. <b>Improve Response Times:</b> Focus on reducing pending feedback response time.", custom_styles['BodyText']),
-        Paragraph("2. <b>Expand School Coverage:</b> Target regions with fewer registered schools.", custom_styles['BodyText']),
-        Paragraph("3. <b>Enhance User Engagement:</b> Implement notification system for meeting confirmations.", custom_styles['BodyText']),
-        Paragraph("4. <b>Data Quality:</b> Regular cleanup of inactive user accounts.", custom_styles['BodyText']),
-        Spacer(1, 0.2*inch),
-        Paragraph("<b>Next Steps:</b>", styles['Heading3']),
-        Paragraph("• Monthly report generation automated", custom_styles['BodyText']),
-        Paragraph("• Principal training on platform features", custom_styles['BodyText']),
-        Paragraph("• User feedback collection optimization", custom_styles['BodyText']),
-        Paragraph("• Regional expansion strategy development", custom_styles['BodyText']),
-    ]
-    
-    for item in conclusions:
-        story.append(item)
-    
-    story.append(Spacer(1, 0.5*inch))
-    
-    # Footer with page numbers
-    story.append(Paragraph("--- END OF REPORT ---", 
-                          ParagraphStyle(name='Footer', 
-                                        parent=styles['Normal'],
-                                        fontSize=8,
-                                        textColor=colors.grey,
-                                        alignment=TA_CENTER)))
-    
-    # Build PDF
-    doc.build(story)
-    
-    buffer.seek(0)
-    return buffer
-
-def generate_pdf_report(report_data):
-    """Generate and return PDF file"""
-    pdf_buffer = create_pdf_report(report_data)
-    
-    # Create response
-    from flask import make_response
-    response = make_response(pdf_buffer.getvalue())
-    response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = f'attachment; filename=eduquest_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-    
-    return response
-
-# ---------------------
-# Frontend Routes
-# ---------------------
-
-@app.route('/')
-def home():
-    """Home page with user session data"""
-    user_data = None
-    if session.get('user_logged_in'):
-        user = User.query.get(session['user_id'])
-        if user:
-            user_data = {
-                'name': user.name,
-                'email': user.email
-            }
-    return render_template('index.html', user=user_data)
-
-@app.route('/about')
-def about():
-    """About page"""
-    return render_template('about.html')
-
-@app.route('/contact')
-def contact():
-    """Contact page"""
-    return render_template('contact.html')
-
-@app.route('/profile')
-def profile():
-    """User profile page"""
-    if not session.get('user_logged_in'):
-        return redirect('/login')
-    
-    user = User.query.get(session['user_id'])
-    if not user:
-        session.clear()
-        return redirect('/login')
-    
-    return render_template('profile.html', user=user)
-
-@app.route('/schools')
-def schools_page():
-    all_schools = School.query.all()
-    return render_template('school.html', schools=all_schools)
-
-@app.route('/school/<int:id>')
-def school_details(id):
-    school = School.query.get_or_404(id)
-    feedbacks = Feedback.query.filter_by(school_id=id).order_by(Feedback.created_at.desc()).all()
-    
-    # Get principal data directly
-    try:
-        principal = Principal.query.filter_by(school_id=id).first()
-    except Exception:
-        principal = None
-
-    return render_template('school_details.html', 
-                         school=school, 
-                         feedbacks=feedbacks, 
-                         principal=principal,
-                         now=datetime.now())  
-
-@app.route('/register')
-def register_page():
-    """User registration page"""
-    return render_template('register.html')
-
-@app.route('/login')
-def login_page():
-    """Unified login page for all user types"""
-    return render_template('login.html')
-
-@app.route('/admin-login')
-def admin_login_page():
-    """Dedicated admin login page"""
-    return render_template('admin-login.html')
-
-@app.route('/principal-registration')
-def principal_registration_page():
-    """Principal registration page"""
-    schools = School.query.all()  # Get schools for dropdown
-    return render_template('principal-register.html', schools=schools)
-
-@app.route('/admin-dashboard')
-def admin_dashboard():
-    schools = School.query.all()  
-    return render_template('admin-dashboard.html', schools=schools)
-
-@app.route('/principal-dashboard')
-def principal_dashboard():
-    # Check if principal is logged in
-    if not session.get('principal_logged_in'):
-        print("❌ Principal not logged in - redirecting to home")
-        return redirect('/')
-    
-    # Get principal and school data
-    principal = Principal.query.get(session['principal_id'])
-    school = School.query.get(session['principal_school_id'])
-    
-    print(f"🔍 Debug - Principal ID: {session.get('principal_id')}")
-    print(f"🔍 Debug - School ID: {session.get('principal_school_id')}")
-    print(f"🔍 Debug - Principal found: {principal is not None}")
-    print(f"🔍 Debug - School found: {school is not None}")
-    
-    if not principal or not school:
-        session.clear()
-        return redirect('/')
-    
-    # Get meetings for this principal
-    meetings = MeetingBooking.query.filter_by(principal_id=principal.id).order_by(MeetingBooking.created_at.desc()).all()
-    
-    print(f"🔍 Debug - Meetings found: {len(meetings)}")
-    for meeting in meetings:
-        print(f"🔍 Meeting: {meeting.id}, Principal ID: {meeting.principal_id}, Status: {meeting.status}")
-    
-    return render_template('principal-dashboard.html', 
-                         principal=principal, 
-                         school=school,
-                         meetings=meetings)
-
-@app.route('/admin/feedback')
-def admin_feedback_page():
-    """Render the admin feedback management page"""
-    return render_template('admin-feedback.html')
-
-# ---------------------
-# API Routes
-# ---------------------
-
-@app.route('/api/schools')
-def api_schools():
-    schools = School.query.all()
-    return jsonify([
-        {
-            "id": s.id,
-            "name": s.name,
-            "region": s.region,
-            "level": s.level,
-            "contact": s.contact,
-            "description": s.description,
-            "accessibility": s.accessibility,
-            "fee_structure": s.fee_structure,
-            "image_url": s.image_url
-        } for s in schools
-    ])
-
-@app.route('/api/users/register', methods=['POST'])
-def register_user():
-    """Register new user/parent"""
-    try:
-        data = request.json or {}
-        
-        # Validation
-        required_fields = ['name', 'email', 'password']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        # Check if email exists
-        if User.query.filter_by(email=data['email']).first():
-            return jsonify({"error": "Email already registered"}), 400
-        
-        # Create user
-        user = User(
-            name=data['name'],
-            email=data['email'],
-            phone=data.get('phone')
-        )
-        user.set_password(data['password'])
-        
-        db.session.add(user)
-        db.session.commit()
-        
-        return jsonify({
-            "message": "Registration successful!",
-            "user": user.to_dict()
-        }), 201
-        
-    except Exception as e:
-        print(f"❌ USER REGISTRATION ERROR: {str(e)}")
-        db.session.rollback()
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
-
-@app.route('/api/login', methods=['POST'])
-def unified_login():
-    """Smart login endpoint for Users and Principals ONLY"""
-    try:
-        data = request.json or {}
-        email = data.get('email')
-        password = data.get('password')
-        user_type = data.get('user_type')
-        
-        print(f"🔐 LOGIN ATTEMPT: {email} as {user_type}")
-        
-        if not all([email, password, user_type]):
-            return jsonify({"error": "All fields are required"}), 400
-        
-        # REMOVED ADMIN LOGIN - Only handle User and Principal
-        
-        if user_type == 'principal':
-            # Principal login
-            principal = Principal.query.filter_by(email=email).first()
-            if principal and check_password_hash(principal.password_hash, password):
-                if not principal.is_active:
-                    return jsonify({"error": "Account pending admin approval"}), 403
-                session['principal_logged_in'] = True
-                session['principal_id'] = principal.id
-                session['principal_school_id'] = principal.school_id
-                session['principal_name'] = principal.name
-                return jsonify({"message": "Principal login successful"}), 200
-        
-        elif user_type == 'user':
-            # User/Parent login
-            user = User.query.filter_by(email=email).first()
-            if user and user.check_password(password):
-                if not user.is_active:
-                    return jsonify({"error": "Account deactivated"}), 403
-                session['user_logged_in'] = True
-                session['user_id'] = user.id
-                session['user_name'] = user.name
-                return jsonify({"message": "User login successful"}), 200
-        
-        # If we get here, login failed
-        return jsonify({"error": "Invalid credentials"}), 401
-        
-    except Exception as e:
-        print(f"❌ LOGIN ERROR: {str(e)}")
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
-
-@app.route('/api/users/logout')
-def user_logout():
-    """Log out user and redirect to home"""
-    session.pop('user_logged_in', None)
-    session.pop('user_id', None)
-    session.pop('user_name', None)
-    return redirect('/')
-
-@app.route('/api/principals/logout', methods=['POST'])
-def principal_logout():
-    session.clear()
-    return jsonify({"message": "Logged out successfully"}), 200
-
-@app.route('/api/admin/login', methods=['POST'])
-def admin_login():
-    data = request.json or {}
-    username = data.get('username')
-    password = data.get('password')
-    admin = Admin.query.filter_by(username=username).first()
-    if admin and admin.check_password(password):
-        session['admin_logged_in'] = True
-        session['admin_username'] = username
-        return jsonify({"message": "Login successful"}), 200
-    return jsonify({"error": "Invalid credentials"}), 401
-
-@app.route('/api/admin/logout', methods=['POST'])
-def admin_logout():
-    session.clear()
-    return jsonify({"message": "Logged out"}), 200
-
-@app.route('/api/session', methods=['GET'])
-def check_session():
-    return jsonify({"admin_logged_in": bool(session.get('admin_logged_in')), "username": session.get('admin_username')}), 200
-
-# School CRUD operations
-@app.route('/api/schools', methods=['POST'])
-def add_school():
-    if not session.get('admin_logged_in'):
-        return jsonify({"error": "Unauthorized"}), 401
-    data = request.json or {}
-    s = School(
-        name=data.get('name', ''),
-        region=data.get('region', ''),
-        level=data.get('level'),
-        contact=data.get('contact'),
-        description=data.get('description'),
-        accessibility=data.get('accessibility'),
-        fee_structure=data.get('fee_structure'),
-        image_url=data.get('image_url')
-    )
-    db.session.add(s)
-    db.session.commit()
-    return jsonify(s.to_dict()), 201
-
-@app.route('/api/schools/<int:id>', methods=['GET'])
-def get_school(id):
-    s = School.query.get_or_404(id)
-    return jsonify(s.to_dict()), 200
-
-@app.route('/api/schools/<int:id>', methods=['PUT'])
-def update_school(id):
-    if not session.get('admin_logged_in'):
-        return jsonify({"error": "Unauthorized"}), 401
-    s = School.query.get_or_404(id)
-    data = request.json or {}
-    s.name = data.get('name', s.name)
-    s.region = data.get('region', s.region)
-    s.level = data.get('level', s.level)
-    s.contact = data.get('contact', s.contact)
-    s.description = data.get('description', s.description)
-    s.accessibility = data.get('accessibility', s.accessibility)
-    s.fee_structure = data.get('fee_structure', s.fee_structure)
-    s.image_url = data.get('image_url', s.image_url)
-    db.session.commit()
-    return jsonify(s.to_dict()), 200
-
-@app.route('/api/schools/<int:id>', methods=['DELETE'])
-def delete_school(id):
-    print(f"DELETING SCHOOL ID: {id} - WITH MANUAL CASCADE")
-    
-    try:
-        school = School.query.get(id)
-        if not school:
-            print(f"❌ SCHOOL {id} NOT FOUND!")
-            return jsonify({"error": "School not found"}), 404
-            
-        print(f"DELETING SCHOOL: {school.name} (ID: {school.id})")
-        
-        # MANUAL CASCADE DELETE (since relationships aren't set up)
-        # Delete related principals
-        principals = Principal.query.filter_by(school_id=id).all()
-        for principal in principals:
-            print(f"Deleting principal: {principal.name} (ID: {principal.id})")
-            db.session.delete(principal)
-        
-        # Delete related feedback
-        feedbacks = Feedback.query.filter_by(school_id=id).all()
-        for feedback in feedbacks:
-            print(f"Deleting feedback: {feedback.id}")
-            db.session.delete(feedback)
-            
-        # Delete related meetings
-        meetings = MeetingBooking.query.filter_by(school_id=id).all()
-        for meeting in meetings:
-            print(f"Deleting meeting: {meeting.id}")
-            db.session.delete(meeting)
-        
-        # Delete associated image file if exists
-        if school.image_url and school.image_url != "/static/images/default-school.jpg":
-            try:
-                image_path = school.image_url.replace('/static/', 'static/')
-                if os.path.exists(image_path):
-                    os.remove(image_path)
-                    print(f"DELETED IMAGE FILE: {image_path}")
-            except Exception as e:
-                print(f"Could not delete image file: {e}")
-        
-        # Finally delete the school
-        db.session.delete(school)
-        db.session.commit()
-        
-        print(f"✅ SCHOOL {id} AND ALL ASSOCIATED DATA DELETED SUCCESSFULLY!")
-        return jsonify({"message": "School and all associated data deleted"}), 200
-        
-    except Exception as e:
-        print(f"❌ DELETE ERROR: {str(e)}")
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
-
-#ROUTE FOR CONFIRMING  PRINCIPAL MODEL EXISTS
-@app.route('/update-db', methods=['GET'])
-def update_db():
-    """Route to update database with new models"""
-    try:
-        with app.app_context():
-            db.create_all()  # This will create any new tables
-        return jsonify({"message": "Database updated successfully with Principal model"}), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-#ROUTE FOR CONFIRMING MEETING BOOKING MODEL EXISTS   
-@app.route('/update-db-meetings')
-def update_db_meetings():
-    """Route to update database with MeetingBooking model"""
-    try:
-        with app.app_context():
-            db.create_all()
-        return jsonify({"message": "Database updated successfully with MeetingBooking model"}), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/debug-meetings')
-def debug_meetings():
-    """Debug route to check all meetings in database"""
-    try:
-        meetings = MeetingBooking.query.all()
-        meetings_data = []
-        for meeting in meetings:
-            meetings_data.append({
-                "id": meeting.id,
-                "school_id": meeting.school_id,
-                "principal_id": meeting.principal_id,
-                "user_name": meeting.user_name,
-                "status": meeting.status,
-                "preferred_date": meeting.preferred_date.isoformat() if meeting.preferred_date else None
-            })
-        return jsonify({"meetings": meetings_data, "total": len(meetings)})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-#ROUTE FOR BOOKING A MEETING
-@app.route('/api/meetings/book', methods=['POST'])
-def book_meeting():
-    try:
-        data = request.json or {}
-        print(f"📅 Meeting booking attempt: {data}")
-        
-        # Validation
-        required_fields = ['school_id', 'principal_id', 'user_name', 'user_email', 'purpose', 'preferred_date']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        # Verify principal exists
-        principal = Principal.query.get(data['principal_id'])
-        if not principal:
-            return jsonify({"error": "Principal not found"}), 404
-        
-        # Create meeting booking
-        meeting = MeetingBooking(
-            school_id=data['school_id'],
-            principal_id=data['principal_id'],
-            user_name=data['user_name'],
-            user_email=data['user_email'],
-            user_phone=data.get('user_phone'),
-            purpose=data['purpose'],
-            preferred_date=datetime.fromisoformat(data['preferred_date'].replace('Z', '+00:00')),
-            special_requirements=data.get('special_requirements')
-        )
-        
-        db.session.add(meeting)
-        db.session.commit()
-        
-        print(f"✅ Meeting booked: {meeting.id} - {meeting.user_name} with principal {meeting.principal_id}")
-        
-        return jsonify({
-            "message": "Meeting request submitted successfully",
-            "meeting_id": meeting.id
-        }), 201
-        
-    except Exception as e:
-        print(f"❌ Meeting booking error: {str(e)}")
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
-
-#UPDATE MEETING BOOKING ROUTE ON PRINCIPAL DASHBOARD
-@app.route('/api/meetings/<int:meeting_id>/status', methods=['PUT'])
-def update_meeting_status(meeting_id):
-    try:
-        # Check if principal is logged in
-        if not session.get('principal_logged_in'):
-            return jsonify({"error": "Unauthorized"}), 401
-        
-        data = request.json or {}
-        new_status = data.get('status')
-        
-        if not new_status:
-            return jsonify({"error": "Status is required"}), 400
-        
-        # Get meeting and verify it belongs to this principal
-        meeting = MeetingBooking.query.get(meeting_id)
-        if not meeting:
-            return jsonify({"error": "Meeting not found"}), 404
-        
-        if meeting.principal_id != session['principal_id']:
-            return jsonify({"error": "Unauthorized"}), 403
-        
-        # Update status
-        meeting.status = new_status
-        db.session.commit()
-        
-        print(f"Meeting {meeting_id} status updated to: {new_status}")  # Simulate notification
-        
-        return jsonify({
-            "message": f"Meeting {new_status} successfully",
-            "meeting": meeting.to_dict()
-        }), 200
-        
-    except Exception as e:
-        print(f"Meeting status update error: {str(e)}")
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
-
-#IMAGES MANAGEMENT
-@app.route('/upload-school-image', methods=['POST'])
-def upload_school_image():
-    if 'school_image' not in request.files:
-        return jsonify({'error': 'No file selected'}), 400
-    
-    file = request.files['school_image']
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
-    
-    if file and allowed_file(file.filename):
-        # Generate unique filename
-        filename = secure_filename(file.filename)
-        unique_filename = f"{int(time.time())}_{filename}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-        
-        # Save file
-        file.save(file_path)
-        
-        # Return the relative URL for the image
-        image_url = f"/static/images/schools/{unique_filename}"
-        return jsonify({'image_url': image_url})
-    
-    return jsonify({'error': 'Invalid file type'}), 400
-
-# DELETE IMAGE FUNCTIONALITY
-@app.route('/delete-school-image/<int:school_id>', methods=['DELETE'])
-def delete_school_image(school_id):
-    try:
-        school = School.query.get_or_404(school_id)
-        
-        if school.image_url:
-            # Delete the physical file
-            image_path = school.image_url.replace('/static/', 'static/')
-            if os.path.exists(image_path):
-                os.remove(image_path)
-            
-            # Update the database
-            school.image_url = None
-            db.session.commit()
-            
-        return jsonify({'success': True})
-    
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-#ROUTE FOR PRINCIPALS
-@app.route('/debug-principals')
-def debug_principals():
-    """Check all principals in database"""
-    try:
-        principals = Principal.query.all()
-        
-        principals_data = []
-        for principal in principals:
-            principals_data.append({
-                "id": principal.id,
-                "name": principal.name,
-                "email": principal.email,
-                "school_id": principal.school_id,
-                "is_active": principal.is_active,
-                "created_at": getattr(principal, 'created_at', 'N/A')
-            })
-        
-        return jsonify({
-            "total_principals": len(principals),
-            "principals": principals_data
-        })
-        
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/principals/register', methods=['POST'])
-def register_principal():
-    try:
-        data = request.json or {}
-        print(f"Registration attempt with data: {data}")
-        
-        # Validation
-        required_fields = ['school_id', 'name', 'email', 'phone', 'password']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        # Check if email already exists
-        if Principal.query.filter_by(email=data['email']).first():
-            return jsonify({"error": "Email already registered"}), 400
-        
-        # Create principal
-        principal = Principal(
-            school_id=data['school_id'],
-            name=data['name'],
-            email=data['email'],
-            phone=data['phone'],
-            password_hash=generate_password_hash(data['password']),
-            is_active=True  # AUTO-ACTIVATE FOR NOW
-        )
-        
-        db.session.add(principal)
-        db.session.commit()
-        
-        print(f"✅ Principal registered successfully: {principal.email}")
-        
-        return jsonify({
-            "message": "Registration successful!",
-            "principal_id": principal.id
-        }), 201
-        
-    except Exception as e:
-        print(f"❌ Registration error: {str(e)}")
-        db.session.rollback()
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
-
-#PRINCIPAL LOGIN ROUTE 
-@app.route('/api/principals/login', methods=['POST'])
-def principal_login():
-    try:
-        data = request.json or {}
-        
-        # Validation
-        if not data.get('email') or not data.get('password'):
-            return jsonify({"error": "Email and password required"}), 400
-        
-        # Find principal by email
-        principal = Principal.query.filter_by(email=data['email']).first()
-        if not principal:
-            return jsonify({"error": "Invalid credentials"}), 401
-        
-        # Check password
-        if not check_password_hash(principal.password_hash, data['password']):
-            return jsonify({"error": "Invalid credentials"}), 401
-        
-        # Check if account is active
-        if not principal.is_active:
-            return jsonify({"error": "Account pending admin approval. Please wait for activation."}), 403
-        
-        # Login successful - create session
-        session['principal_logged_in'] = True
-        session['principal_id'] = principal.id
-        session['principal_school_id'] = principal.school_id
-        session['principal_name'] = principal.name
-        
-        return jsonify({
-            "message": "Login successful",
-            "principal": principal.to_dict()
-        }), 200
-        
-    except Exception as e:
-        print(f"Login error: {str(e)}")
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
-
-#PRINCIPAL PROFILE UPDATE ROUTE
-@app.route('/api/principals/profile', methods=['POST'])
-def update_principal_profile():
-    try:
-        # Check if principal is logged in
-        if not session.get('principal_logged_in'):
-            return jsonify({"error": "Unauthorized"}), 401
-        
-        principal = Principal.query.get(session['principal_id'])
-        if not principal:
-            return jsonify({"error": "Principal not found"}), 404
-        
-        # Handle file upload
-        if 'profile_photo' in request.files:
-            file = request.files['profile_photo']
-            if file and file.filename != '' and allowed_file(file.filename):
-                # Generate unique filename
-                filename = secure_filename(file.filename)
-                unique_filename = f"principal_{principal.id}_{int(time.time())}_{filename}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                
-                # Save file
-                file.save(file_path)
-                principal.image_url = f"/static/images/schools/{unique_filename}"
-        
-        # Update other fields
-        principal.name = request.form.get('name', principal.name)
-        principal.email = request.form.get('email', principal.email)
-        principal.phone = request.form.get('phone', principal.phone)
-        principal.bio = request.form.get('bio', principal.bio)
-        principal.qualifications = request.form.get('qualifications', principal.qualifications)
-        principal.office_hours = request.form.get('office_hours', principal.office_hours)
-        
-        db.session.commit()
-        
-        return jsonify({
-            "message": "Profile updated successfully",
-            "principal": principal.to_dict()
-        }), 200
-        
-    except Exception as e:
-        print(f"Profile update error: {str(e)}")
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
-
-# FEEDBACK
-@app.route('/api/all-schools')
-def all_schools():
-    """Get all schools for feedback filtering"""
-    try:
-        schools = School.query.all()
-        
-        schools_data = []
-        for school in schools:
-            schools_data.append({
-                "id": school.id,
-                "name": school.name,
-                "region": school.region,
-                "level": school.level,
-                "contact": getattr(school, 'contact', '')
-            })
-        
-        return jsonify(schools_data)
-    
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/feedback', methods=['POST'])
-def post_feedback():
-    """Submit new feedback from users"""
-    data = request.json or {}
-    
-    try:
-        print(f"🔄 FEEDBACK SUBMISSION ATTEMPT: {data}")
-        
-        # Validation
-        required_fields = ['school_id', 'name', 'message']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        # Create feedback with SQLAlchemy
-        feedback = Feedback(
-            school_id=data.get('school_id'),
-            name=data.get('name'),
-            email=data.get('email', ''),
-            message=data.get('message'),
-            created_at=datetime.utcnow()
-        )
-        
-        db.session.add(feedback)
-        db.session.commit()
-        
-        print(f"✅ FEEDBACK SUBMITTED SUCCESSFULLY: ID {feedback.id}")
-        return jsonify({
-            'id': feedback.id, 
-            'message': 'Feedback submitted successfully'
-        }), 201
-        
-    except Exception as e:
-        print(f"❌ FEEDBACK SUBMIT ERROR: {e}")
-        import traceback
-        print(f"🔍 FULL TRACEBACK: {traceback.format_exc()}")
-        db.session.rollback()
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
-
-@app.route('/debug-feedback-table')
-def debug_feedback_table():
-    """Debug route to check Feedback table structure"""
-    try:
-        # Check if table exists and get its structure
-        feedbacks = Feedback.query.limit(5).all()
-        
-        table_info = {
-            "table_exists": True,
-            "total_feedbacks": Feedback.query.count(),
-            "sample_feedbacks": []
-        }
-        
-        for f in feedbacks:
-            table_info["sample_feedbacks"].append({
-                "id": f.id,
-                "school_id": f.school_id,
-                "name": f.name,
-                "email": f.email,
-                "message": f.message[:50] + "..." if len(f.message) > 50 else f.message,
-                "created_at": str(f.created_at),
-                "admin_reply": f.admin_reply,
-                "reply_date": str(f.reply_date),
-                "principal_reply": f.principal_reply,
-                "principal_reply_date": str(f.principal_reply_date)
-            })
-        
-        return jsonify(table_info)
-        
-    except Exception as e:
-        return jsonify({
-            "table_exists": False,
-            "error": str(e)
-        }), 500
-
-@app.route('/reset-feedback-table')
-def reset_feedback_table():
-    """Emergency reset for Feedback table with new fields"""
-    try:
-        print("🚨 RESETTING FEEDBACK TABLE WITH NEW FIELDS...")
-        
-        # Drop the table if it exists
-        try:
-            Feedback.__table__.drop(db.engine, checkfirst=True)
-            print("✅ OLD FEEDBACK TABLE DROPPED")
-        except Exception as e:
-            print(f"⚠️ Could not drop table (might not exist): {e}")
-        
-        # Recreate the table with new schema
-        db.create_all()
-        
-        print("✅ FEEDBACK TABLE RECREATED WITH PRINCIPAL REPLY FIELDS!")
-        
-        # Verify the table structure
-        feedbacks = Feedback.query.all()
-        print(f"✅ VERIFICATION: Table exists with {len(feedbacks)} entries")
-        
-        return jsonify({"message": "Feedback table reset successfully with principal_reply fields"}), 200
-        
-    except Exception as e:
-        print(f"❌ RESET FAILED: {str(e)}")
-        import traceback
-        print(f"🔍 FULL TRACEBACK: {traceback.format_exc()}")
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/feedback', methods=['GET'])
-def get_feedbacks():
-    """Get all feedback for admin dashboard"""
-    try:
-        print("🔄 GET_FEEDBACKS CALLED")
-        
-        feedbacks = Feedback.query.order_by(Feedback.created_at.desc()).all()
-        print(f"✅ FOUND {len(feedbacks)} FEEDBACK ENTRIES")
-        
-        # SIMPLIFIED VERSION - Use the model's to_dict method
-        feedbacks_data = [f.to_dict() for f in feedbacks]
-        
-        print("✅ SUCCESS: Returning feedback data")
-        return jsonify(feedbacks_data), 200
-        
-    except Exception as e:
-        print(f"❌ GET FEEDBACKS ERROR: {e}")
-        import traceback
-        print(f"🔍 FULL TRACEBACK: {traceback.format_exc()}")
-        return jsonify({"error": str(e)}), 500
-
-#ROUTE TO CONFIRM FEEDBACK MODEL EXISTS
-@app.route('/update-feedback-model')
-def update_feedback_model():
-    """Emergency route to update Feedback model with new fields"""
-    try:
-        with app.app_context():
-            db.create_all()
-        return "✅ Feedback model updated with admin_reply and reply_date fields!"
-    except Exception as e:
-        return f"❌ Error: {str(e)}"
-
-#ROUTE FOR REPLYING TO FEEDBACK - FIXED
-@app.route('/api/feedback/<int:feedback_id>/reply', methods=['POST'])
-def reply_to_feedback(feedback_id):
-    """Admin replies to specific feedback"""
-    data = request.json
-    reply_message = data.get('reply')
-    
-    print(f"🔄 REPLYING TO FEEDBACK {feedback_id}: {reply_message}")
-    
-    try:
-        # USE SQLALCHEMY INSTEAD OF RAW SQLITE
-        feedback = Feedback.query.get(feedback_id)
-        if feedback:
-            feedback.admin_reply = reply_message
-            feedback.reply_date = datetime.utcnow()
-            
-            db.session.commit()
-            print(f"✅ REPLY ADDED TO FEEDBACK {feedback_id}")
-            return jsonify({"message": "Reply added successfully"})
-        else:
-            return jsonify({"error": "Feedback not found"}), 404
-            
-    except Exception as e:
-        print(f"❌ REPLY ERROR: {e}")
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
-
-#ROUTE FOR DELETING FEEDBACK - FIXED
-@app.route('/api/feedback/<int:feedback_id>', methods=['DELETE'])
-def delete_feedback(feedback_id):
-    """Delete specific feedback"""
-    print(f"🔄 DELETING FEEDBACK {feedback_id}")
-    
-    try:
-        # USE SQLALCHEMY INSTEAD OF RAW SQLITE
-        feedback = Feedback.query.get(feedback_id)
-        if feedback:
-            db.session.delete(feedback)
-            db.session.commit()
-            print(f"✅ FEEDBACK {feedback_id} DELETED")
-            return jsonify({"message": "Feedback deleted successfully"})
+        if not db.inspect(db.engine).has_table(School.__tablename__):
+            init_db(seed=True)  # new install: the tables and the default admin
         else:
-            return jsonify({"error": "Feedback not found"}), 404
-            
-    except Exception as e:
-        print(f"❌ DELETE ERROR: {e}")
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/schools/<int:school_id>/feedback')
-def get_school_feedback(school_id):
-    """Get feedback for a specific school"""
-    try:
-        # USE SQLALCHEMY INSTEAD OF RAW SQLITE
-        feedbacks = Feedback.query.filter_by(school_id=school_id).order_by(Feedback.created_at.desc()).all()
-        feedbacks_data = [{
-            'id': f.id,
-            'school_id': f.school_id,
-            'name': f.name,
-            'email': f.email,
-            'message': f.message,
-            'created_at': f.created_at.isoformat() if f.created_at else None,
-            'admin_reply': f.admin_reply,
-            'reply_date': f.reply_date.isoformat() if f.reply_date else None,
-            'principal_reply': f.principal_reply,  # ADD THIS
-            'principal_reply_date': f.principal_reply_date.isoformat() if f.principal_reply_date else None,  # ADD THIS
-            'school_name': f"School {f.school_id}"  # SIMPLIFIED - FIXES THE ERROR
-        } for f in feedbacks]
-        
-        return jsonify(feedbacks_data)
-        
-    except Exception as e:
-        print(f"❌ GET SCHOOL FEEDBACK ERROR: {e}")
-        return jsonify({"error": str(e)}), 500
-
-# Get feedback for principal's school
-@app.route('/api/principal/feedback', methods=['GET'])
-def get_principal_feedback():
-    """Get all feedback for principal's assigned school"""
-    try:
-        # Check if principal is logged in
-        if not session.get('principal_logged_in'):
-            return jsonify({'error': 'Unauthorized'}), 401
-        
-        principal = Principal.query.get(session['principal_id'])
-        if not principal or not principal.school_id:
-            return jsonify({'error': 'Principal not assigned to a school'}), 400
-        
-        # Get feedback for principal's school
-        feedbacks = Feedback.query.filter_by(school_id=principal.school_id).order_by(Feedback.created_at.desc()).all()
-        
-        feedbacks_data = [{
-            'id': f.id,
-            'school_id': f.school_id,
-            'name': f.name,
-            'email': f.email,
-            'message': f.message,
-            'created_at': f.created_at.isoformat() if f.created_at else None,
-            'admin_reply': f.admin_reply,
-            'reply_date': f.reply_date.isoformat() if f.reply_date else None,
-            'principal_reply': f.principal_reply,
-            'principal_reply_date': f.principal_reply_date.isoformat() if f.principal_reply_date else None
-        } for f in feedbacks]
-        
-        return jsonify(feedbacks_data)
-        
-    except Exception as e:
-        print(f"❌ GET PRINCIPAL FEEDBACK ERROR: {e}")
-        return jsonify({"error": str(e)}), 500
-
-#ROUTE WHERE PRINCIPALS REPLY TO FEEDBACK
-@app.route('/api/principal/feedback/<int:feedback_id>/reply', methods=['POST'])
-def principal_reply_to_feedback(feedback_id):
-    """Principal replies to specific feedback"""
-    try:
-        # Check if principal is logged in
-        if not session.get('principal_logged_in'):
-            return jsonify({'error': 'Unauthorized'}), 401
-        
-        principal = Principal.query.get(session['principal_id'])
-        if not principal or not principal.school_id:
-            return jsonify({'error': 'Principal not assigned to a school'}), 400
-        
-        data = request.json
-        reply_message = data.get('reply')
-        
-        if not reply_message:
-            return jsonify({'error': 'Reply message is required'}), 400
-        
-        # Get feedback and verify it belongs to principal's school
-        feedback = Feedback.query.get(feedback_id)
-        if not feedback:
-            return jsonify({'error': 'Feedback not found'}), 404
-        
-        if feedback.school_id != principal.school_id:
-            return jsonify({'error': 'Unauthorized to reply to this feedback'}), 403
-        
-        # Update feedback with principal reply
-        feedback.principal_reply = reply_message
-        feedback.principal_reply_date = datetime.utcnow()
-        
-        db.session.commit()
-        
-        print(f"✅ PRINCIPAL REPLY ADDED TO FEEDBACK {feedback_id}")
-        return jsonify({
-            "message": "Reply added successfully",
-            "principal_reply": feedback.principal_reply,
-            "principal_reply_date": feedback.principal_reply_date.isoformat()
-        })
-        
-    except Exception as e:
-        print(f"❌ PRINCIPAL REPLY ERROR: {e}")
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
-
-#ROUTE FOR ADDING SCHOOLS ON THE ADMIN DASHBOARD
-@app.route('/add-school', methods=['POST'])
-def submit_school_form():
-    print("🔄 ADD SCHOOL FORM SUBMITTED!")
-    
-    # Get form data
-    name = request.form.get('name')
-    region = request.form.get('region') 
-    level = request.form.get('level')
-    description = request.form.get('description')
-    contact = request.form.get('contact')
-    accessibility = request.form.get('accessibility')
-    fee_structure = request.form.get('fee_structure')
-    
-    print(f"📝 FORM DATA: {name}, {region}, {level}")
-
-    # Handle file upload - BACKEND SOLUTION (like principal dashboard)
-    image_url = "/static/images/default-school.jpg"  # default
-    
-    if 'school_image' in request.files:
-        file = request.files['school_image']
-        if file and file.filename != '' and allowed_file(file.filename):
-            print(f"📁 FILE UPLOAD DETECTED: {file.filename}")
-            
-            # Generate unique filename
-            filename = secure_filename(file.filename)
-            unique_filename = f"school_{int(time.time())}_{filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            
-            # Save file to folder
-            file.save(file_path)
-            image_url = f"/static/images/schools/{unique_filename}"
-            print(f"✅ IMAGE SAVED TO: {image_url}")
-        else:
-            print("📁 NO VALID FILE UPLOADED, USING DEFAULT IMAGE")
-
-    # Validate required fields
-    if not name or not region:
-        print("❌ MISSING REQUIRED FIELDS!")
-        return redirect('/admin-dashboard')
-
-    try:
-        # Create and save new school
-        new_school = School(
-            name=name,
-            region=region,
-            level=level,
-            description=description,
-            contact=contact,
-            accessibility=accessibility,
-            fee_structure=fee_structure,
-            image_url=image_url
-        )
-
-        print(f"🎯 CREATING SCHOOL OBJECT: {new_school.name}")
-        
-        db.session.add(new_school)
-        print("✅ SCHOOL ADDED TO SESSION")
-        
-        # FORCE COMMIT
-        db.session.commit()
-        print("✅ DATABASE COMMITTED!")
-        
-        # VERIFY IMMEDIATELY
-        saved_school = School.query.get(new_school.id)
-        if saved_school:
-            print(f"🎉 VERIFICATION SUCCESS: School {saved_school.id} - '{saved_school.name}' saved in database!")
-            
-            # Check all schools count
-            all_schools = School.query.all()
-            print(f"📊 TOTAL SCHOOLS IN DATABASE: {len(all_schools)}")
-            for s in all_schools:
-                print(f"   - {s.id}: {s.name}")
-        else:
-            print("❌ VERIFICATION FAILED: School not found after commit!")
-
-    except Exception as e:
-        print(f"❌ DATABASE ERROR: {str(e)}")
-        import traceback
-        print(f"🔍 FULL ERROR: {traceback.format_exc()}")
-        db.session.rollback()
-        return redirect('/admin-dashboard')
-
-    return redirect('/admin-dashboard')
-
-# ADD THIS DEBUG ROUTE TO CHECK SCHOOLS
-@app.route('/debug-schools')
-def debug_schools():
-    """Debug route to check all schools in database"""
-    try:
-        schools = School.query.all()
-        schools_data = []
-        for school in schools:
-            schools_data.append({
-                "id": school.id,
-                "name": school.name,
-                "region": school.region,
-                "level": school.level,
-                "contact": school.contact,
-                "image_url": school.image_url,
-                "created_at": getattr(school, 'created_at', 'N/A')
-            })
-        return jsonify({
-            "total_schools": len(schools),
-            "schools": schools_data
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-#ROUTE FOR GETTING REAL USER STATISTICS FOR ADMIN DASHBOARD
-@app.route('/api/admin/user-statistics')
-def get_user_statistics():
-    try:
-        print("🔍 Starting user statistics with actual User model...")
-        
-        # Test database connection first
-        total_users = User.query.count()
-        print(f"✅ Total users found: {total_users}")
-        
-        # Calculate active today (users created today)
-        today = datetime.now().date()
-        active_today = User.query.filter(
-            db.func.date(User.created_at) == today
-        ).count()
-        
-        # New users this week
-        week_ago = datetime.now() - timedelta(days=7)
-        new_this_week = User.query.filter(
-            User.created_at >= week_ago
-        ).count()
-        
-        # Since you don't have roles, we'll need to estimate or get from other tables
-        # For now, let's use realistic estimates based on your platform
-        parents_count = int(total_users * 0.6)  # ~60% parents
-        students_count = int(total_users * 0.35)  # ~35% students
-        principals_count = int(total_users * 0.05)  # ~5% principals
-        
-        # If you have a School model with principals, use this instead:
-        # principals_count = School.query.count()  # One principal per school
-        
-        stats = {
-            'total_users': total_users,
-            'active_today': active_today,
-            'new_this_week': new_this_week,
-            'parents_count': parents_count,
-            'students_count': students_count,
-            'principals_count': principals_count
-        }
-        
-        print(f"✅ Real user stats calculated: {stats}")
-        return jsonify(stats)
-        
-    except Exception as e:
-        print(f"❌ ERROR in user statistics:")
-        print(f"Error: {str(e)}")
-        traceback.print_exc()
-        
-        # Fallback with realistic numbers based on typical school platform
-        return jsonify({
-            'total_users': 1250,
-            'active_today': 85,
-            'new_this_week': 42,
-            'parents_count': 750,
-            'students_count': 438,
-            'principals_count': 62
-        })
-
-@app.route('/api/admin/user-statistics-test')
-def test_user_stats():
-    """Simple test endpoint to verify User model works"""
-    try:
-        # Test basic User query
-        user_count = User.query.count()
-        first_user = User.query.first()
-        
-        return jsonify({
-            'success': True,
-            'user_count': user_count,
-            'first_user_name': first_user.name if first_user else 'No users',
-            'message': 'User model is working correctly'
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'message': 'User model query failed'
-        }), 500
-
-
-# 📊 ROUTE TO CHECK ALL DATABASE TABLES
-@app.route('/debug-db')
-def debug_database():
-    """Check all tables in database with counts"""
-    try:
-        from models import db, School, Principal, Feedback, MeetingBooking, Admin, User
-        
-        tables_data = {
-            "schools": School.query.count(),
-            "principals": Principal.query.count(),
-            "feedbacks": Feedback.query.count(),
-            "meetings": MeetingBooking.query.count(),
-            "admins": Admin.query.count(),
-            "users": User.query.count()
-        }
-        
-        return jsonify({
-            "database_status": "✅ Connected",
-            "table_counts": tables_data,
-            "total_records": sum(tables_data.values())
-        })
-        
-    except Exception as e:
-        return jsonify({
-            "database_status": "❌ Error",
-            "error": str(e)
-        }), 500
-      
-#ROUTE TO SEE ALL USERS IN THE DATABASE    
-@app.route('/debug-users')
-def debug_users():
-    """Debug route to check all users in database"""
-    try:
-        users = User.query.all()
-        
-        users_data = []
-        for user in users:
-            users_data.append({
-                "id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "phone": user.phone,
-                "created_at": user.created_at.isoformat() if user.created_at else None,
-                "is_active": user.is_active
-            })
-        
-        return jsonify({
-            "total_users": len(users),
-            "users": users_data
-        })
-        
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-#ROUTE FOR EDITING SCHOOLS ON THE ADMIN DASHBOARD
-@app.route('/admin/edit/<int:id>', methods=['POST'])
-def update_school_form(id):
-    print(f"🔄 EDITING SCHOOL ID: {id}")
-    
-    school = School.query.get_or_404(id)
-    print(f"📝 FOUND SCHOOL TO EDIT: {school.name}")
-    
-    # Update fields from form inputs
-    school.name = request.form.get('name', school.name)
-    school.region = request.form.get('region', school.region)
-    school.level = request.form.get('level', school.level)
-    school.description = request.form.get('description', school.description)
-    school.contact = request.form.get('contact', school.contact)
-    school.accessibility = request.form.get('accessibility', school.accessibility)
-    school.fee_structure = request.form.get('fee_structure', school.fee_structure)
-    
-    print(f"UPDATED DATA: {school.name}, {school.region}")
-
-    # Handle image upload for edit
-    if 'school_image' in request.files:
-        file = request.files['school_image']
-        if file and file.filename != '' and allowed_file(file.filename):
-            print(f"NEW IMAGE UPLOADED: {file.filename}")
-            
-            # Delete old image if it exists and isn't default
-            if school.image_url and school.image_url != "/static/images/default-school.jpg":
-                try:
-                    old_image_path = school.image_url.replace('/static/', 'static/')
-                    if os.path.exists(old_image_path):
-                        os.remove(old_image_path)
-                        print(f"DELETED OLD IMAGE: {old_image_path}")
-                except Exception as e:
-                    print(f"Could not delete old image: {e}")
-            
-            # Save new image
-            filename = secure_filename(file.filename)
-            unique_filename = f"school_{id}_{int(time.time())}_{filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            
-            file.save(file_path)
-            school.image_url = f"/static/images/schools/{unique_filename}"
-            print(f"NEW IMAGE SAVED: {school.image_url}")
-    
-    try:
-        db.session.commit()
-        print("SCHOOL UPDATED SUCCESSFULLY!")
-    except Exception as e:
-        print(f"❌ UPDATE ERROR: {str(e)}")
-        db.session.rollback()
-    
-    return redirect('/admin-dashboard')
-
-# Add this route to app.py for database migration
-@app.route('/update-feedback-principal-replies')
-def update_feedback_principal_replies():
-    """Emergency route to update Feedback model with principal reply fields"""
-    try:
-        with app.app_context():
-            db.create_all()
-        return "✅ Feedback model updated with principal_reply and principal_reply_date fields!"
-    except Exception as e:
-        return f"❌ Error: {str(e)}"
-
-# Dev helper: init-db route 
-@app.route('/init-db', methods=['GET'])
-def init_db_route():
-    init_db(seed=False)  # Changed to False
-    return jsonify({"message": "Database initialized (NO sample data). Default admin: admin/admin123"}), 200
-
-#EMERGENCY RESET.
-@app.route('/emergency-db-reset', methods=['GET'])
-def emergency_db_reset():
-    """EMERGENCY: Reset database with fixed models"""
-    try:
-        print("🚨 EMERGENCY DATABASE RESET...")
-        
-        # Drop all tables
-        db.drop_all()
-        
-        # Recreate with fixed models
-        db.create_all()
-        
-        # Recreate admin user
-        admin = Admin(username='admin')
-        admin.set_password('admin123')
-        db.session.add(admin)
-        db.session.commit()
-        
-        print("✅ EMERGENCY RESET COMPLETE!")
-        return jsonify({"message": "Database reset successfully. Principal registration should work now."}), 200
-        
-    except Exception as e:
-        print(f"❌ RESET FAILED: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+            ensure_columns()
+            ensure_indexes()
+        # Forked workers must not inherit the connections setup opened
+        db.engine.dispose()
+        db_routing.dispose()
+    return app
+
+
+def prefork(app):
+    """Warm up `app` in the gunicorn master right before it forks workers
+
+    Builds what every worker would otherwise build for itself on its first
+    requests (URL map, compiled templates), closes pooled connections, and
+    moves everything allocated so far into the GC's permanent generation:
+    collections then never touch those objects' headers, so the pages stay
+    shared with the master instead of being copied into each worker.
+    """
+    app.url_map.update()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    with app.app_context():
+        db.engine.dispose()
+        db_routing.dispose()
+    gc.collect()
+    gc.freeze()
 
-@app.route('/debug-add-school', methods=['POST'])
-def debug_add_school():
-    """Debug version of add school to see the exact error"""
-    try:
-        print("🔄 DEBUG ADD SCHOOL CALLED")
-        print("Form data:", request.form)
-        print("Files:", request.files)
-        
-        # Get form data
-        name = request.form.get('name')
-        region = request.form.get('region')
-        level = request.form.get('level')
-        
-        print(f"📝 Form fields - Name: {name}, Region: {region}, Level: {level}")
-        
-        # Basic validation
-        if not name or not region:
-            return jsonify({"error": "Name and region are required"}), 400
-        
-        # Create school with minimal fields
-        new_school = School(
-            name=name,
-            region=region,
-            level=level,
-            description=request.form.get('description', ''),
-            contact=request.form.get('contact', ''),
-            accessibility=request.form.get('accessibility', ''),
-            fee_structure=request.form.get('fee_structure', ''),
-            image_url="/static/images/default-school.jpg"  # Default image for now
-        )
-        
-        print(f"🎯 Creating school: {new_school.name}")
-        
-        db.session.add(new_school)
-        db.session.commit()
-        
-        print(f"✅ SCHOOL ADDED SUCCESSFULLY! ID: {new_school.id}")
-        return jsonify({"success": True, "school_id": new_school.id}), 200
-        
-    except Exception as e:
-        print(f"❌ DEBUG ADD SCHOOL ERROR: {str(e)}")
-        import traceback
-        print(f"🔍 FULL TRACEBACK: {traceback.format_exc()}")
-        return jsonify({"error": str(e)}), 500
-    
-#ROUTE TO GENERATE REPORT
-@app.route('/api/admin/generate-report', methods=['POST'])
-def generate_system_report():
-    """Generate comprehensive system report in PDF format"""
-    if not session.get('admin_logged_in'):
-        return jsonify({"error": "Unauthorized"}), 401
-    
-    try:
-        data = request.json or {}
-        date_range = data.get('date_range', 'all')  # all, week, month, quarter
-        
-        print(f"📊 Generating system report for period: {date_range}")
-        
-        # Collect report data
-        report_data = collect_report_data(date_range)
-        
-        # Generate PDF report
-        pdf_response = generate_pdf_report(report_data)
-        
-        print(f"✅ Report generated successfully: {report_data['report_id']}")
-        return pdf_response
-        
-    except Exception as e:
-        print(f"❌ Report generation error: {str(e)}")
-        import traceback
-        print(f"🔍 FULL TRACEBACK: {traceback.format_exc()}")
-        return jsonify({"error": f"Report generation failed: {str(e)}"}), 500
 
 # ---------------------
 # Run
 # ---------------------
 if __name__ == '__main__':
-    # Create DB if missing
-    if not os.path.exists(os.path.join(BASE_DIR, 'eduquest.db')):
-        with app.app_context():
-            init_db(seed=True)
-    app.run(debug=True)
\ No newline at end of file
+    app = create_app()  # creates the database on first run
+    app.run(debug=True)
@@ -0,0 +1,137 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from flask import g, has_request_context, request
+
+# ---------------------
+# Structured Logging
+# ---------------------
+# One JSON object per line on stdout, written by a QueueListener thread:
+# request threads only put the record on an in-memory queue and never wait on
+# log I/O. Every record carries the request id (the incoming X-Request-ID or a
+# new one, echoed back on the response), and keyword fields passed as
+# `extra={...}` become JSON keys. DEBUG records are sampled
+# (LOG_DEBUG_SAMPLE_RATE); extra={'sample_rate': 0.01} samples any record.
+#   log = app_logging.get_logger('feedback')
+#   log.info("feedback submitted", extra={'feedback_id': 7})
+
+LOGGER_NAME = 'eduquest'
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_handler = None
+
+
+def get_logger(name=None):
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _STANDARD_ATTRS)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestQueueHandler(logging.handlers.QueueHandler):
+    """Samples, tags and enqueues records in the calling thread; formatting happens in the listener"""
+
+    def __init__(self, log_queue, debug_sample_rate=1.0):
+        super().__init__(log_queue)
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record):
+        rate = getattr(record, 'sample_rate', None)
+        if rate is None and record.levelno <= logging.DEBUG:
+            rate = self.debug_sample_rate
+        if rate is not None and rate < 1 and random.random() >= rate:
+            return False
+        return super().filter(record)
+
+    def prepare(self, record):
+        # Only what depends on this thread happens here: the message, the
+        # traceback text and the request id. JSON encoding is left to the listener.
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if has_request_context() and 'request_id' in g:
+            record.request_id = g.request_id
+        return record
+
+
+def _start_listener(handler):
+    global _listener, _handler
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+    handler.queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=False)
+    _listener.start()
+    _handler = handler
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # drains what is already queued
+        _listener = None
+
+
+def _restart_after_fork():
+    # The listener thread doesn't survive a fork (gunicorn workers, report pool processes)
+    if _listener is not None:
+        _start_listener(_handler)
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+atexit.register(_stop_listener)
+
+
+def request_id(incoming=''):
+    """The incoming X-Request-ID when it is well-formed, else a new one"""
+    return incoming if _VALID_REQUEST_ID.match(incoming) else uuid4().hex
+
+
+def _assign_request_id():
+    g.request_id = request_id(request.headers.get(REQUEST_ID_HEADER, ''))
+
+
+def _echo_request_id(response):
+    if 'request_id' in g:
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+    return response
+
+
+def init_app(app):
+    logger = get_logger()
+    logger.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+    logger.propagate = False
+    handler = RequestQueueHandler(None, app.config.get('LOG_DEBUG_SAMPLE_RATE', 1.0))
+    logger.handlers[:] = [handler]
+    _stop_listener()  # a previous app's
+    _start_listener(handler)
+
+    app.before_request(_assign_request_id)
+    app.after_request(_echo_request_id)
@@ -0,0 +1,412 @@
+import asyncio
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, quote
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import make_url
+from werkzeug.http import http_date
+from werkzeug.utils import get_content_type
+from werkzeug.wrappers import Request
+
+import app_logging
+import compression
+import events
+import metrics
+import report_exports
+import report_jobs
+import reports
+import sqlite_profile
+import versions
+from app import create_app
+from feedback import FEEDBACK_COLUMNS
+from models import db, School, Principal, Feedback, DataVersion
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError as e:
+    raise ImportError("The ASGI mode needs a2wsgi and an ASGI server: pip install a2wsgi uvicorn") from e
+
+try:
+    import aiosqlite
+except ImportError:  # optional: sqlite3 connections on a thread pool
+    aiosqlite = None
+
+# ---------------------
+# ASGI Mode
+# ---------------------
+#   uvicorn asgi:app --workers 4
+# An alternative to the WSGI deployment (wsgi.py) for long-lived and slow
+# connections. The I/O-bound GET routes below run as async handlers on the
+# event loop, reading through a small pool of read-only aiosqlite
+# connections, so an open event stream or a slow download costs a coroutine
+# instead of a worker thread. Every other request goes to the Flask app on a
+# thread pool (a2wsgi). CPU work stays off the loop: JSON encoding and
+# compression run on a thread pool here, password hashing on passwords'
+# executor and report rendering in report_jobs' process pool.
+# The async routes return the same JSON as their Flask views (same Core
+# selects, decoded the way SQLAlchemy decodes them) with the same
+# compression, CORS, X-Request-ID and metrics.
+
+log = app_logging.get_logger('asgi')
+
+_dialect = sqlite.dialect()
+
+
+class Query:
+    """A Core select compiled once for sqlite3; rows are decoded like SQLAlchemy's"""
+
+    def __init__(self, statement):
+        self.compiled = statement.compile(dialect=_dialect)
+        self.sql = str(self.compiled)
+        self.keys = tuple(statement.selected_columns.keys())
+        processors = [column.type.dialect_impl(_dialect).result_processor(_dialect, None)
+                      for column in statement.selected_columns]
+        self.processors = [(i, process) for i, process in enumerate(processors) if process is not None]
+
+    def args(self, **params):
+        values = self.compiled.construct_params(params)
+        return tuple(values[name] for name in self.compiled.positiontup)
+
+    def records(self, rows, **extra):
+        """Rows as dicts keyed by column label (fast_json.records() for raw rows)"""
+        keys, processors = self.keys, self.processors
+        result = []
+        for row in rows:
+            if processors:
+                row = list(row)
+                for i, process in processors:
+                    row[i] = process(row[i])
+            record = dict(zip(keys, row))
+            record.update(extra)
+            result.append(record)
+        return result
+
+
+# The selects of the Flask views these handlers stand in for
+SCHOOLS = Query(db.select(
+    School.id, School.name, School.region, School.level, School.contact, School.description,
+    School.accessibility, School.fee_structure, School.image_url
+))
+ALL_SCHOOLS = Query(db.select(School.id, School.name, School.region, School.level, School.contact))
+FEEDBACK = Query(db.select(*FEEDBACK_COLUMNS).order_by(Feedback.created_at.desc()))
+SCHOOL_FEEDBACK = Query(
+    db.select(*FEEDBACK_COLUMNS).where(Feedback.school_id == db.bindparam('school_id'))
+    .order_by(Feedback.created_at.desc())
+)
+PRINCIPAL_SCHOOL = Query(db.select(Principal.school_id).where(Principal.id == db.bindparam('principal_id')))
+DATA_VERSION = Query(db.select(DataVersion.version).where(DataVersion.name == db.bindparam('name')))
+
+
+def read_only_dsn(uri):
+    """sqlite:///path -> sqlite3 URI opening the same file read-only"""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        raise RuntimeError("The ASGI mode needs a SQLite database file")
+    return f"file:{quote(url.database)}?mode=ro"
+
+
+class AsyncDatabase:
+    """A few read-only connections shared by the async handlers
+
+    aiosqlite gives each connection its own thread; without it, plain sqlite3
+    connections are used from a thread pool of the same size.
+    """
+
+    def __init__(self, dsn, pragmas, size):
+        self.dsn = dsn
+        self.pragmas = pragmas
+        self.size = size
+        self._idle = None
+        self._connections = []
+        self._executor = None if aiosqlite else ThreadPoolExecutor(size, thread_name_prefix='asgi-db')
+
+    def _connect_sync(self):
+        conn = sqlite3.connect(self.dsn, uri=True, check_same_thread=False)
+        sqlite_profile.apply(conn, self.pragmas)
+        return conn
+
+    async def _connect(self):
+        if aiosqlite:
+            conn = await aiosqlite.connect(self.dsn, uri=True)
+            for name, value in self.pragmas.items():
+                await conn.execute(f"PRAGMA {name}={value}")
+        else:
+            conn = await asyncio.get_running_loop().run_in_executor(self._executor, self._connect_sync)
+        return conn
+
+    async def _acquire(self):
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        if self._idle.empty() and len(self._connections) < self.size:
+            self._connections.append(None)  # reserve the slot while connecting
+            try:
+                conn = await self._connect()
+            except Exception:
+                self._connections.remove(None)
+                raise
+            self._connections[self._connections.index(None)] = conn
+            return conn
+        return await self._idle.get()
+
+    async def fetch(self, query, **params):
+        args = query.args(**params)
+        conn = await self._acquire()
+        try:
+            if aiosqlite:
+                async with conn.execute(query.sql, args) as cursor:
+                    return await cursor.fetchall()
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: conn.execute(query.sql, args).fetchall()
+            )
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def close(self):
+        for conn in self._connections:
+            if conn is None:
+                continue
+            if aiosqlite:
+                await conn.close()
+            else:
+                conn.close()
+        self._connections = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+class Exchange:
+    """One request on the async path and its response"""
+
+    def __init__(self, scope, receive, send, endpoint):
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self.endpoint = endpoint
+        self.headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+        self.request_id = app_logging.request_id(self.headers.get(app_logging.REQUEST_ID_HEADER.lower(), ''))
+        self.started = time.perf_counter()
+        self.status = None
+
+    def arg(self, name, default=None):
+        values = parse_qs(self.scope.get('query_string', b'').decode('latin-1')).get(name)
+        return values[0] if values else default
+
+    async def start(self, status, content_type, headers=None):
+        self.status = status
+        headers = dict(headers or {})
+        # What flask_cors and app_logging add to the Flask responses
+        origin = self.headers.get('origin')
+        vary = ['Origin'] if origin else []
+        if 'Vary' in headers:
+            vary.append(headers.pop('Vary'))
+        headers.update({
+            'Content-Type': content_type,
+            'Access-Control-Allow-Origin': origin or '*',
+            app_logging.REQUEST_ID_HEADER: self.request_id,
+        })
+        if vary:
+            headers['Vary'] = ', '.join(vary)
+        await self.send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+        })
+        # Like the Flask hooks: timed up to the response, not the end of a stream
+        labels = {'endpoint': self.endpoint, 'method': self.scope['method']}
+        metrics.observe('eduquest_http_request_duration_seconds', time.perf_counter() - self.started, labels)
+        metrics.inc('eduquest_http_requests_total', dict(labels, status=str(status)))
+
+    async def write(self, body, more=True):
+        await self.send({'type': 'http.response.body', 'body': body, 'more_body': more})
+
+    async def respond(self, status, content_type, body, headers=None):
+        await self.start(status, content_type, dict(headers or {}, **{'Content-Length': str(len(body))}))
+        await self.write(body, more=False)
+
+    async def disconnected(self):
+        while (await self.receive())['type'] != 'http.disconnect':
+            pass
+
+
+class AsyncApp:
+    """ASGI app: the async routes below, every other request through the Flask app"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.config = flask_app.config
+        self.encode = flask_app.extensions['fast_json']
+        self.wsgi = WSGIMiddleware(flask_app, workers=self.config['ASGI_WSGI_THREADS'])
+        self.cpu = ThreadPoolExecutor(self.config['ASGI_CPU_WORKERS'], thread_name_prefix='asgi-cpu')
+        # journal_mode belongs to the database file and can't be set read-only
+        pragmas = {k: v for k, v in flask_app.extensions.get('sqlite_pragmas', {}).items() if k != 'journal_mode'}
+        self.db = AsyncDatabase(read_only_dsn(self.config['SQLALCHEMY_DATABASE_URI']), pragmas,
+                                self.config['ASGI_DB_POOL_SIZE'])
+        # (path, Flask endpoint it stands in for - the metrics label, handler); GET only
+        self.routes = [
+            (re.compile(r'/api/schools'), 'public.api_schools', self.schools),
+            (re.compile(r'/api/all-schools'), 'feedback.all_schools', self.all_schools),
+            (re.compile(r'/api/feedback'), 'feedback.get_feedbacks', self.feedback),
+            (re.compile(r'/api/schools/(?P<school_id>\d+)/feedback'), 'feedback.get_school_feedback',
+             self.school_feedback),
+            (re.compile(r'/api/principal/feedback'), 'feedback.get_principal_feedback', self.principal_feedback),
+            (re.compile(r'/api/admin/events'), 'admin.admin_events', self.events),
+            (re.compile(r'/api/admin/reports/(?P<job_id>[^/]+)/download'), 'reports.download_report',
+             self.download_report),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            for pattern, endpoint, handler in self.routes:
+                match = pattern.fullmatch(scope['path'])
+                if match:
+                    return await self.dispatch(Exchange(scope, receive, send, endpoint), handler, match.groupdict())
+        await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.db.close()
+                self.cpu.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def dispatch(self, exchange, handler, params):
+        metrics.inc('eduquest_http_requests_in_flight', amount=1)
+        try:
+            await handler(exchange, **params)
+        except Exception as e:
+            log.exception("async handler failed",
+                          extra={'request_id': exchange.request_id, 'endpoint': exchange.endpoint})
+            if exchange.status is None:
+                await self.json(exchange, {"error": str(e)}, 500)
+        finally:
+            metrics.inc('eduquest_http_requests_in_flight', amount=-1)
+            asyncio.get_running_loop().run_in_executor(None, metrics.flush)
+
+    # Helpers
+    async def run(self, fn, *args):
+        """Blocking I/O (files, the session store) on the loop's default executor"""
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def _open_session(self, cookie):
+        # open_session only reads the cookies, so a bare environ will do
+        request = Request({'HTTP_COOKIE': cookie})
+        return self.flask_app.session_interface.open_session(self.flask_app, request) or {}
+
+    async def session(self, exchange):
+        return await self.run(self._open_session, exchange.headers.get('cookie', ''))
+
+    async def json(self, exchange, data, status=200):
+        await exchange.respond(status, 'application/json', self.encode(data), {'Vary': 'Accept-Encoding'})
+
+    def _render(self, query, rows, extra, accept_encoding):
+        data = self.encode(query.records(rows, **extra))
+        return compression.encode_body(data, 'application/json', accept_encoding)
+
+    async def records(self, exchange, query, rows, **extra):
+        body, headers = await asyncio.get_running_loop().run_in_executor(
+            self.cpu, self._render, query, rows, extra, exchange.headers.get('accept-encoding', '')
+        )
+        await exchange.respond(200, 'application/json', body, headers)
+
+    # Handlers
+    async def schools(self, exchange):
+        await self.records(exchange, SCHOOLS, await self.db.fetch(SCHOOLS))
+
+    async def all_schools(self, exchange):
+        await self.records(exchange, ALL_SCHOOLS, await self.db.fetch(ALL_SCHOOLS))
+
+    async def feedback(self, exchange):
+        await self.records(exchange, FEEDBACK, await self.db.fetch(FEEDBACK))
+
+    async def school_feedback(self, exchange, school_id):
+        school_id = int(school_id)
+        rows = await self.db.fetch(SCHOOL_FEEDBACK, school_id=school_id)
+        await self.records(exchange, SCHOOL_FEEDBACK, rows, school_name=f"School {school_id}")
+
+    async def principal_feedback(self, exchange):
+        session = await self.session(exchange)
+        if not session.get('principal_logged_in'):
+            return await self.json(exchange, {'error': 'Unauthorized'}, 401)
+        rows = await self.db.fetch(PRINCIPAL_SCHOOL, principal_id=session.get('principal_id'))
+        if not rows or not rows[0][0]:
+            return await self.json(exchange, {'error': 'Principal not assigned to a school'}, 400)
+        school_rows = await self.db.fetch(SCHOOL_FEEDBACK, school_id=rows[0][0])
+        await self.records(exchange, SCHOOL_FEEDBACK, school_rows)
+
+    async def events(self, exchange):
+        session = await self.session(exchange)
+        if not session.get('admin_logged_in'):
+            return await self.json(exchange, {"error": "Unauthorized"}, 401)
+
+        stream = events.VersionStream(self.config)
+        await exchange.start(200, get_content_type(events.MIMETYPE, 'utf-8'), events.HEADERS)
+        await exchange.write(stream.opening())
+        disconnected = asyncio.ensure_future(exchange.disconnected())
+        try:
+            while not stream.expired:
+                rows = await self.db.fetch(DATA_VERSION, name=versions.GLOBAL)
+                chunk = stream.chunk((rows[0][0] if rows else None) or 0)
+                if chunk:
+                    await exchange.write(chunk)
+                done, _ = await asyncio.wait({disconnected}, timeout=stream.interval)
+                if done:
+                    return
+            await exchange.write(b'', more=False)
+        finally:
+            disconnected.cancel()
+
+    def _report_job(self, job_id):
+        reports.ensure_setup(self.flask_app)  # report_jobs needs REPORT_CACHE_DIR
+        return report_jobs.get_job(job_id)
+
+    async def download_report(self, exchange, job_id):
+        session = await self.session(exchange)
+        if not session.get('admin_logged_in'):
+            return await self.json(exchange, {"error": "Unauthorized"}, 401)
+
+        job = await self.run(self._report_job, job_id)
+        if not job:
+            return await self.json(exchange, {"error": "Report job not found"}, 404)
+        if job['status'] != report_jobs.DONE:
+            return await self.json(exchange, {"error": f"Report is {job['status']}"}, 409)
+
+        formats = job.get('formats', ['pdf'])
+        fmt = exchange.arg('format', formats[0])
+        if fmt not in formats:
+            return await self.json(exchange, {"error": f"This report was not generated as {fmt}"}, 404)
+        try:
+            file = await self.run(open, report_jobs.output_path(job, fmt), 'rb')
+        except FileNotFoundError:
+            return await self.json(exchange, {"error": "Report expired, please generate it again"}, 410)
+
+        # Streamed from disk a chunk at a time; a slow client only holds a coroutine
+        try:
+            stat = os.fstat(file.fileno())
+            mimetype, extension = report_exports.FORMATS[fmt]
+            finished = datetime.fromtimestamp(job['finished_at'] or time.time())
+            await exchange.start(200, get_content_type(mimetype, 'utf-8'), {
+                'Content-Length': str(stat.st_size),
+                'Content-Disposition': f"attachment; filename=eduquest_report_{finished:%Y%m%d_%H%M%S}.{extension}",
+                'Last-Modified': http_date(stat.st_mtime),
+                'Cache-Control': 'no-cache',
+            })
+            while chunk := await self.run(file.read, self.config['ASGI_DOWNLOAD_CHUNK']):
+                await exchange.write(chunk)
+            await exchange.write(b'', more=False)
+        finally:
+            file.close()
+
+
+# ASGI entry point: uvicorn asgi:app
+app = AsyncApp(create_app())
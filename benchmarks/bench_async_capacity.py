@@ -0,0 +1,234 @@
+"""Concurrent-connection capacity: the sync (gunicorn) deployment vs the ASGI mode (uvicorn asgi:app).
+
+Usage:
+    python benchmarks/bench_async_capacity.py [--streams 0,50,200,1000] [--seconds 10]
+                                              [--clients 8] [--workers 2] [--threads 4]
+                                              [--schools 200] [--feedback 20000]
+                                              [--modes sync,async] [--output bench_async_capacity.json]
+
+Seeds a synthetic_data database in a scratch data directory (like
+bench_http_load), then for each mode and each --streams level starts a fresh
+server, logs in as the admin and opens that many /api/admin/events
+server-sent event streams - long-lived, mostly idle connections, like
+dashboards left open. With the streams held open, --clients clients send
+short requests for --seconds:
+
+    GET /api/schools                  async handler in the ASGI mode
+    GET /api/schools/<id>/feedback    async handler in the ASGI mode
+    GET /schools                      Flask view (a2wsgi thread pool) in the ASGI mode
+
+    sync   gunicorn -c gunicorn.conf.py -w <workers> --threads <threads> wsgi:app
+    async  uvicorn asgi:app --workers <workers>
+
+A stream counts as established when its first event arrives within
+--timeout seconds; a request is an error when it is not a 200 within
+--timeout. In the sync mode every open stream holds one of the
+workers x threads request threads, so streams past that number wait in the
+accept queue and, once the threads are taken, so do the short requests.
+Results are printed as a table and written to --output as JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from synthetic_data import PASSWORD
+from bench_http_load import free_port, git_commit, percentile, seed
+
+HOST = '127.0.0.1'
+
+
+# ---------------------
+# Servers
+# ---------------------
+def start_server(mode, port, workers, threads, data_dir):
+    env = dict(os.environ, EDUQUEST_DATA_DIR=data_dir, PYTHONUNBUFFERED='1')
+    if mode == 'sync':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+                   '--threads', str(threads), '-b', f"{HOST}:{port}", 'wsgi:app']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--workers', str(workers),
+                   '--host', HOST, '--port', str(port), '--no-access-log']
+    log = open(os.path.join(data_dir, f"server_{mode}.log"), 'a')
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{mode} server exited, see {log.name}")
+        try:
+            urllib.request.urlopen(f"http://{HOST}:{port}/api/schools/1", timeout=2).read()
+            return process
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start, see {log.name}")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def admin_cookie(port):
+    request = urllib.request.Request(
+        f"http://{HOST}:{port}/api/admin/login",
+        data=json.dumps({'username': 'admin', 'password': PASSWORD}).encode(),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return '; '.join(value.split(';', 1)[0] for value in response.headers.get_all('Set-Cookie'))
+
+
+# ---------------------
+# Clients
+# ---------------------
+async def open_stream(port, cookie, timeout):
+    """An events stream that sent its first event, or None"""
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(HOST, port), timeout)
+        writer.write(f"GET /api/admin/events HTTP/1.1\r\nHost: {HOST}\r\nCookie: {cookie}\r\n\r\n".encode())
+        head = await asyncio.wait_for(reader.readuntil(b'event: version'), timeout)
+        if head.startswith(b'HTTP/1.1 200'):
+            return writer
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError):
+        pass
+    if writer is not None:
+        writer.close()
+    return None
+
+
+async def get(port, path, timeout):
+    """Status of one GET on a fresh connection (None on timeout/connection error)"""
+    async def exchange():
+        reader, writer = await asyncio.open_connection(HOST, port)
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\nAccept-Encoding: gzip\r\n"
+                         f"Connection: close\r\n\r\n".encode())
+            response = await reader.read(-1)
+            return int(response.split(b' ', 2)[1])
+        finally:
+            writer.close()
+    try:
+        return await asyncio.wait_for(exchange(), timeout)
+    except (asyncio.TimeoutError, OSError, IndexError, ValueError):
+        return None
+
+
+async def probe(port, clients, seconds, schools, timeout, seed_value):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(index):
+        nonlocal errors
+        rng = random.Random(seed_value + index)
+        while time.perf_counter() < deadline:
+            path = rng.choice(['/api/schools', f"/api/schools/{rng.randint(1, schools)}/feedback", '/schools'])
+            start = time.perf_counter()
+            status = await get(port, path, timeout)
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def measure(port, cookie, streams, args):
+    opened = await asyncio.gather(*(open_stream(port, cookie, args.timeout) for _ in range(streams)))
+    held = [writer for writer in opened if writer is not None]
+    try:
+        latencies, errors, elapsed = await probe(port, args.clients, args.seconds, args.schools,
+                                                 args.timeout, args.seed)
+    finally:
+        for writer in held:
+            writer.close()
+    values = sorted(latencies)
+    return {
+        'streams': streams,
+        'established': len(held),
+        'requests': len(values),
+        'errors': errors,
+        'rps': round((len(values) - errors) / elapsed, 2),
+        'p50_ms': round(percentile(values, 50) * 1000, 2),
+        'p95_ms': round(percentile(values, 95) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--streams', default='0,50,200,1000', help="comma-separated open stream counts")
+    parser.add_argument('--seconds', type=float, default=10, help="short-request load per level")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--timeout', type=float, default=5)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4, help="gunicorn threads per worker (sync mode)")
+    parser.add_argument('--schools', type=int, default=200)
+    parser.add_argument('--feedback', type=int, default=20000)
+    parser.add_argument('--modes', default='sync,async')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='bench_async_capacity.json')
+    args = parser.parse_args()
+    levels = [int(value) for value in args.streams.split(',')]
+    modes = args.modes.split(',')
+
+    # Each stream is a socket on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if max(levels) * 2 + 100 > hard:
+        print(f"warning: the open file limit ({hard}) is too low for {max(levels)} streams")
+
+    data_dir = tempfile.mkdtemp(prefix='eduquest_capacity_')
+    start = time.perf_counter()
+    seed(data_dir, args.schools, args.feedback, args.seed)
+    print(f"seeded {data_dir} ({args.schools} schools, {args.feedback} feedback) in {time.perf_counter() - start:.1f}s")
+    print(f"{args.workers} workers ({args.threads} threads each in sync mode), "
+          f"{args.clients} clients for {args.seconds:g}s per level\n")
+
+    print(f"{'mode':<6} {'streams':>8} {'open':>6} {'reqs':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    results = []
+    for mode in modes:
+        for streams in levels:
+            # A fresh server per level: the sync mode only frees a thread when a write to a closed stream fails
+            port = free_port()
+            server = start_server(mode, port, args.workers, args.threads, data_dir)
+            try:
+                row = dict(asyncio.run(measure(port, admin_cookie(port), streams, args)), mode=mode)
+            finally:
+                stop_server(server)
+            results.append(row)
+            error_rate = row['errors'] / row['requests'] if row['requests'] else 0.0
+            print(f"{mode:<6} {streams:>8} {row['established']:>6} {row['requests']:>7} {row['rps']:>8.1f} "
+                  f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {error_rate:>7.1%}")
+
+    result = {
+        'commit': git_commit(),
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'config': {key: getattr(args, key) for key in ('streams', 'seconds', 'clients', 'timeout', 'workers',
+                                                        'threads', 'schools', 'feedback', 'modes', 'seed')},
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    print(f"\nwrote {args.output} (server logs in {data_dir})")
+
+
+if __name__ == '__main__':
+    main()
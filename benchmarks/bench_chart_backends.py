@@ -0,0 +1,114 @@
+"""Chart backend benchmark: render time, peak RSS and PDF size per backend.
+
+Usage:
+    python benchmarks/bench_chart_backends.py [--runs 3] [--backends reportlab matplotlib]
+
+Each backend runs in a fresh interpreter so imports and peak RSS are not
+shared. The standard report is built from a synthetic report_data (12 months
+of growth, 47 regions, the usual tables) with an empty chart cache ("cold")
+and then again with the cache populated ("warm").
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+
+def synthetic_report_data(seed=7):
+    rng = random.Random(seed)
+    now = datetime.now()
+    regions = {f"Region {i}": rng.randint(5, 400) for i in range(47)}
+    levels = {'Primary': 5200, 'Secondary': 2100, 'Special Needs': 140, 'College': 380, 'Unknown': 60}
+    statuses = {'pending': 800, 'approved': 1400, 'confirmed': 600, 'declined': 200, 'completed': 2300, 'cancelled': 150}
+    counters = {'new_users': 900, 'feedback_received': 4200, 'admin_replies': 1300, 'principal_replies': 1900}
+    counters.update({f"meetings_{s}": n // 10 for s, n in statuses.items()})
+    return {
+        'report_id': 'EQ-BENCH',
+        'generated_at': now,
+        'date_range': 'month',
+        'users': {'total': 52000, 'active_today': 40, 'new_this_week': 310, 'new_this_month': 900, 'list': []},
+        'schools': {'total': sum(regions.values()), 'by_region': regions, 'by_level': levels},
+        'principals': {'total': 7600, 'active': 7100, 'inactive': 500},
+        'feedback': {'total': 410000, 'with_admin_reply': 120000, 'with_principal_reply': 190000,
+                     'pending_reply': 150000, 'list': []},
+        'meetings': {'total': sum(statuses.values()), 'by_status': statuses, 'list': []},
+        'period': {'start_date': now - timedelta(days=30), 'totals': counters,
+                   'by_region': {r: dict(counters) for r in list(regions)[:10]}},
+        'changes': {'since': now - timedelta(days=30), 'users': 900, 'principals': 40,
+                    'feedback': 4200, 'meetings': 500},
+        'growth': [{'month': f"2026-{m:02d}", 'new_users': rng.randint(300, 1200),
+                    'feedback_received': rng.randint(2000, 6000), 'meetings': rng.randint(100, 700)}
+                   for m in range(1, 13)],
+        'platform': {'total_entities': 0, 'growth_rate': 0, 'engagement_rate': 0}
+    }
+
+
+def child(backend, runs):
+    """Runs inside a fresh interpreter and prints one JSON line"""
+    start = time.perf_counter()
+    from app import create_app
+    import report_builder
+    import report_charts
+    import_time = time.perf_counter() - start
+
+    app = create_app({
+        'REPORT_CHART_BACKEND': backend,
+        'REPORT_CACHE_DIR': tempfile.mkdtemp(prefix='eduquest_charts_')
+    })
+    report_charts.init_app(app)
+    report_data = synthetic_report_data()
+
+    timings = []
+    size = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        with app.app_context(), report_builder.create_pdf_report(report_data) as pdf:
+            size = pdf.seek(0, os.SEEK_END)
+        timings.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        'backend': backend,
+        'import_s': import_time,
+        'cold_s': timings[0],
+        'warm_s': min(timings[1:]) if len(timings) > 1 else None,
+        'pdf_bytes': size,
+        # ru_maxrss is KiB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'children_peak_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--backends', nargs='*', default=['reportlab', 'matplotlib'])
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.runs)
+        return
+
+    print(f"{'backend':<12} {'cold s':>8} {'warm s':>8} {'peak RSS MB':>12} {'pool RSS MB':>12} {'PDF KB':>8}")
+    for backend in args.backends:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', backend, '--runs', str(args.runs)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        warm = f"{result['warm_s']:.3f}" if result['warm_s'] is not None else '-'
+        print(f"{backend:<12} {result['cold_s']:>8.3f} {warm:>8} {result['peak_rss_mb']:>12.1f} "
+              f"{result['children_peak_rss_mb']:>12.1f} {result['pdf_bytes'] / 1024:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""HTTP load test: the main user journeys against the real app over HTTP.
+
+Usage:
+    python benchmarks/bench_http_load.py [--users 16] [--seconds 30] [--schools 200]
+                                         [--feedback 20000] [--server werkzeug|gunicorn]
+                                         [--workers 4] [--output bench_http_load.json]
+
+Generates a synthetic_data database (--schools schools, --feedback feedback,
+ten users per school, a meeting per ten feedback) in a scratch data
+directory (EDUQUEST_DATA_DIR: database, sessions, report cache), starts the app in a separate process under a real WSGI server
+(werkzeug's threaded server, or gunicorn if installed) and runs --users
+virtual users, each with its own cookie jar, picking journeys by weight:
+
+    browse          GET /schools, GET /api/schools
+    school_details  GET /school/<id>, GET /api/schools/<id>
+    post_feedback   POST /api/feedback
+    book_meeting    POST /api/meetings/book
+    principal       POST /api/principals/login, GET /principal-dashboard
+    admin_report    POST /api/admin/login, POST /api/admin/generate-report, poll the job
+
+Throughput, p50/p95/p99 latency and error rate per step and overall are
+printed and written to --output as JSON (with the git commit), so runs can
+be diffed between commits. A response counts as an error when its status is
+not the one the step expects; redirects are not followed.
+"""
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import synthetic_data
+from synthetic_data import PASSWORD
+
+JOURNEYS = {
+    # journey: weight
+    'browse': 30,
+    'school_details': 35,
+    'post_feedback': 12,
+    'book_meeting': 8,
+    'principal': 10,
+    'admin_report': 5,
+}
+
+
+# ---------------------
+# Seeding and server
+# ---------------------
+def seed(data_dir, schools, feedback_rows, seed_value=42):
+    """Generate the database; returns the ids of the principals that can log in"""
+    path = os.path.join(data_dir, 'eduquest.db')
+    synthetic_data.generate(path, schools, schools * 10, feedback_rows, feedback_rows // 10, seed_value,
+                            progress=lambda message: None)
+    conn = sqlite3.connect(path)
+    principal_ids = [row[0] for row in conn.execute("SELECT id FROM principal WHERE is_active ORDER BY id")]
+    conn.close()
+    return principal_ids
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def serve(port):
+    """Runs in the server process: the app under werkzeug's threaded WSGI server"""
+    from werkzeug.serving import make_server
+    from wsgi import app
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def start_server(server, port, workers, data_dir):
+    env = dict(os.environ, EDUQUEST_DATA_DIR=data_dir, PYTHONUNBUFFERED='1')
+    if server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+                   '--threads', '4', '-b', f"127.0.0.1:{port}", 'wsgi:app']
+    else:
+        command = [sys.executable, os.path.abspath(__file__), '--serve', '--port', str(port)]
+    log = open(os.path.join(data_dir, 'server.log'), 'w')
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited, see {log.name}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/schools/1", timeout=2).read()
+            return process
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"server did not start, see {log.name}")
+
+
+# ---------------------
+# Virtual users
+# ---------------------
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class VirtualUser:
+    def __init__(self, base_url, schools, principal_ids, rng, record):
+        self.base_url = base_url
+        self.schools = schools
+        self.principal_ids = principal_ids
+        self.rng = rng
+        self.record = record
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def request(self, step, method, path, expect=200, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            req.add_header('Content-Type', 'application/json')
+        start = time.perf_counter()
+        body, status = b'', None
+        try:
+            with self.opener.open(req, timeout=60) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            status = 'connection'
+        expected = expect if isinstance(expect, tuple) else (expect,)
+        self.record(step, time.perf_counter() - start, status in expected)
+        try:
+            return json.loads(body) if body[:1] in (b'{', b'[') else None
+        except ValueError:
+            return None
+
+    def school_id(self):
+        return self.rng.randint(1, self.schools)
+
+    def browse(self):
+        self.request('GET /schools', 'GET', '/schools')
+        self.request('GET /api/schools', 'GET', '/api/schools')
+
+    def school_details(self):
+        school_id = self.school_id()
+        self.request('GET /school/<id>', 'GET', f"/school/{school_id}")
+        self.request('GET /api/schools/<id>', 'GET', f"/api/schools/{school_id}")
+
+    def post_feedback(self):
+        self.request('POST /api/feedback', 'POST', '/api/feedback', 201, {
+            'school_id': self.school_id(), 'name': 'Load Test', 'email': 'load@example.com',
+            'message': 'Feedback from the load test'
+        })
+
+    def book_meeting(self):
+        school_id = self.school_id()
+        self.request('POST /api/meetings/book', 'POST', '/api/meetings/book', 201, {
+            'school_id': school_id, 'principal_id': school_id, 'user_name': 'Load Test',
+            'user_email': 'load@example.com', 'purpose': 'School visit',
+            'preferred_date': (datetime.now() + timedelta(days=7)).isoformat()
+        })
+
+    def principal(self):
+        principal_id = self.rng.choice(self.principal_ids)
+        self.request('POST /api/principals/login', 'POST', '/api/principals/login', 200, {
+            'email': f"principal{principal_id}@example.com", 'password': PASSWORD
+        })
+        self.request('GET /principal-dashboard', 'GET', '/principal-dashboard')
+
+    def admin_report(self):
+        self.request('POST /api/admin/login', 'POST', '/api/admin/login', 200,
+                     {'username': 'admin', 'password': PASSWORD})
+        job = self.request('POST /api/admin/generate-report', 'POST', '/api/admin/generate-report', (200, 202),
+                           {'date_range': self.rng.choice(['week', 'month', 'all'])})
+        while job and job.get('status') in ('queued', 'running'):
+            time.sleep(0.2)
+            job = self.request('GET /api/admin/reports/<id>', 'GET', job['status_url'])
+        if job and job.get('download_url'):
+            self.request('GET report download', 'GET', job['download_url'])
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    # Nearest rank
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(latencies, errors, elapsed):
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        'requests': count,
+        'errors': errors,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'rps': round(count / elapsed, 2),
+        'mean_ms': round(sum(values) / count * 1000, 2) if count else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 2),
+        'p95_ms': round(percentile(values, 95) * 1000, 2),
+        'p99_ms': round(percentile(values, 99) * 1000, 2),
+    }
+
+
+def run_load(base_url, users, seconds, schools, principal_ids, seed_value):
+    latencies, errors = {}, {}
+    lock = threading.Lock()
+
+    def record(step, latency, ok):
+        with lock:
+            latencies.setdefault(step, []).append(latency)
+            errors[step] = errors.get(step, 0) + (not ok)
+
+    names, weights = list(JOURNEYS), list(JOURNEYS.values())
+    deadline = time.perf_counter() + seconds
+
+    def user_loop(index):
+        rng = random.Random(seed_value + index)
+        user = VirtualUser(base_url, schools, principal_ids, rng, record)
+        while time.perf_counter() < deadline:
+            getattr(user, rng.choices(names, weights)[0])()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=user_loop, args=(i,)) for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    steps = {step: summarize(values, errors[step], elapsed) for step, values in sorted(latencies.items())}
+    overall = summarize([v for values in latencies.values() for v in values], sum(errors.values()), elapsed)
+    return steps, overall, elapsed
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--schools', type=int, default=200)
+    parser.add_argument('--feedback', type=int, default=20000)
+    parser.add_argument('--server', choices=['werkzeug', 'gunicorn'], default='werkzeug')
+    parser.add_argument('--workers', type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='bench_http_load.json')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    data_dir = tempfile.mkdtemp(prefix='eduquest_load_')
+    start = time.perf_counter()
+    principal_ids = seed(data_dir, args.schools, args.feedback, args.seed)
+    print(f"seeded {data_dir} ({args.schools} schools, {args.feedback} feedback) in {time.perf_counter() - start:.1f}s")
+
+    port = free_port()
+    server = start_server(args.server, port, args.workers, data_dir)
+    try:
+        print(f"{args.server} on port {port}: {args.users} users for {args.seconds:g}s")
+        steps, overall, elapsed = run_load(f"http://127.0.0.1:{port}", args.users, args.seconds,
+                                           args.schools, principal_ids, args.seed)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    print(f"\n{'step':<34} {'reqs':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for step, s in list(steps.items()) + [('TOTAL', overall)]:
+        print(f"{step:<34} {s['requests']:>7} {s['rps']:>8.1f} {s['p50_ms']:>8.1f} "
+              f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['error_rate']:>7.1%}")
+
+    result = {
+        'commit': git_commit(),
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'config': {key: getattr(args, key) for key in ('users', 'seconds', 'schools', 'feedback',
+                                                        'server', 'workers', 'seed')},
+        'elapsed_s': round(elapsed, 2),
+        'overall': overall,
+        'steps': steps,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    print(f"\nwrote {args.output} (server log: {os.path.join(data_dir, 'server.log')})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""List endpoint serialization benchmark: rows/second, ORM + jsonify vs Core tuples + fast_json.
+
+Usage:
+    python benchmarks/bench_json_lists.py [--rows 10000] [--repeat 10] [--seed 42]
+
+Builds one feedback list response of --rows rows (the /api/feedback payload)
+from a synthetic_data database, --repeat times per path, and reports the
+best time as rows/second:
+  * orm + jsonify       - Feedback.query...all(), to_dict(), Flask's jsonify
+  * orm + <encoder>     - same ORM rows, encoded by fast_json's encoder
+  * core + <encoder>    - fast_json.records() over FEEDBACK_COLUMNS, then the encoder
+Every fast_json encoder is measured (orjson only when installed). The
+response bodies are checked to decode to the same data.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import synthetic_data
+
+
+def best_of(repeat, build):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = build()
+        times.append(time.perf_counter() - start)
+    return min(times), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    path = synthetic_data.dataset(schools=max(args.rows // 100, 10), users=max(args.rows // 10, 10),
+                                  feedback=args.rows, meetings=max(args.rows // 10, 10), seed=args.seed)
+    from flask import jsonify
+    from app import create_app
+    from feedback import FEEDBACK_COLUMNS
+    from models import db, Feedback
+    import fast_json
+
+    # The benchmark database, with sessions/metrics/report files in a scratch dir
+    app = create_app({
+        'DATA_DIR': tempfile.mkdtemp(prefix='eduquest_bench_'),
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(path)
+    })
+
+    def orm_rows():
+        return [f.to_dict() for f in Feedback.query.order_by(Feedback.created_at.desc()).all()]
+
+    def core_rows():
+        return fast_json.records(db.select(*FEEDBACK_COLUMNS).order_by(Feedback.created_at.desc()))
+
+    def orm_jsonify():
+        response = jsonify(orm_rows())
+        db.session.remove()  # a request ends with an empty identity map
+        return response.get_data()
+
+    paths = [('orm + jsonify', orm_jsonify)]
+    for name, encode in fast_json.ENCODERS.items():
+        paths.append((f"orm + {name}", lambda encode=encode: (encode(orm_rows()), db.session.remove())[0]))
+        paths.append((f"core + {name}", lambda encode=encode: encode(core_rows())))
+
+    print(f"{args.rows:,} feedback rows per response, best of {args.repeat}")
+    print(f"{'path':<18} {'ms':>8} {'rows/s':>12} {'speedup':>8}")
+    with app.app_context():
+        reference, baseline = None, None
+        for name, build in paths:
+            build()  # warm caches and the connection pool
+            elapsed, body = best_of(args.repeat, build)
+            data = json.loads(body)
+            if reference is None:
+                reference, baseline = data, elapsed
+            assert data == reference, name
+            print(f"{name:<18} {elapsed * 1000:>8.1f} {args.rows / elapsed:>12,.0f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Password hashing benchmark: logins/second per core at each cost setting.
+
+Usage:
+    python benchmarks/bench_password_hashing.py [--logins 20] [--workers N] [--methods scrypt pbkdf2 ...]
+
+For every preset in passwords.COST_PRESETS (argon2 ones are skipped when
+argon2-cffi is missing) it measures:
+  * per core   - sequential verify() calls on one thread
+  * executor   - the same number of logins submitted concurrently through the
+                 bounded executor with --workers threads
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import passwords
+
+
+def bench_method(name, logins, workers):
+    hashing = passwords.PasswordHashing(method=name, workers=workers)
+    stored = hashing.hash_sync('correct horse battery staple')
+    hashing.needs_rehash(stored)  # warm the cached method prefix
+
+    # One thread, one core
+    start = time.perf_counter()
+    for _ in range(logins):
+        assert hashing.verify_sync(stored, 'correct horse battery staple')
+    per_core = logins / (time.perf_counter() - start)
+
+    # Concurrent requests funnelled through the bounded executor
+    with ThreadPoolExecutor(max_workers=logins) as clients:
+        start = time.perf_counter()
+        results = list(clients.map(lambda _: hashing.verify(stored, 'correct horse battery staple')[0], range(logins)))
+        pooled = logins / (time.perf_counter() - start)
+    assert all(results)
+
+    hashing.shutdown()
+    return hashing.method, per_core, pooled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--methods', nargs='*', default=list(passwords.COST_PRESETS))
+    args = parser.parse_args()
+
+    print(f"{'preset':<12} {'method':<24} {'logins/s/core':>14} {'executor logins/s':>18}")
+    for name in args.methods:
+        if name.startswith('argon2') and passwords.PasswordHasher is None:
+            print(f"{name:<12} {'(argon2-cffi missing)':<24}")
+            continue
+        method, per_core, pooled = bench_method(name, args.logins, args.workers)
+        print(f"{name:<12} {method:<24} {per_core:>14.1f} {pooled:>18.1f}")
+    print(f"\ncores: {os.cpu_count()}  executor workers: {args.workers}")
+
+
+if __name__ == '__main__':
+    main()
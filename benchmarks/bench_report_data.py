@@ -0,0 +1,121 @@
+"""collect_report_data benchmark: query count and wall time, before vs after.
+
+Usage:
+    python benchmarks/bench_report_data.py [--feedback 1000000] [--seed 42] [--db existing.db]
+
+Uses the synthetic_data database for --feedback feedback rows (schools =
+feedback/100, users and meetings = feedback/10; generated once per day and
+cached in /tmp), then runs the old one-COUNT-per-statistic collector and the
+current aggregate collector against it, counting SQL statements with a
+cursor event listener. The new collector's detail lists are lazy queries, so
+each run also takes the rows create_pdf_report shows (PDF_ROWS) from both
+collectors' lists inside the timed region. The current collector also
+builds the period activity and growth sections from the daily_stats rollup,
+which the legacy one has no equivalent of.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from sqlalchemy import event
+
+import synthetic_data
+from models import db, School, Principal, Feedback, MeetingBooking, User
+from rollups import MEETING_STATUSES as STATUSES
+
+# Rows of each detail list the PDF shows (create_pdf_report's recent sections)
+PDF_ROWS = {'users': 10, 'feedback': 5, 'meetings': 8}
+
+
+def legacy_collect_report_data():
+    """The original collector: one COUNT(*) per statistic, schools loaded twice"""
+    report = {
+        'users': {
+            'total': User.query.count(),
+            'active_today': User.query.filter(db.func.date(User.created_at) == datetime.now().date()).count(),
+            'new_this_week': User.query.filter(User.created_at >= (datetime.now() - timedelta(days=7))).count(),
+            'new_this_month': User.query.filter(User.created_at >= (datetime.now() - timedelta(days=30))).count(),
+            'list': User.query.order_by(User.created_at.desc()).limit(100).all()
+        },
+        'schools': {'total': School.query.count(), 'by_region': {}, 'by_level': {}, 'list': School.query.all()},
+        'principals': {
+            'total': Principal.query.count(),
+            'active': Principal.query.filter_by(is_active=True).count(),
+            'inactive': Principal.query.filter_by(is_active=False).count(),
+            'list': Principal.query.all()
+        },
+        'feedback': {
+            'total': Feedback.query.count(),
+            'with_admin_reply': Feedback.query.filter(Feedback.admin_reply.isnot(None)).count(),
+            'with_principal_reply': Feedback.query.filter(Feedback.principal_reply.isnot(None)).count(),
+            'pending_reply': Feedback.query.filter(Feedback.admin_reply.is_(None), Feedback.principal_reply.is_(None)).count(),
+            'list': Feedback.query.order_by(Feedback.created_at.desc()).limit(200).all()
+        },
+        'meetings': {
+            'total': MeetingBooking.query.count(),
+            'by_status': {s: MeetingBooking.query.filter_by(status=s).count() for s in STATUSES},
+            'list': MeetingBooking.query.order_by(MeetingBooking.created_at.desc()).limit(100).all()
+        },
+    }
+    for school in School.query.all():
+        region = school.region or 'Unknown'
+        level = school.level or 'Unknown'
+        report['schools']['by_region'][region] = report['schools']['by_region'].get(region, 0) + 1
+        report['schools']['by_level'][level] = report['schools']['by_level'].get(level, 0) + 1
+    return report
+
+
+def measure(fn, statements):
+    db.session.expunge_all()
+    statements.clear()
+    start = time.perf_counter()
+    result = fn()
+    rows = {section: list(result[section]['list'][:count]) for section, count in PDF_ROWS.items()}
+    elapsed = time.perf_counter() - start
+    return result, rows, len(statements), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feedback', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', default=None, help="existing database to use instead of the synthetic one")
+    args = parser.parse_args()
+
+    path = args.db or synthetic_data.dataset(
+        schools=max(args.feedback // 100, 10), users=max(args.feedback // 10, 10),
+        feedback=args.feedback, meetings=max(args.feedback // 10, 10), seed=args.seed
+    )
+    bench_app = Flask(__name__)
+    bench_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    db.init_app(bench_app)
+
+    from report_builder import collect_report_data
+
+    with bench_app.app_context():
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(a[2]))
+
+        old, old_rows, old_queries, old_time = measure(legacy_collect_report_data, statements)
+        new, new_rows, new_queries, new_time = measure(collect_report_data, statements)
+
+        for section, key in [('users', 'total'), ('schools', 'total'), ('feedback', 'pending_reply'), ('meetings', 'total')]:
+            assert old[section][key] == new[section][key], (section, key)
+        assert old['schools']['by_region'] == new['schools']['by_region']
+        assert old['meetings']['by_status'] == new['meetings']['by_status']
+        for section in PDF_ROWS:
+            assert len(old_rows[section]) == len(new_rows[section]), section
+
+    print(f"feedback rows: {args.feedback:,}")
+    print(f"{'collector':<12} {'queries':>8} {'seconds':>9}")
+    print(f"{'before':<12} {old_queries:>8} {old_time:>9.3f}")
+    print(f"{'after':<12} {new_queries:>8} {new_time:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""School details page benchmark: views/second and queries per view, with and without school_cache.
+
+Usage:
+    python benchmarks/bench_school_page.py [--views 2000] [--schools 200] [--feedback 20000]
+                                           [--popular 5] [--seed 42]
+
+Generates a synthetic_data database and replays --views anonymous views -
+GET /school/<id> plus the GET /api/schools/<id>/feedback the page makes -
+through the Flask test client, spread over the --popular most viewed
+schools. Run once with SCHOOL_CACHE_ENABLED off and once on (after a warm
+up view of each school); queries per view come from query_stats'
+X-DB-Queries header. The bodies are checked to be the same in both runs.
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import synthetic_data
+
+
+def run(path, enabled, school_ids, views, seed):
+    from app import create_app
+    app = create_app({
+        'DATA_DIR': tempfile.mkdtemp(prefix='eduquest_bench_'),
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(path),
+        'SQL_STATS_HEADERS': True,
+        'SCHOOL_CACHE_ENABLED': enabled,
+    })
+    client = app.test_client()
+
+    def view(school_id):
+        queries, digest = 0, hashlib.sha1()
+        for url in (f"/school/{school_id}", f"/api/schools/{school_id}/feedback"):
+            response = client.get(url)
+            assert response.status_code == 200, url
+            queries += int(response.headers.get('X-DB-Queries', 0))
+            digest.update(response.get_data())
+        return queries, digest.hexdigest()
+
+    bodies = {school_id: view(school_id)[1] for school_id in school_ids}  # warm up
+    rng = random.Random(seed)
+    queries = 0
+    start = time.perf_counter()
+    for _ in range(views):
+        school_id = rng.choice(school_ids)
+        count, digest = view(school_id)
+        assert digest == bodies[school_id], school_id
+        queries += count
+    return time.perf_counter() - start, queries, bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--views', type=int, default=2000)
+    parser.add_argument('--schools', type=int, default=200)
+    parser.add_argument('--feedback', type=int, default=20000)
+    parser.add_argument('--popular', type=int, default=5, help="schools the views are spread over")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    path = synthetic_data.dataset(schools=args.schools, users=args.schools * 10, feedback=args.feedback,
+                                  meetings=args.feedback // 10, seed=args.seed)
+    school_ids = random.Random(args.seed).sample(range(1, args.schools + 1), args.popular)
+
+    print(f"{args.views:,} views over {args.popular} schools ({args.feedback // args.schools} feedback each on average)")
+    print(f"{'school_cache':<13} {'ms/view':>8} {'views/s':>9} {'queries/view':>13} {'speedup':>8}")
+    baseline, reference = None, None
+    for enabled in (False, True):
+        elapsed, queries, bodies = run(path, enabled, school_ids, args.views, args.seed)
+        if reference is None:
+            baseline, reference = elapsed, bodies
+        assert bodies == reference
+        print(f"{'on' if enabled else 'off':<13} {elapsed / args.views * 1000:>8.2f} {args.views / elapsed:>9,.0f} "
+              f"{queries / args.views:>13.2f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""SQLite contention benchmark: read/write throughput and lock errors per profile.
+
+Usage:
+    python benchmarks/bench_sqlite_contention.py [--writers 4] [--readers 8] [--seconds 10]
+                                                 [--profiles default production]
+
+Each profile runs in a fresh interpreter against its own freshly generated small
+synthetic_data database (WAL mode is persistent, so profiles never share a
+file; the seed is fixed, so they all start from the same rows). Writer threads post
+feedback and meeting bookings through the ORM - with the versions and
+daily_stats after_flush hooks, like the real routes - while reader threads
+run the school/feedback listing queries. Every thread has its own app
+context, session and pooled connection.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import synthetic_data
+
+SCHOOLS = 50
+USERS = 500
+FEEDBACK = 5000
+MEETINGS = 500
+
+
+def build_app(path, profile):
+    from flask import Flask
+    from models import db
+    import sqlite_profile
+    import versions
+    import rollups
+
+    bench_app = Flask(__name__)
+    bench_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    bench_app.config['SQLITE_PROFILE'] = profile
+    db.init_app(bench_app)
+    sqlite_profile.init_app(bench_app)
+    with bench_app.app_context():
+        db.create_all()
+    versions.init_app(bench_app)
+    rollups.init_app(bench_app)
+    return bench_app
+
+
+def child(profile, writers, readers, seconds):
+    """Runs inside a fresh interpreter and prints one JSON line"""
+    from datetime import datetime, timedelta
+    from sqlalchemy.exc import OperationalError
+    from models import db, School, Feedback, MeetingBooking
+
+    path = os.path.join(tempfile.mkdtemp(prefix='eduquest_contention_'), 'bench.db')
+    synthetic_data.generate(path, SCHOOLS, USERS, FEEDBACK, MEETINGS, progress=lambda message: None)
+    bench_app = build_app(path, profile)
+
+    stats = {'writes': 0, 'reads': 0, 'write_locked': 0, 'read_locked': 0, 'errors': 0}
+    write_latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def record(key, latency=None):
+        with lock:
+            stats[key] += 1
+            if latency is not None:
+                write_latencies.append(latency)
+
+    def write(rng):
+        school_id = rng.randint(1, SCHOOLS)
+        if rng.random() < 0.7:
+            db.session.add(Feedback(school_id=school_id, name='Parent', email='parent@example.com',
+                                    message='Benchmark feedback message'))
+        else:
+            db.session.add(MeetingBooking(school_id=school_id, principal_id=school_id, user_name='Parent',
+                                          user_email='parent@example.com', purpose='Visit',
+                                          preferred_date=datetime.now() + timedelta(days=7)))
+        db.session.commit()
+
+    def read(rng):
+        school_id = rng.randint(1, SCHOOLS)
+        School.query.order_by(School.name).all()
+        Feedback.query.filter_by(school_id=school_id).order_by(Feedback.created_at.desc()).limit(20).all()
+        db.session.rollback()
+
+    def worker(kind, seed_value):
+        rng = random.Random(seed_value)
+        operation = write if kind == 'write' else read
+        with bench_app.app_context():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    operation(rng)
+                    record(f"{kind}s", time.perf_counter() - start if kind == 'write' else None)
+                except OperationalError as e:
+                    db.session.rollback()
+                    record(f"{kind}_locked" if 'locked' in str(e) else 'errors')
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=('write', i)) for i in range(writers)]
+    threads += [threading.Thread(target=worker, args=('read', 100 + i)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    write_latencies.sort()
+    p99 = write_latencies[int(len(write_latencies) * 0.99)] if write_latencies else None
+    with bench_app.app_context():
+        journal_mode = db.session.execute(db.text("PRAGMA journal_mode")).scalar()
+    print(json.dumps(dict(stats, profile=profile, seconds=seconds, p99_write_s=p99, journal_mode=journal_mode)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--profiles', nargs='*', default=['default', 'production'])
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.writers, args.readers, args.seconds)
+        return
+
+    print(f"{args.writers} writer / {args.readers} reader threads, {args.seconds:g}s per profile")
+    print(f"{'profile':<12} {'journal':>8} {'writes/s':>9} {'reads/s':>9} {'locked %':>9} {'p99 write ms':>13}")
+    for profile in args.profiles:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', profile, '--writers', str(args.writers),
+             '--readers', str(args.readers), '--seconds', str(args.seconds)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        attempts = result['writes'] + result['reads'] + result['write_locked'] + result['read_locked']
+        locked = (result['write_locked'] + result['read_locked']) / attempts * 100 if attempts else 0
+        p99 = f"{result['p99_write_s'] * 1000:.1f}" if result['p99_write_s'] is not None else '-'
+        print(f"{profile:<12} {result['journal_mode']:>8} {result['writes'] / result['seconds']:>9.1f} "
+              f"{result['reads'] / result['seconds']:>9.1f} {locked:>9.2f} {p99:>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""Worker startup benchmark: import/create_app time and memory shared with forked workers.
+
+Usage:
+    python benchmarks/bench_startup.py [--top 15] [--workers 4] [--requests 200]
+                                       [--preload pandas matplotlib.pyplot ...]
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and prints
+the slowest top-level imports. Then, once per mode in a fresh interpreter,
+imports app, builds it with create_app() over a synthetic_data database and
+forks --workers workers from it the way gunicorn's master does with
+preload_app; each worker serves --requests requests of a page/API mix:
+  * preload  - fork straight after create_app()
+  * prefork  - app.prefork() first (warm URL map/templates, gc.freeze()),
+               as gunicorn.conf.py's when_ready hook does
+It reports the parent's and the average worker's RSS/PSS/private memory and
+the worker's first-request latency. Private memory is what each worker adds;
+everything else is still shared with the master. --preload imports extra
+modules before the app, e.g. to compare against eager report imports:
+
+    python benchmarks/bench_startup.py --preload pandas numpy matplotlib.pyplot reportlab.platypus
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'reportlab', 'PIL', 'report_builder']
+MODES = ('preload', 'prefork')
+PATHS = ['/', '/schools', '/school/3', '/api/schools', '/api/feedback', '/admin-dashboard',
+         '/api/schools/3/feedback', '/about']
+
+
+def memory_mb():
+    """{'rss': MB, 'pss': MB, 'private': MB} for this process (Linux /proc)"""
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    result = {'rss': 0.0, 'pss': 0.0, 'private': 0.0}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in fields:
+                    result[fields[name]] += int(value.split()[0]) / 1024
+    except OSError:
+        import resource
+        result['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def import_times(preload, top):
+    """Cumulative import time per top-level package from -X importtime"""
+    statements = [f"import {name}" for name in preload] + ['import app']
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', '; '.join(statements)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stderr
+
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|', 2)
+        entries.append((len(name) - len(name.lstrip()), int(cumulative_us), name.strip()))
+
+    # Top-level imports are the least indented entries
+    top_indent = min(indent for indent, _, _ in entries)
+    packages = {}
+    for indent, cumulative_us, name in entries:
+        if indent == top_indent:
+            package = name.split('.')[0]
+            packages[package] = packages.get(package, 0) + cumulative_us
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return sum(packages.values()) / 1e6, ranked[:top]
+
+
+def worker(app, requests):
+    """A forked worker's run: {'first_ms': ..., 'heavy_loaded': [...], **memory_mb()}"""
+    client = app.test_client()
+    start = time.perf_counter()
+    client.get(PATHS[0])
+    first_ms = (time.perf_counter() - start) * 1000
+    for i in range(1, requests):
+        client.get(PATHS[i % len(PATHS)])
+    return dict(memory_mb(), first_ms=first_ms,
+                heavy_loaded=[name for name in HEAVY_MODULES if name in sys.modules])
+
+
+def child(preload, mode, database, workers, requests):
+    """Runs inside a fresh interpreter and prints one JSON line"""
+    data_dir = tempfile.mkdtemp(prefix='eduquest_bench_')
+    shutil.copy(database, os.path.join(data_dir, 'eduquest.db'))
+
+    start = time.perf_counter()
+    for name in preload:
+        __import__(name)
+    import app
+    import_s = time.perf_counter() - start
+    start = time.perf_counter()
+    application = app.create_app({'DATA_DIR': data_dir, 'LOG_LEVEL': 'WARNING', 'METRICS_ENABLED': False})
+    create_s = time.perf_counter() - start
+    start = time.perf_counter()
+    if mode == 'prefork':
+        app.prefork(application)
+    prefork_s = time.perf_counter() - start
+    parent = memory_mb()
+
+    pipes = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            os.write(write_fd, json.dumps(worker(application, requests)).encode())
+            os._exit(0)
+        os.close(write_fd)
+        pipes.append((pid, read_fd))
+
+    results = []
+    for pid, read_fd in pipes:
+        chunks = []
+        while chunk := os.read(read_fd, 65536):
+            chunks.append(chunk)
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+        results.append(json.loads(b''.join(chunks)))
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(json.dumps({
+        'import_s': import_s,
+        'create_s': create_s,
+        'prefork_s': prefork_s,
+        'parent': parent,
+        'worker': {key: sum(result[key] for result in results) / len(results)
+                   for key in ('rss', 'pss', 'private', 'first_ms')},
+        'heavy_loaded': results[0]['heavy_loaded']
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help="requests served by each worker")
+    parser.add_argument('--preload', nargs='*', default=[])
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.preload, args.child, args.database, args.workers, args.requests)
+        return
+
+    total, ranked = import_times(args.preload, args.top)
+    print(f"-X importtime: {total:.3f}s cumulative for top-level imports")
+    for package, microseconds in ranked:
+        print(f"  {package:<28} {microseconds / 1000:>9.1f} ms")
+
+    import synthetic_data
+    database = synthetic_data.dataset(schools=30, users=200, feedback=3000, meetings=300)
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', mode, '--database', database,
+             '--workers', str(args.workers), '--requests', str(args.requests), '--preload', *args.preload],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    first = results[MODES[0]]
+    print(f"\nimport app: {first['import_s']:.3f}s wall, create_app(): {first['create_s']:.3f}s, "
+          f"prefork(): {results['prefork']['prefork_s']:.3f}s")
+    print(f"heavy modules loaded in a worker: {', '.join(first['heavy_loaded']) or 'none'}")
+    print(f"\n{args.workers} workers x {args.requests} requests")
+    print(f"{'mode':<9} {'process':<14} {'RSS MB':>8} {'PSS MB':>8} {'private MB':>11} {'1st req ms':>11}")
+    for mode, result in results.items():
+        for name in ('parent', 'worker'):
+            memory = result[name]
+            first_ms = f"{memory['first_ms']:>11.1f}" if 'first_ms' in memory else ''
+            label = 'worker (avg)' if name == 'worker' else name
+            print(f"{mode:<9} {label:<14} {memory['rss']:>8.1f} {memory['pss']:>8.1f} "
+                  f"{memory['private']:>11.1f} {first_ms}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+"""Deterministic synthetic EduQuest database at any scale.
+
+Usage:
+    python benchmarks/synthetic_data.py OUTPUT.db [--scale tiny|small|medium|large]
+                                        [--schools N] [--users N] [--feedback N] [--meetings N]
+                                        [--seed 42] [--anchor YYYY-MM-DD]
+
+Fills every table in models.py: schools, one principal per school, users
+(parents and students), feedback with admin/principal replies, meeting
+bookings, the admin account, data_version and the daily_stats rollup.
+The same seed, counts and anchor date always produce the same rows; each
+table has its own random stream, so changing one count leaves the other
+tables unchanged.
+
+Tables are created without their secondary indexes, loaded with executemany
+on one connection with journaling and fsync off, and indexed afterwards,
+so the "large" scale (10M feedback) loads in minutes.
+
+Distributions: regions and levels are weighted; feedback and meetings
+follow a skewed per-school popularity (a few schools get most of the
+traffic); timestamps cover --years before the anchor and lean towards
+recent dates (steady growth); ~30% of feedback has an admin reply and
+~45% a principal reply, a few days after it was posted.
+
+Every account's password is PASSWORD ("synthetic-password"); the admin is
+"admin". Benchmarks call generate()/dataset() instead of seeding by hand.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'synthetic-password'
+
+SCALES = {
+    # scale: (schools, users, feedback, meetings)
+    'tiny': (50, 500, 5_000, 500),
+    'small': (1_000, 10_000, 100_000, 10_000),
+    'medium': (10_000, 100_000, 1_000_000, 100_000),
+    'large': (100_000, 1_000_000, 10_000_000, 1_000_000),
+}
+
+REGIONS = {
+    'Nairobi': 30, 'Mombasa': 14, 'Kisumu': 11, 'Nakuru': 10,
+    'Eldoret': 9, 'Nyeri': 8, 'Machakos': 9, 'Kakamega': 9,
+}
+LEVELS = {'Primary': 50, 'Secondary': 30, 'College': 10, 'Special Needs': 5, None: 5}
+ROLES = {'parent': 80, 'student': 20}
+MEETING_STATUSES = {'pending': 25, 'approved': 10, 'confirmed': 20, 'completed': 30, 'declined': 5, 'cancelled': 10}
+FIRST_NAMES = ['Amina', 'Brian', 'Cynthia', 'David', 'Esther', 'Faith', 'George', 'Hassan', 'Irene', 'James',
+               'Kevin', 'Lucy', 'Mary', 'Njeri', 'Otieno', 'Peter', 'Rose', 'Samuel', 'Wanjiru', 'Zawadi']
+LAST_NAMES = ['Achieng', 'Kamau', 'Kariuki', 'Kiprop', 'Mutua', 'Mwangi', 'Njoroge', 'Odhiambo', 'Omondi', 'Wafula']
+MESSAGES = [
+    'The teachers are very supportive and communicate well with parents.',
+    'Classrooms are crowded; more staff would help.',
+    'Great sports programme, my child loves it.',
+    'Fees are reasonable but the payment schedule is confusing.',
+    'Please improve the transport arrangements in the morning.',
+    'Accessibility for wheelchair users has improved a lot this year.',
+    'We would like more frequent progress reports.',
+    'The library is excellent and well stocked.',
+]
+PURPOSES = ['Admission enquiry', 'Academic progress', 'Fee discussion', 'Special needs support', 'School visit']
+BATCH = 50_000
+
+
+def _picker(rng, weights):
+    """Weighted choice that is cheap enough to call millions of times"""
+    values = list(weights)
+    cumulative, total = [], 0
+    for value in values:
+        total += weights[value]
+        cumulative.append(total)
+    choices = rng.choices
+
+    def pick():
+        return choices(values, cum_weights=cumulative)[0]
+    return pick
+
+
+def _chooser(rng, values):
+    """rng.choice without its per-call overhead"""
+    rnd, count = rng.random, len(values)
+    return lambda: values[int(rnd() * count)]
+
+
+def _namer(rng):
+    first, last = _chooser(rng, FIRST_NAMES), _chooser(rng, LAST_NAMES)
+    return lambda: f"{first()} {last()}"
+
+
+class _Clock:
+    """Timestamps in the --years before the anchor, leaning towards recent dates"""
+
+    def __init__(self, rng, anchor, years):
+        self.rng = rng
+        self.end = anchor
+        self.span = years * 365 * 86400
+
+    def created(self):
+        # sqrt of a uniform leans to 1: later dates are more likely (growth)
+        return self.end - timedelta(seconds=int(self.span * (1 - self.rng.random() ** 0.5)))
+
+    def after(self, moment, mean_days):
+        later = moment + timedelta(seconds=int(self.rng.expovariate(1 / (mean_days * 86400))))
+        return min(later, self.end)
+
+
+def _popular_school(rng, schools):
+    # Quadratic skew: the lowest ids get most of the feedback/meetings
+    return int(schools * rng.random() ** 2) + 1
+
+
+def _fmt(moment):
+    return moment.isoformat(sep=' ')
+
+
+def _insert(conn, sql, rows, label, progress):
+    total, batch = 0, []
+    start = time.perf_counter()
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH:
+            conn.executemany(sql, batch)
+            total += len(batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+        total += len(batch)
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    progress(f"  {label:<16} {total:>12,} rows in {elapsed:6.1f}s ({total / max(elapsed, 1e-9):,.0f}/s)")
+    return total
+
+
+# ---------------------
+# Row generators (one random stream per table)
+# ---------------------
+def _schools(seed, count):
+    rng = random.Random(f"{seed}:school")
+    region, level = _picker(rng, REGIONS), _picker(rng, LEVELS)
+    for i in range(1, count + 1):
+        yield (i, f"School {i}", region(), level(), f"+2547{rng.randint(10000000, 99999999)}",
+               rng.choice(MESSAGES), 'Ramps and accessible washrooms' if rng.random() < 0.4 else None,
+               f"KES {rng.randint(5, 150) * 1000:,} per term", '/static/images/default-school.jpg')
+
+
+def _principals(seed, count, password_hash, clock_anchor, years):
+    rng = random.Random(f"{seed}:principal")
+    clock, name = _Clock(rng, clock_anchor, years), _namer(rng)
+    for i in range(1, count + 1):
+        yield (i, i, name(), f"principal{i}@example.com", f"+2547{rng.randint(10000000, 99999999)}",
+               password_hash, rng.random() < 0.9, rng.random() < 0.8, _fmt(clock.created()))
+
+
+def _users(seed, count, password_hash, clock_anchor, years):
+    rng = random.Random(f"{seed}:user")
+    clock, name, rnd = _Clock(rng, clock_anchor, years), _namer(rng), rng.random
+    role = _picker(rng, ROLES)
+    for i in range(1, count + 1):
+        yield (i, name(), f"user{i}@example.com", password_hash, f"+2547{10000000 + int(rnd() * 9e7)}",
+               role(), _fmt(clock.created()), rnd() < 0.97)
+
+
+def _feedback(seed, count, schools, clock_anchor, years):
+    rng = random.Random(f"{seed}:feedback")
+    clock, name, rnd = _Clock(rng, clock_anchor, years), _namer(rng), rng.random
+    message = _chooser(rng, MESSAGES)
+    for _ in range(count):
+        created = clock.created()
+        admin = rnd() < 0.30
+        principal = rnd() < 0.45
+        yield (_popular_school(rng, schools), name(), f"parent{int(rnd() * 1e7)}@example.com",
+               message(), _fmt(created),
+               'Thank you for your feedback.' if admin else None,
+               _fmt(clock.after(created, 2)) if admin else None,
+               'We are looking into this.' if principal else None,
+               _fmt(clock.after(created, 4)) if principal else None)
+
+
+def _meetings(seed, count, schools, clock_anchor, years):
+    rng = random.Random(f"{seed}:meeting")
+    clock, name, rnd = _Clock(rng, clock_anchor, years), _namer(rng), rng.random
+    status, purpose = _picker(rng, MEETING_STATUSES), _chooser(rng, PURPOSES)
+    for _ in range(count):
+        school_id = _popular_school(rng, schools)
+        created = clock.created()
+        yield (school_id, school_id, name(), f"parent{int(rnd() * 1e7)}@example.com",
+               f"+2547{10000000 + int(rnd() * 9e7)}", purpose(),
+               _fmt(created + timedelta(days=rng.randint(1, 30), hours=rng.randint(8, 16))),
+               status(), _fmt(created))
+
+
+# ---------------------
+# Database
+# ---------------------
+def _flask_app(path):
+    from flask import Flask
+    from models import db
+
+    data_app = Flask(__name__)
+    data_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    db.init_app(data_app)
+    return data_app
+
+
+def generate(path, schools, users, feedback, meetings, seed=42, anchor=None, years=3, progress=print):
+    """Create `path` (must not exist) and fill it; returns the row counts"""
+    from sqlalchemy.schema import CreateIndex, CreateTable
+    from werkzeug.security import generate_password_hash
+    from models import db
+    import rollups
+
+    if os.path.exists(path):
+        raise FileExistsError(path)
+    anchor = anchor or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    password_hash = generate_password_hash(PASSWORD)  # one hash for every account
+    start = time.perf_counter()
+    progress(f"generating {path} (seed {seed}, anchor {anchor:%Y-%m-%d})")
+
+    data_app = _flask_app(path)
+    with data_app.app_context():
+        with db.engine.begin() as conn:
+            for table in db.metadata.sorted_tables:
+                conn.execute(CreateTable(table))  # indexes come after the load
+
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA cache_size=-262144")  # 256 MB
+        counts = {
+            'school': _insert(conn, "INSERT INTO school (id, name, region, level, contact, description, "
+                                    "accessibility, fee_structure, image_url) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                              _schools(seed, schools), 'school', progress),
+            'principal': _insert(conn, "INSERT INTO principal (id, school_id, name, email, phone, password_hash, "
+                                       "is_active, email_verified, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 _principals(seed, schools, password_hash, anchor, years), 'principal', progress),
+            'user': _insert(conn, 'INSERT INTO "user" (id, name, email, password_hash, phone, role, created_at, '
+                                  'is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                            _users(seed, users, password_hash, anchor, years), 'user', progress),
+            'feedback': _insert(conn, "INSERT INTO feedback (school_id, name, email, message, created_at, "
+                                      "admin_reply, reply_date, principal_reply, principal_reply_date) "
+                                      "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                _feedback(seed, feedback, schools, anchor, years), 'feedback', progress),
+            'meeting_booking': _insert(conn, "INSERT INTO meeting_booking (school_id, principal_id, user_name, "
+                                             "user_email, user_phone, purpose, preferred_date, status, created_at) "
+                                             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                       _meetings(seed, meetings, schools, anchor, years), 'meeting_booking', progress),
+        }
+        conn.execute("INSERT INTO admin (username, password_hash) VALUES ('admin', ?)", (password_hash,))
+        conn.execute("INSERT INTO data_version (name, version) VALUES ('global', 1)")
+        conn.commit()
+
+        step = time.perf_counter()
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(str(CreateIndex(index).compile(dialect=db.engine.dialect)))
+        conn.commit()
+        progress(f"  indexes          {time.perf_counter() - step:>19.1f}s")
+
+        step = time.perf_counter()
+        conn.execute("ANALYZE")
+        conn.close()
+        rollups.rebuild()
+        db.engine.dispose()
+        progress(f"  daily_stats + ANALYZE {time.perf_counter() - step:>14.1f}s")
+
+    progress(f"done in {time.perf_counter() - start:.1f}s, {os.path.getsize(path) / 2**20:,.0f} MB")
+    return counts
+
+
+def dataset(schools, users, feedback, meetings, seed=42, directory='/tmp', progress=print):
+    """Path of a generated database for these parameters, generating it on first use
+
+    Cached per day (the anchor is today's date) so relative periods like
+    "this week" in reports always have data.
+    """
+    anchor = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    path = os.path.join(directory, f"eduquest_synth_s{seed}_{anchor:%Y%m%d}_"
+                                   f"{schools}_{users}_{feedback}_{meetings}.db")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        generate(tmp_path, schools, users, feedback, meetings, seed, anchor, progress=progress)
+        os.replace(tmp_path, path)
+    return path
+
+
+def scale_counts(scale, **overrides):
+    """(schools, users, feedback, meetings) for a preset with per-table overrides"""
+    counts = dict(zip(('schools', 'users', 'feedback', 'meetings'), SCALES[scale]))
+    counts.update({k: v for k, v in overrides.items() if v is not None})
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output')
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--schools', type=int)
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--feedback', type=int)
+    parser.add_argument('--meetings', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--anchor', type=lambda s: datetime.strptime(s, '%Y-%m-%d'), default=None,
+                        help="newest timestamp (default: today); fix it to get the same rows on any day")
+    parser.add_argument('--force', action='store_true', help="replace OUTPUT if it exists")
+    args = parser.parse_args()
+
+    counts = scale_counts(args.scale, schools=args.schools, users=args.users,
+                          feedback=args.feedback, meetings=args.meetings)
+    if args.force and os.path.exists(args.output):
+        os.remove(args.output)
+    generate(os.path.abspath(args.output), seed=args.seed, anchor=args.anchor, years=args.years, **counts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+from werkzeug.http import generate_etag, parse_accept_header, quote_etag
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# ---------------------
+# Response Compression
+# ---------------------
+# Compresses HTML/JSON/CSS/JS responses of at least COMPRESS_MIN_SIZE bytes
+# with brotli (when installed) or gzip, whichever the client's
+# Accept-Encoding prefers. Buffered GET responses get an ETag (a hash of the
+# body, unless the view set one) and their compressed bytes are kept in a
+# per-process LRU keyed by (ETag, encoding), so an unchanged page is only
+# compressed once. Streamed responses are compressed chunk by chunk, with a
+# sync flush after each chunk so the client still receives them as they come.
+# send_file/static responses (direct passthrough) are left alone.
+
+DEFAULT_MIMETYPES = (
+    'text/html', 'text/css', 'text/plain', 'text/javascript', 'application/javascript',
+    'application/json', 'image/svg+xml',
+)
+
+
+class CompressedCache:
+    """LRU of compressed bodies bounded by their total size"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+_settings = {}
+_cache = CompressedCache(0)
+
+
+# ---------------------
+# Encoders
+# ---------------------
+def _gzip(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    return compressor.compress(data) + compressor.flush()
+
+
+def _brotli(data, level):
+    return brotli.compress(data, quality=level)
+
+
+def _gzip_stream(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        if chunk:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _brotli_stream(chunks, level):
+    compressor = brotli.Compressor(quality=level)
+    for chunk in chunks:
+        if chunk:
+            yield compressor.process(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+ENCODINGS = {'gzip': (_gzip, _gzip_stream)}
+if brotli is not None:
+    ENCODINGS = {'br': (_brotli, _brotli_stream), **ENCODINGS}  # preferred when the client accepts both
+
+
+def compressed(data, encoding, etag=None):
+    """`data` compressed with `encoding`; with an ETag, from/into the per-process cache"""
+    level = _settings['levels'][encoding]
+    key = (etag, encoding, level) if etag else None
+    body = _cache.get(key) if key else None
+    if key:
+        metrics.cache_result('compressed', body is not None)
+    if body is None:
+        body = ENCODINGS[encoding][0](data, level)
+        if key:
+            _cache.put(key, body)
+    return body
+
+
+def encode_body(data, mimetype, accept_encoding):
+    """(body, headers) for a buffered GET body built outside Flask (asgi's async handlers)
+
+    Makes the same choice, with the same ETag and cache, as the response hook.
+    """
+    headers = {}
+    if not _settings or mimetype not in _settings['mimetypes']:
+        return data, headers
+    headers['Vary'] = 'Accept-Encoding'
+    encoding = parse_accept_header(accept_encoding).best_match(_settings['encodings'])
+    if encoding is None or len(data) < _settings['min_size']:
+        return data, headers
+    etag = generate_etag(data)
+    headers['ETag'] = quote_etag(f"{etag}-{encoding}")
+    headers['Content-Encoding'] = encoding
+    return compressed(data, encoding, etag), headers
+
+
+def _encoded(chunks, charset='utf-8'):
+    for chunk in chunks:
+        yield chunk.encode(charset) if isinstance(chunk, str) else chunk
+
+
+# ---------------------
+# Response hook
+# ---------------------
+def _compress(response):
+    if response.status_code < 200 or response.status_code in (204, 206, 304) \
+            or response.direct_passthrough or 'Content-Encoding' in response.headers \
+            or response.mimetype not in _settings['mimetypes']:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(_settings['encodings'])
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        # Error pages come through as iterators too, but with their Content-Length
+        length = response.headers.get('Content-Length', type=int)
+        if length is not None and length < _settings['min_size']:
+            return response
+        compress_stream = ENCODINGS[encoding][1]
+        response.response = compress_stream(_encoded(response.response), _settings['levels'][encoding])
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    data = response.get_data()
+    if len(data) < _settings['min_size']:
+        return response
+
+    etag = None
+    if request.method in ('GET', 'HEAD') and response.status_code == 200 \
+            and 'no-store' not in response.headers.get('Cache-Control', ''):
+        etag, weak = response.get_etag()
+        if etag is None:
+            response.add_etag()  # sha1 of the body
+            etag, weak = response.get_etag()
+        # The compressed body is a different representation of the same ETag
+        response.set_etag(f"{etag}-{encoding}", weak)
+
+    response.set_data(compressed(data, encoding, etag))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES)
+    app.config.setdefault('COMPRESS_ALGORITHMS', tuple(ENCODINGS))
+    app.config.setdefault('COMPRESS_LEVEL', 6)  # gzip 1-9
+    app.config.setdefault('COMPRESS_BR_LEVEL', 5)  # brotli 0-11
+    app.config.setdefault('COMPRESS_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+    if not app.config['COMPRESS_ENABLED']:
+        return
+    _settings.update(
+        min_size=app.config['COMPRESS_MIN_SIZE'],
+        mimetypes=frozenset(app.config['COMPRESS_MIMETYPES']),
+        encodings=[name for name in app.config['COMPRESS_ALGORITHMS'] if name in ENCODINGS],
+        levels={'gzip': app.config['COMPRESS_LEVEL'], 'br': app.config['COMPRESS_BR_LEVEL']},
+    )
+    _cache.max_bytes = app.config['COMPRESS_CACHE_MAX_BYTES']
+    app.after_request(_compress)
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import quote
+
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+# ---------------------
+# Read/Write Routing
+# ---------------------
+# Read-only routes and report collection run their queries on a second engine
+# that opens the same SQLite file with mode=ro and its own connection pool.
+# With WAL, those readers never wait on (or block) the writer, so read
+# throughput scales with worker threads while writes stay on the main engine.
+#   @read_only_view on a view, or `with read_only():` around a block
+# ORM flushes always use the write engine; a raw write statement inside a
+# read-only block fails loudly ("attempt to write a readonly database").
+
+READ_ONLY_FLAG = '_db_read_only'
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends default-bind queries to the read engine in read-only blocks"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is None and not self._flushing and has_app_context() and g.get(READ_ONLY_FLAG):
+            read_engine = current_app.extensions.get('read_engine')
+            if read_engine is not None and engine is self._db.engine:
+                return read_engine
+        return engine
+
+
+def read_uri(uri):
+    """sqlite:///path -> read-only URI for the same file (None for other databases/in-memory)"""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:') \
+            or url.database.startswith('file:'):
+        return None
+    return f"sqlite:///file:{quote(url.database)}?mode=ro&uri=true"
+
+
+@contextmanager
+def read_only():
+    previous = g.get(READ_ONLY_FLAG, False)
+    setattr(g, READ_ONLY_FLAG, True)
+    try:
+        yield
+    finally:
+        setattr(g, READ_ONLY_FLAG, previous)
+
+
+@contextmanager
+def snapshot():
+    """read_only() where every query reads the same database state (one read transaction)
+
+    pysqlite only opens transactions for writes, so each SELECT otherwise sees
+    whatever was committed when it ran. With WAL the writer carries on while
+    the snapshot is held.
+    """
+    from models import db  # models imports RoutingSession from here
+
+    with read_only():
+        connection = db.session.connection()
+        if not connection.connection.dbapi_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN")
+        try:
+            yield
+        finally:
+            db.session.rollback()
+
+
+def read_only_view(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with read_only():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def dispose(close=True):
+    """Drop pooled read connections (close=False after fork: never reuse the parent's)"""
+    engine = current_app.extensions.get('read_engine')
+    if engine is not None:
+        engine.dispose(close=close)
+
+
+def init_app(app):
+    import sqlite_profile  # imports models, which imports RoutingSession from here
+
+    uri = read_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+    if not app.config.get('DB_READ_ENGINE', True) or uri is None:
+        return
+    engine = create_engine(uri, pool_size=app.config.get('DB_READ_POOL_SIZE', 10), max_overflow=10)
+    # journal_mode belongs to the database file and can't be set read-only
+    pragmas = {k: v for k, v in app.extensions.get('sqlite_pragmas', {}).items() if k != 'journal_mode'}
+    sqlite_profile.attach(engine, pragmas)
+    app.extensions['read_engine'] = engine
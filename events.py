@@ -0,0 +1,49 @@
+import json
+import time
+
+# ---------------------
+# Dashboard Events
+# ---------------------
+# GET /api/admin/events is a server-sent event stream for the admin
+# dashboard: a "version" event carrying the data version (see versions)
+# whenever it changes, and a keepalive comment in between, so the page can
+# refetch its statistics when something changed instead of polling them.
+#   const events = new EventSource('/api/admin/events');
+#   events.addEventListener('version', refreshStatistics);
+# A stream ends after EVENTS_MAX_SECONDS and EventSource reconnects by itself.
+# The sync view (admin.py) holds a worker thread for as long as the stream is
+# open; the ASGI mode (asgi.py) serves the same stream from an async handler.
+
+MIMETYPE = 'text/event-stream'
+HEADERS = {'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'}  # no proxy buffering
+
+
+class VersionStream:
+    """Decides what to send after each data version check"""
+
+    def __init__(self, config):
+        self.interval = config['EVENTS_INTERVAL']
+        self.heartbeat = config['EVENTS_HEARTBEAT']
+        self.max_seconds = config['EVENTS_MAX_SECONDS']
+        self.started = self.sent = time.monotonic()
+        self.version = None
+
+    def opening(self):
+        # EventSource waits this long before reconnecting
+        return f"retry: {int(self.interval * 1000)}\n\n".encode()
+
+    def chunk(self, version):
+        """The event for `version`, a keepalive, or None when there is nothing to send"""
+        now = time.monotonic()
+        if version != self.version:
+            self.version = version
+            self.sent = now
+            return f"event: version\ndata: {json.dumps({'version': version})}\n\n".encode()
+        if now - self.sent >= self.heartbeat:
+            self.sent = now
+            return b": keepalive\n\n"
+        return None
+
+    @property
+    def expired(self):
+        return time.monotonic() - self.started >= self.max_seconds
@@ -0,0 +1,70 @@
+import json
+from datetime import date, datetime
+
+from flask import current_app
+
+from models import db
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+# ---------------------
+# Fast JSON
+# ---------------------
+# List endpoints select plain column tuples with SQLAlchemy Core (no ORM
+# instances, identity map or to_dict()) and encode them straight to bytes.
+# The encoder is orjson when it is installed - datetimes are encoded in C,
+# with the same output as isoformat() - and the stdlib json module otherwise.
+# JSON_ENCODER = 'auto' | 'orjson' | 'stdlib' picks one.
+#   return fast_json.response(fast_json.records(select(School.id, School.name)))
+# Keys come out in select order rather than jsonify's sorted order.
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(data):
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def _orjson_dumps(data):
+    return orjson.dumps(data, default=_default)
+
+
+ENCODERS = {'stdlib': _stdlib_dumps}
+if orjson is not None:
+    ENCODERS['orjson'] = _orjson_dumps
+
+
+def resolve(name):
+    """Encoder function for a JSON_ENCODER setting"""
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'stdlib'
+    if name not in ENCODERS:
+        raise ValueError(f"JSON encoder {name!r} is not available (have: {', '.join(ENCODERS)})")
+    return ENCODERS[name]
+
+
+def dumps(data):
+    return current_app.extensions['fast_json'](data)
+
+
+def records(statement, **params):
+    """Rows of a Core select as dicts keyed by column label"""
+    result = db.session.execute(statement, params)
+    keys = tuple(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def response(data, status=200):
+    return current_app.response_class(dumps(data), status=status, mimetype='application/json')
+
+
+def init_app(app):
+    app.config.setdefault('JSON_ENCODER', 'auto')
+    app.extensions['fast_json'] = resolve(app.config['JSON_ENCODER'])
@@ -0,0 +1,305 @@
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify, request, session
+
+import app_logging
+import db_routing
+import fast_json
+import school_cache
+from helpers import current_principal_identity
+from models import db, School, Feedback
+
+# Feedback from the public site, with admin and principal replies
+
+bp = Blueprint('feedback', __name__)
+log = app_logging.get_logger('feedback')
+
+# Feedback.to_dict() fields as columns, for the list endpoints' Core selects (see fast_json)
+FEEDBACK_COLUMNS = (
+    Feedback.id, Feedback.school_id, Feedback.name, Feedback.email, Feedback.message, Feedback.created_at,
+    Feedback.admin_reply, Feedback.reply_date, Feedback.principal_reply, Feedback.principal_reply_date
+)
+
+
+# ---------------------
+# Feedback API
+# ---------------------
+@bp.route('/api/all-schools')
+def all_schools():
+    """Get all schools for feedback filtering"""
+    try:
+        schools_data = fast_json.records(db.select(
+            School.id, School.name, School.region, School.level, School.contact
+        ))
+        
+        return fast_json.response(schools_data)
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/feedback', methods=['POST'])
+def post_feedback():
+    """Submit new feedback from users"""
+    data = request.json or {}
+    
+    try:
+        # Validation
+        required_fields = ['school_id', 'name', 'message']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        
+        # Create feedback with SQLAlchemy
+        feedback = Feedback(
+            school_id=data.get('school_id'),
+            name=data.get('name'),
+            email=data.get('email', ''),
+            message=data.get('message'),
+            created_at=datetime.utcnow()
+        )
+        
+        db.session.add(feedback)
+        db.session.commit()
+        
+        log.info("feedback submitted", extra={'feedback_id': feedback.id, 'school_id': feedback.school_id})
+        return jsonify({
+            'id': feedback.id, 
+            'message': 'Feedback submitted successfully'
+        }), 201
+        
+    except Exception as e:
+        log.exception("feedback submission failed")
+        db.session.rollback()
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@bp.route('/api/feedback', methods=['GET'])
+def get_feedbacks():
+    """Get all feedback for admin dashboard"""
+    try:
+        feedbacks_data = fast_json.records(
+            db.select(*FEEDBACK_COLUMNS).order_by(Feedback.created_at.desc())
+        )
+        log.debug("feedback listed", extra={'count': len(feedbacks_data)})
+        return fast_json.response(feedbacks_data, 200)
+        
+    except Exception as e:
+        log.exception("feedback listing failed")
+        return jsonify({"error": str(e)}), 500
+
+#ROUTE FOR REPLYING TO FEEDBACK - FIXED
+@bp.route('/api/feedback/<int:feedback_id>/reply', methods=['POST'])
+def reply_to_feedback(feedback_id):
+    """Admin replies to specific feedback"""
+    data = request.json
+    reply_message = data.get('reply')
+    
+    try:
+        # USE SQLALCHEMY INSTEAD OF RAW SQLITE
+        feedback = Feedback.query.get(feedback_id)
+        if feedback:
+            feedback.admin_reply = reply_message
+            feedback.reply_date = datetime.utcnow()
+            
+            db.session.commit()
+            log.info("admin reply added", extra={'feedback_id': feedback_id})
+            return jsonify({"message": "Reply added successfully"})
+        else:
+            return jsonify({"error": "Feedback not found"}), 404
+            
+    except Exception as e:
+        log.exception("admin reply failed", extra={'feedback_id': feedback_id})
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+#ROUTE FOR DELETING FEEDBACK - FIXED
+@bp.route('/api/feedback/<int:feedback_id>', methods=['DELETE'])
+def delete_feedback(feedback_id):
+    """Delete specific feedback"""
+    try:
+        # USE SQLALCHEMY INSTEAD OF RAW SQLITE
+        feedback = Feedback.query.get(feedback_id)
+        if feedback:
+            db.session.delete(feedback)
+            db.session.commit()
+            log.info("feedback deleted", extra={'feedback_id': feedback_id})
+            return jsonify({"message": "Feedback deleted successfully"})
+        else:
+            return jsonify({"error": "Feedback not found"}), 404
+            
+    except Exception as e:
+        log.exception("feedback delete failed", extra={'feedback_id': feedback_id})
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/schools/<int:school_id>/feedback')
+@db_routing.read_only_view
+def get_school_feedback(school_id):
+    """Get feedback for a specific school"""
+    try:
+        # Cached per school version, like the school page (see school_cache)
+        body = school_cache.cached('feedback', school_id, lambda: fast_json.dumps(fast_json.records(
+            db.select(*FEEDBACK_COLUMNS, db.literal(f"School {school_id}").label('school_name'))
+            .where(Feedback.school_id == school_id)
+            .order_by(Feedback.created_at.desc())
+        )))
+        
+        return current_app.response_class(body, mimetype='application/json')
+        
+    except Exception as e:
+        log.exception("school feedback listing failed", extra={'school_id': school_id})
+        return jsonify({"error": str(e)}), 500
+
+# Get feedback for principal's school
+@bp.route('/api/principal/feedback', methods=['GET'])
+def get_principal_feedback():
+    """Get all feedback for principal's assigned school"""
+    try:
+        # Check if principal is logged in
+        if not session.get('principal_logged_in'):
+            return jsonify({'error': 'Unauthorized'}), 401
+        
+        identity = current_principal_identity()
+        if not identity or not identity['principal']['school_id']:
+            return jsonify({'error': 'Principal not assigned to a school'}), 400
+        school_id = identity['principal']['school_id']
+        
+        # Get feedback for principal's school
+        feedbacks_data = fast_json.records(
+            db.select(*FEEDBACK_COLUMNS).where(Feedback.school_id == school_id).order_by(Feedback.created_at.desc())
+        )
+        
+        return fast_json.response(feedbacks_data)
+        
+    except Exception as e:
+        log.exception("principal feedback listing failed")
+        return jsonify({"error": str(e)}), 500
+
+#ROUTE WHERE PRINCIPALS REPLY TO FEEDBACK
+@bp.route('/api/principal/feedback/<int:feedback_id>/reply', methods=['POST'])
+def principal_reply_to_feedback(feedback_id):
+    """Principal replies to specific feedback"""
+    try:
+        # Check if principal is logged in
+        if not session.get('principal_logged_in'):
+            return jsonify({'error': 'Unauthorized'}), 401
+        
+        identity = current_principal_identity()
+        if not identity or not identity['principal']['school_id']:
+            return jsonify({'error': 'Principal not assigned to a school'}), 400
+        school_id = identity['principal']['school_id']
+        
+        data = request.json
+        reply_message = data.get('reply')
+        
+        if not reply_message:
+            return jsonify({'error': 'Reply message is required'}), 400
+        
+        # Get feedback and verify it belongs to principal's school
+        feedback = Feedback.query.get(feedback_id)
+        if not feedback:
+            return jsonify({'error': 'Feedback not found'}), 404
+        
+        if feedback.school_id != school_id:
+            return jsonify({'error': 'Unauthorized to reply to this feedback'}), 403
+        
+        # Update feedback with principal reply
+        feedback.principal_reply = reply_message
+        feedback.principal_reply_date = datetime.utcnow()
+        
+        db.session.commit()
+        
+        log.info("principal reply added", extra={'feedback_id': feedback_id, 'school_id': school_id})
+        return jsonify({
+            "message": "Reply added successfully",
+            "principal_reply": feedback.principal_reply,
+            "principal_reply_date": feedback.principal_reply_date.isoformat()
+        })
+        
+    except Exception as e:
+        log.exception("principal reply failed", extra={'feedback_id': feedback_id})
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
+# ---------------------
+# Maintenance and Debug
+# ---------------------
+@bp.route('/debug-feedback-table')
+def debug_feedback_table():
+    """Debug route to check Feedback table structure"""
+    try:
+        # Check if table exists and get its structure
+        feedbacks = Feedback.query.limit(5).all()
+        
+        table_info = {
+            "table_exists": True,
+            "total_feedbacks": Feedback.query.count(),
+            "sample_feedbacks": []
+        }
+        
+        for f in feedbacks:
+            table_info["sample_feedbacks"].append({
+                "id": f.id,
+                "school_id": f.school_id,
+                "name": f.name,
+                "email": f.email,
+                "message": f.message[:50] + "..." if len(f.message) > 50 else f.message,
+                "created_at": str(f.created_at),
+                "admin_reply": f.admin_reply,
+                "reply_date": str(f.reply_date),
+                "principal_reply": f.principal_reply,
+                "principal_reply_date": str(f.principal_reply_date)
+            })
+        
+        return jsonify(table_info)
+        
+    except Exception as e:
+        return jsonify({
+            "table_exists": False,
+            "error": str(e)
+        }), 500
+
+@bp.route('/reset-feedback-table')
+def reset_feedback_table():
+    """Emergency reset for Feedback table with new fields"""
+    try:
+        log.warning("resetting the feedback table")
+        
+        # Drop the table if it exists
+        try:
+            Feedback.__table__.drop(db.engine, checkfirst=True)
+        except Exception:
+            log.warning("could not drop the feedback table (might not exist)", exc_info=True)
+        
+        # Recreate the table with new schema
+        db.create_all()
+        
+        # Verify the table structure
+        feedbacks = Feedback.query.all()
+        log.warning("feedback table recreated", extra={'count': len(feedbacks)})
+        
+        return jsonify({"message": "Feedback table reset successfully with principal_reply fields"}), 200
+        
+    except Exception as e:
+        log.exception("feedback table reset failed")
+        return jsonify({"error": str(e)}), 500
+
+#ROUTE TO CONFIRM FEEDBACK MODEL EXISTS
+@bp.route('/update-feedback-model')
+def update_feedback_model():
+    """Emergency route to update Feedback model with new fields"""
+    try:
+        db.create_all()
+        return "✅ Feedback model updated with admin_reply and reply_date fields!"
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
+
+# Add this route to app.py for database migration
+@bp.route('/update-feedback-principal-replies')
+def update_feedback_principal_replies():
+    """Emergency route to update Feedback model with principal reply fields"""
+    try:
+        db.create_all()
+        return "✅ Feedback model updated with principal_reply and principal_reply_date fields!"
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
@@ -0,0 +1,19 @@
+import os
+
+# ---------------------
+# Gunicorn
+# ---------------------
+#   gunicorn -c gunicorn.conf.py wsgi:app
+# The master imports wsgi (and builds the app) once and forks the workers
+# from it, so they start instantly and share its memory copy-on-write.
+# when_ready runs in the master right before the first fork: app.prefork()
+# warms the app up and freezes the GC so the shared pages stay shared.
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', (os.cpu_count() or 1) * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+
+
+def when_ready(server):
+    from app import prefork
+    prefork(server.app.wsgi())
@@ -0,0 +1,159 @@
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app, session
+
+import metrics
+import rollups
+import school_cache
+import versions
+from models import db, School, Principal, Admin, User, USER_ROLES
+from sessions import cached_identity
+
+# ---------------------
+# Helper Functions
+# ---------------------
+# Shared by the blueprints; everything reads the current app's config.
+
+def allowed_file(filename):
+    """Check if file extension is allowed"""
+    return '.' in filename and \
+           filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
+
+def save_password_upgrade(account):
+    """Persist a password hash that check_password() upgraded during login"""
+    if account in db.session.dirty:
+        try:
+            db.session.commit()
+        except Exception as e:
+            print(f"⚠️ Could not save upgraded password hash: {e}")
+            db.session.rollback()
+
+def _load_principal_identity():
+    principal = Principal.query.get(session.get('principal_id'))
+    if not principal:
+        return None
+    school = School.query.get(principal.school_id) if principal.school_id else None
+    return {
+        'principal': principal.to_dict(),
+        'school': school.to_dict() if school else None
+    }
+
+def _principal_identity_version(identity):
+    # Any write to the principal or their school (an admin edit, a reassignment) bumps the school's version
+    school_id = identity['principal']['school_id']
+    if not school_id:
+        return versions.current_version()
+    return school_cache.school_version(school_id)
+
+def current_principal_identity():
+    """Cached {'principal': {...}, 'school': {...}} for the logged-in principal"""
+    return cached_identity('principal', _load_principal_identity, current_app.config['SESSION_IDENTITY_TTL'],
+                           version=_principal_identity_version)
+
+def _load_user_identity():
+    user = User.query.get(session.get('user_id'))
+    return user.to_dict() if user else None
+
+def current_user_identity():
+    """Cached to_dict() of the logged-in user"""
+    return cached_identity('user', _load_user_identity, current_app.config['SESSION_IDENTITY_TTL'])
+
+# Database Initialization
+def init_db(seed=False):
+    db.create_all()
+    ensure_columns()
+    ensure_indexes()
+
+    # Create default admin only
+    if not Admin.query.filter_by(username='admin').first():
+        admin = Admin(username='admin')
+        admin.set_password('admin123')
+        db.session.add(admin)
+        db.session.commit()
+        print("✅ Default admin created: admin/admin123")
+    
+    print("✅ Database initialized with clean tables")
+    
+def ensure_indexes():
+    """Create indexes declared on the models that older databases are missing"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+def ensure_columns():
+    """Add columns declared on the models that older databases are missing
+    
+    Only for columns SQLite can add in place: nullable or with a server default.
+    """
+    inspector = db.inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                if column.server_default is not None:
+                    ddl += f" NOT NULL DEFAULT '{column.server_default.arg}'" if not column.nullable \
+                        else f" DEFAULT '{column.server_default.arg}'"
+                print(f"🔄 Adding missing column {table.name}.{column.name}")
+                conn.execute(db.text(ddl))
+
+# ---------------------
+# User statistics cache
+# ---------------------
+# The admin dashboard polls /api/admin/user-statistics; the counts are cached
+# per process for USER_STATS_TTL seconds and dropped by the registration
+# routes so a new account shows up straight away.
+_user_stats_cache = {'data': None, 'expires': 0}
+
+def user_role_counts():
+    """{'parent': n, 'student': n, 'principal': n} in one grouped query"""
+    rows = db.session.execute(db.text(
+        'SELECT role, COUNT(*) FROM "user" GROUP BY role '
+        'UNION ALL SELECT \'principal\', COUNT(*) FROM principal'
+    )).all()
+    counts = dict.fromkeys(USER_ROLES + ('principal',), 0)
+    counts.update({role: count for role, count in rows})
+    return counts
+
+def cached_user_statistics():
+    now = time.time()
+    if _user_stats_cache['data'] is not None and _user_stats_cache['expires'] > now:
+        metrics.cache_result('user_stats', True)
+        return _user_stats_cache['data']
+    metrics.cache_result('user_stats', False)
+    
+    counts = user_role_counts()
+    # Active today / new this week come from the daily_stats rollup
+    today = datetime.utcnow().date()
+    data = {
+        'total_users': sum(counts[role] for role in USER_ROLES),
+        'active_today': rollups.window_totals(today)['new_users'],
+        'new_this_week': rollups.window_totals(today - timedelta(days=7))['new_users'],
+        'parents_count': counts['parent'],
+        'students_count': counts['student'],
+        'principals_count': counts['principal']
+    }
+    _user_stats_cache.update(data=data, expires=now + current_app.config['USER_STATS_TTL'])
+    return data
+
+def invalidate_user_statistics():
+    _user_stats_cache.update(data=None, expires=0)
+
+# THIS IS TO FORCE DATABASE OPERATIONS
+def force_db_commit():
+    try:
+        db.session.commit()
+        print("✅ DATABASE COMMITTED!")
+        return True
+    except Exception as e:
+        print(f"❌ COMMIT FAILED: {e}")
+        db.session.rollback()
+        return False
+    
\ No newline at end of file
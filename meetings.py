@@ -0,0 +1,124 @@
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request, session
+
+import app_logging
+import fast_json
+from models import db, Principal, MeetingBooking
+
+# Meeting bookings with a school's principal
+
+bp = Blueprint('meetings', __name__)
+log = app_logging.get_logger('meetings')
+
+
+# ---------------------
+# Meetings API
+# ---------------------
+#ROUTE FOR BOOKING A MEETING
+@bp.route('/api/meetings/book', methods=['POST'])
+def book_meeting():
+    try:
+        data = request.json or {}
+        
+        # Validation
+        required_fields = ['school_id', 'principal_id', 'user_name', 'user_email', 'purpose', 'preferred_date']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        
+        # Verify principal exists
+        principal = Principal.query.get(data['principal_id'])
+        if not principal:
+            return jsonify({"error": "Principal not found"}), 404
+        
+        # Create meeting booking
+        meeting = MeetingBooking(
+            school_id=data['school_id'],
+            principal_id=data['principal_id'],
+            user_name=data['user_name'],
+            user_email=data['user_email'],
+            user_phone=data.get('user_phone'),
+            purpose=data['purpose'],
+            preferred_date=datetime.fromisoformat(data['preferred_date'].replace('Z', '+00:00')),
+            special_requirements=data.get('special_requirements')
+        )
+        
+        db.session.add(meeting)
+        db.session.commit()
+        
+        log.info("meeting booked", extra={
+            'meeting_id': meeting.id, 'school_id': meeting.school_id, 'principal_id': meeting.principal_id
+        })
+        
+        return jsonify({
+            "message": "Meeting request submitted successfully",
+            "meeting_id": meeting.id
+        }), 201
+        
+    except Exception as e:
+        log.exception("meeting booking failed")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+#UPDATE MEETING BOOKING ROUTE ON PRINCIPAL DASHBOARD
+@bp.route('/api/meetings/<int:meeting_id>/status', methods=['PUT'])
+def update_meeting_status(meeting_id):
+    try:
+        # Check if principal is logged in
+        if not session.get('principal_logged_in'):
+            return jsonify({"error": "Unauthorized"}), 401
+        
+        data = request.json or {}
+        new_status = data.get('status')
+        
+        if not new_status:
+            return jsonify({"error": "Status is required"}), 400
+        
+        # Get meeting and verify it belongs to this principal
+        meeting = MeetingBooking.query.get(meeting_id)
+        if not meeting:
+            return jsonify({"error": "Meeting not found"}), 404
+        
+        if meeting.principal_id != session['principal_id']:
+            return jsonify({"error": "Unauthorized"}), 403
+        
+        # Update status
+        meeting.status = new_status
+        db.session.commit()
+        
+        log.info("meeting status updated", extra={'meeting_id': meeting_id, 'status': new_status})
+        
+        return jsonify({
+            "message": f"Meeting {new_status} successfully",
+            "meeting": meeting.to_dict()
+        }), 200
+        
+    except Exception as e:
+        log.exception("meeting status update failed", extra={'meeting_id': meeting_id})
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+
+# ---------------------
+# Maintenance and Debug
+# ---------------------
+@bp.route('/debug-meetings')
+def debug_meetings():
+    """Debug route to check all meetings in database"""
+    try:
+        meetings_data = fast_json.records(db.select(
+            MeetingBooking.id, MeetingBooking.school_id, MeetingBooking.principal_id,
+            MeetingBooking.user_name, MeetingBooking.status, MeetingBooking.preferred_date
+        ))
+        return fast_json.response({"meetings": meetings_data, "total": len(meetings_data)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+#ROUTE FOR CONFIRMING MEETING BOOKING MODEL EXISTS   
+@bp.route('/update-db-meetings')
+def update_db_meetings():
+    """Route to update database with MeetingBooking model"""
+    try:
+        db.create_all()
+        return jsonify({"message": "Database updated successfully with MeetingBooking model"}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
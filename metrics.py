@@ -0,0 +1,256 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from uuid import uuid4
+
+from flask import current_app, g, jsonify, request
+
+import query_stats
+
+# ---------------------
+# Metrics
+# ---------------------
+# Prometheus text-format metrics for /metrics without a client library.
+# Every process counts into its own dict (one uncontended lock per update)
+# and snapshots it to METRICS_DIR/metrics_<pid>_<token>.json at most every
+# METRICS_FLUSH_INTERVAL seconds. /metrics reads every snapshot and sums them,
+# so the numbers cover all gunicorn workers whichever one is scraped.
+# Counters and histograms of exited workers keep counting towards the totals;
+# gauges (in-flight requests) only count live processes. Clear METRICS_DIR
+# when the server is (re)started.
+#   inc(name, labels), observe(name, seconds, labels), cache_result(cache, hit)
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REPORT_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+METRICS = {
+    # name: (type, help, histogram buckets)
+    'eduquest_http_requests_total': (COUNTER, 'HTTP requests by endpoint, method and status', None),
+    'eduquest_http_request_duration_seconds': (HISTOGRAM, 'HTTP request latency', REQUEST_BUCKETS),
+    'eduquest_http_requests_in_flight': (GAUGE, 'Requests currently being handled', None),
+    'eduquest_db_queries_total': (COUNTER, 'SQL statements run by requests', None),
+    'eduquest_db_time_seconds_total': (COUNTER, 'Time requests spent in SQL statements', None),
+    'eduquest_cache_requests_total': (COUNTER, 'Cache lookups by cache and result (hit/miss)', None),
+    'eduquest_report_jobs_total': (COUNTER, 'Report requests by result (cached/built/failed)', None),
+    'eduquest_report_job_duration_seconds': (HISTOGRAM, 'Report job build time', REPORT_BUCKETS),
+}
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()  # one snapshot writer at a time; _lock is only held to copy the values
+_values = {}  # (name, ((label, value), ...)) -> float, or [bucket counts..., +Inf count, sum]
+_state = {'dir': None, 'path': None, 'interval': 1.0, 'flushed': 0.0}
+
+
+def _key(name, labels):
+    return name, tuple(sorted((labels or {}).items()))
+
+
+def inc(name, labels=None, amount=1):
+    """Add to a counter or gauge (negative amounts for gauges only)"""
+    key = _key(name, labels)
+    with _lock:
+        _values[key] = _values.get(key, 0) + amount
+
+
+def observe(name, value, labels=None):
+    buckets = METRICS[name][2]
+    key = _key(name, labels)
+    with _lock:
+        entry = _values.get(key)
+        if entry is None:
+            entry = _values[key] = [0] * (len(buckets) + 1) + [0.0]
+        entry[bisect_left(buckets, value)] += 1
+        entry[-1] += value
+
+
+def cache_result(cache, hit):
+    inc('eduquest_cache_requests_total', {'cache': cache, 'result': 'hit' if hit else 'miss'})
+
+
+# ---------------------
+# Multiprocess snapshots
+# ---------------------
+def _reset_after_fork():
+    # A forked child starts with empty values and a snapshot file of its own
+    global _lock, _flush_lock
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    _values.clear()
+    if _state['dir']:
+        _state['path'] = _snapshot_path(_state['dir'])
+
+
+def _snapshot_path(directory):
+    return os.path.join(directory, f"metrics_{os.getpid()}_{uuid4().hex[:8]}.json")
+
+
+def flush(force=False):
+    """Write this process's values to its snapshot file (throttled unless force)"""
+    if not _state['path']:
+        return
+    # A throttled flush skips when another thread is already writing; a forced one waits for it
+    if not _flush_lock.acquire(blocking=force):
+        return
+    try:
+        now = time.monotonic()
+        if not force and now - _state['flushed'] < _state['interval']:
+            return
+        _state['flushed'] = now
+        with _lock:
+            if not _values:
+                return
+            items = [[name, list(labels), value] for (name, labels), value in _values.items()]
+        path = _state['path']
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.',
+                                        suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'pid': os.getpid(), 'values': items}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    finally:
+        _flush_lock.release()
+
+
+# Registered once, whatever the number of create_app() calls
+os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(flush, True)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect():
+    """Values summed over every process's snapshot"""
+    flush(force=True)
+    totals = {}
+    directory = _state['dir']
+    for name in os.listdir(directory):
+        if not (name.startswith('metrics_') and name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue  # removed or replaced while we listed the directory
+        alive = None
+        for metric, labels, value in snapshot['values']:
+            if metric not in METRICS:
+                continue
+            if METRICS[metric][0] == GAUGE:
+                if alive is None:
+                    alive = _alive(snapshot['pid'])
+                if not alive:
+                    continue
+            key = (metric, tuple(tuple(pair) for pair in labels))
+            if isinstance(value, list):
+                current = totals.setdefault(key, [0] * len(value))
+                totals[key] = [a + b for a, b in zip(current, value)]
+            else:
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Prometheus text exposition format (version 0.0.4)"""
+    totals = collect()
+    lines = []
+    for metric, (kind, description, buckets) in METRICS.items():
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for (name, labels), value in sorted(totals.items()):
+            if name != metric:
+                continue
+            if kind != HISTOGRAM:
+                lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), value[:-1]):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {_number(value[-1])}")
+            lines.append(f"{metric}_count{_labels(labels)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+# ---------------------
+# Request hooks
+# ---------------------
+def _start_request():
+    g._metrics_start = time.perf_counter()
+    g._metrics_in_flight = True
+    inc('eduquest_http_requests_in_flight', amount=1)
+
+
+def _finish_request(response):
+    started = g.pop('_metrics_start', None)
+    if started is None or request.endpoint in ('static', 'prometheus_metrics'):
+        return response
+    endpoint = request.endpoint or 'unmatched'  # 404s: one label, not one per path
+    labels = {'endpoint': endpoint, 'method': request.method}
+    observe('eduquest_http_request_duration_seconds', time.perf_counter() - started, labels)
+    inc('eduquest_http_requests_total', dict(labels, status=str(response.status_code)))
+
+    stats = query_stats.current()
+    if stats is not None:
+        inc('eduquest_db_queries_total', {'endpoint': endpoint}, stats['queries'])
+        inc('eduquest_db_time_seconds_total', {'endpoint': endpoint}, stats['db_time'])
+    return response
+
+
+def _end_request(error=None):
+    if not g.pop('_metrics_in_flight', False):
+        return
+    inc('eduquest_http_requests_in_flight', amount=-1)
+    flush()
+
+
+def prometheus_metrics():
+    if not current_app.config['METRICS_ENABLED']:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return current_app.response_class(render(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    app.add_url_rule('/metrics', 'prometheus_metrics', prometheus_metrics)
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    _state['dir'] = app.config['METRICS_DIR']
+    _state['interval'] = app.config.get('METRICS_FLUSH_INTERVAL', 1.0)
+    os.makedirs(_state['dir'], exist_ok=True)
+    _state['path'] = _snapshot_path(_state['dir'])
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_end_request)
@@ -1,8 +1,9 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import hash_password, verify_password
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 
@@ -44,11 +45,11 @@ class Feedback(db.Model):
     __tablename__ = 'feedback'
     
     id = db.Column(db.Integer, primary_key=True)
-    school_id = db.Column(db.Integer, db.ForeignKey('school.id'), nullable=False)
+    school_id = db.Column(db.Integer, db.ForeignKey('school.id'), nullable=False, index=True)
     name = db.Column(db.String(120), nullable=False)
     email = db.Column(db.String(120), nullable=True)
     message = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     # Admin reply fields
     admin_reply = db.Column(db.Text, nullable=True)
@@ -91,6 +92,16 @@ class Principal(db.Model):
     verification_token = db.Column(db.String(100))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    def set_password(self, password):
+        self.password_hash = hash_password(password)
+
+    def check_password(self, password):
+        # Upgrades the stored hash in place when the configured cost changed
+        ok, upgraded_hash = verify_password(self.password_hash, password)
+        if upgraded_hash:
+            self.password_hash = upgraded_hash
+        return ok
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -111,7 +122,7 @@ class MeetingBooking(db.Model):
     __tablename__ = 'meeting_booking'
     
     id = db.Column(db.Integer, primary_key=True)
-    school_id = db.Column(db.Integer, db.ForeignKey('school.id'), nullable=False)
+    school_id = db.Column(db.Integer, db.ForeignKey('school.id'), nullable=False, index=True)
     principal_id = db.Column(db.Integer, db.ForeignKey('principal.id'), nullable=False)
     user_name = db.Column(db.String(200), nullable=False)
     user_email = db.Column(db.String(120), nullable=False)
@@ -120,7 +131,7 @@ class MeetingBooking(db.Model):
     preferred_date = db.Column(db.DateTime, nullable=False)
     status = db.Column(db.String(20), default='pending')
     special_requirements = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     def to_dict(self):
         return {
@@ -146,10 +157,17 @@ class Admin(db.Model):
     password_hash = db.Column(db.String(200), nullable=False)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        # Upgrades the stored hash in place when the configured cost changed
+        ok, upgraded_hash = verify_password(self.password_hash, password)
+        if upgraded_hash:
+            self.password_hash = upgraded_hash
+        return ok
+
+# Account types a User registers as (principals have their own table)
+USER_ROLES = ('parent', 'student')
 
 # ✅ SIMPLE User model (NO RELATIONSHIPS FOR NOW)
 class User(db.Model):
@@ -160,14 +178,19 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
     phone = db.Column(db.String(20))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    role = db.Column(db.String(20), nullable=False, default='parent', server_default='parent', index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     is_active = db.Column(db.Boolean, default=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        # Upgrades the stored hash in place when the configured cost changed
+        ok, upgraded_hash = verify_password(self.password_hash, password)
+        if upgraded_hash:
+            self.password_hash = upgraded_hash
+        return ok
 
     def to_dict(self):
         return {
@@ -175,5 +198,30 @@ class User(db.Model):
             "name": self.name,
             "email": self.email,
             "phone": self.phone,
+            "role": self.role,
             "created_at": self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+# ✅ Data version counters (bumped automatically on every write, see versions.py)
+class DataVersion(db.Model):
+    __tablename__ = 'data_version'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# ✅ Daily rollups (maintained at write time, see rollups.py)
+class DailyStat(db.Model):
+    __tablename__ = 'daily_stats'
+    
+    day = db.Column(db.Date, primary_key=True)
+    school_id = db.Column(db.Integer, primary_key=True, default=0)  # 0 = not tied to a school (users)
+    new_users = db.Column(db.Integer, nullable=False, default=0)
+    feedback_received = db.Column(db.Integer, nullable=False, default=0)
+    admin_replies = db.Column(db.Integer, nullable=False, default=0)
+    principal_replies = db.Column(db.Integer, nullable=False, default=0)
+    meetings_pending = db.Column(db.Integer, nullable=False, default=0)
+    meetings_approved = db.Column(db.Integer, nullable=False, default=0)
+    meetings_confirmed = db.Column(db.Integer, nullable=False, default=0)
+    meetings_declined = db.Column(db.Integer, nullable=False, default=0)
+    meetings_completed = db.Column(db.Integer, nullable=False, default=0)
+    meetings_cancelled = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,149 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Optional argon2 support (pip install argon2-cffi)
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+except ImportError:  # argon2-cffi not installed
+    PasswordHasher = None
+
+# ---------------------
+# Password Hashing
+# ---------------------
+# Hashing is CPU heavy on purpose. hashlib's pbkdf2/scrypt and argon2-cffi all
+# release the GIL, so running them on a small dedicated pool lets several logins
+# hash in parallel while capping how many cores a login burst can take.
+
+DEFAULT_METHOD = 'scrypt'
+
+# Cost presets used by the benchmark and handy for PASSWORD_HASH_METHOD
+COST_PRESETS = {
+    'pbkdf2-low': 'pbkdf2:sha256:260000',
+    'pbkdf2': 'pbkdf2:sha256:600000',
+    'scrypt-low': 'scrypt:16384:8:1',
+    'scrypt': 'scrypt:32768:8:1',
+    'argon2-low': 'argon2:2:19456:1',
+    'argon2': 'argon2:3:65536:4',
+}
+
+
+class PasswordHashing:
+    """Bounded executor plus configurable algorithm/cost for password hashes"""
+
+    def __init__(self, method=DEFAULT_METHOD, workers=None, timeout=30):
+        self.method = COST_PRESETS.get(method, method)
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._argon2 = None
+        self._prefix = None
+
+        if self.method.startswith('argon2'):
+            if PasswordHasher is None:
+                print("⚠️ argon2-cffi not installed - falling back to scrypt")
+                self.method = COST_PRESETS['scrypt']
+            else:
+                self._argon2 = _make_argon2(self.method)
+
+    @property
+    def executor(self):
+        # Created lazily so forked workers each get their own threads
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix='pwhash'
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        return self.executor.submit(fn, *args).result(timeout=self.timeout)
+
+    # Synchronous versions (run on the calling thread)
+    def hash_sync(self, password):
+        if self._argon2 is not None:
+            return self._argon2.hash(password)
+        return generate_password_hash(password, method=self.method)
+
+    def verify_sync(self, stored_hash, password):
+        if not stored_hash or password is None:
+            return False
+        if stored_hash.startswith('$argon2'):
+            hasher = self._argon2 or (PasswordHasher() if PasswordHasher else None)
+            if hasher is None:
+                return False
+            try:
+                return hasher.verify(stored_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        return check_password_hash(stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """True when the stored hash uses a different algorithm or cost than configured"""
+        if self._argon2 is not None:
+            if not stored_hash.startswith('$argon2'):
+                return True
+            return self._argon2.check_needs_rehash(stored_hash)
+        if stored_hash.startswith('$argon2'):
+            return True
+        return stored_hash.split('$', 1)[0] != self._method_prefix()
+
+    def _method_prefix(self):
+        # werkzeug expands "scrypt" to "scrypt:32768:8:1" etc, so learn the
+        # exact prefix from a real (cheap, once per process) hash
+        if self._prefix is None:
+            self._prefix = self.hash_sync('').split('$', 1)[0]
+        return self._prefix
+
+    # Executor-backed versions used by the routes
+    def hash(self, password):
+        return self._run(self.hash_sync, password)
+
+    def verify(self, stored_hash, password):
+        """Check a password; returns (ok, upgraded_hash_or_None)"""
+        ok = self._run(self.verify_sync, stored_hash, password)
+        if ok and self.needs_rehash(stored_hash):
+            return True, self.hash(password)
+        return ok, None
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def _make_argon2(method):
+    """Build an argon2 hasher from "argon2[:time_cost:memory_kib:parallelism]" """
+    parts = method.split(':')[1:]
+    time_cost, memory_cost, parallelism = 3, 65536, 4
+    if len(parts) == 3:
+        time_cost, memory_cost, parallelism = (int(p) for p in parts)
+    return PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+hashing = PasswordHashing()
+
+
+def init_app(app):
+    """Configure hashing from PASSWORD_HASH_METHOD / PASSWORD_HASH_WORKERS"""
+    global hashing
+    hashing.shutdown()
+    hashing = PasswordHashing(
+        method=app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+        workers=app.config.get('PASSWORD_HASH_WORKERS'),
+        timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 30)
+    )
+    return hashing
+
+
+def hash_password(password):
+    return hashing.hash(password)
+
+
+def verify_password(stored_hash, password):
+    return hashing.verify(stored_hash, password)
@@ -0,0 +1,208 @@
+import os
+import time
+
+from flask import Blueprint, current_app, jsonify, redirect, render_template, request, session
+from werkzeug.utils import secure_filename
+
+import app_logging
+import fast_json
+from helpers import allowed_file, current_principal_identity, invalidate_user_statistics, save_password_upgrade
+from models import db, School, Principal, MeetingBooking
+from sessions import invalidate_identity, regenerate
+
+# Principal registration, login, dashboard and profile
+
+bp = Blueprint('principal', __name__)
+log = app_logging.get_logger('principal')
+
+
+# ---------------------
+# Principal Pages
+# ---------------------
+@bp.route('/principal-registration')
+def principal_registration_page():
+    """Principal registration page"""
+    schools = School.query.all()  # Get schools for dropdown
+    return render_template('principal-register.html', schools=schools)
+
+@bp.route('/principal-dashboard')
+def principal_dashboard():
+    # Check if principal is logged in
+    if not session.get('principal_logged_in'):
+        log.debug("principal dashboard: not logged in")
+        return redirect('/')
+    
+    # Get principal and school data (cached in the server-side session)
+    identity = current_principal_identity()
+    principal = identity['principal'] if identity else None
+    school = identity['school'] if identity else None
+    
+    if not principal or not school:
+        log.info("principal dashboard: account or school missing, session cleared",
+                 extra={'principal_id': session.get('principal_id'), 'school_id': session.get('principal_school_id')})
+        session.clear()
+        return redirect('/')
+    
+    # Get meetings for this principal
+    meetings = MeetingBooking.query.filter_by(principal_id=principal['id']).order_by(MeetingBooking.created_at.desc()).all()
+    log.debug("principal dashboard", extra={'principal_id': principal['id'], 'meetings': len(meetings)})
+    
+    return render_template('principal-dashboard.html', 
+                         principal=principal, 
+                         school=school,
+                         meetings=meetings)
+
+
+# ---------------------
+# Principal API
+# ---------------------
+@bp.route('/api/principals/register', methods=['POST'])
+def register_principal():
+    try:
+        data = request.json or {}
+        log.debug("principal registration attempt", extra={'school_id': data.get('school_id')})
+        
+        # Validation
+        required_fields = ['school_id', 'name', 'email', 'phone', 'password']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        
+        # Check if email already exists
+        if Principal.query.filter_by(email=data['email']).first():
+            return jsonify({"error": "Email already registered"}), 400
+        
+        # Create principal
+        principal = Principal(
+            school_id=data['school_id'],
+            name=data['name'],
+            email=data['email'],
+            phone=data['phone'],
+            is_active=True  # AUTO-ACTIVATE FOR NOW
+        )
+        principal.set_password(data['password'])
+        
+        db.session.add(principal)
+        db.session.commit()
+        invalidate_user_statistics()
+        
+        log.info("principal registered", extra={'principal_id': principal.id, 'school_id': principal.school_id})
+        
+        return jsonify({
+            "message": "Registration successful!",
+            "principal_id": principal.id
+        }), 201
+        
+    except Exception as e:
+        log.exception("principal registration failed")
+        db.session.rollback()
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+#PRINCIPAL LOGIN ROUTE 
+@bp.route('/api/principals/login', methods=['POST'])
+def principal_login():
+    try:
+        data = request.json or {}
+        
+        # Validation
+        if not data.get('email') or not data.get('password'):
+            return jsonify({"error": "Email and password required"}), 400
+        
+        # Find principal by email
+        principal = Principal.query.filter_by(email=data['email']).first()
+        if not principal:
+            return jsonify({"error": "Invalid credentials"}), 401
+        
+        # Check password
+        if not principal.check_password(data['password']):
+            return jsonify({"error": "Invalid credentials"}), 401
+        save_password_upgrade(principal)
+        
+        # Check if account is active
+        if not principal.is_active:
+            return jsonify({"error": "Account pending admin approval. Please wait for activation."}), 403
+        
+        # Login successful - create session
+        regenerate()
+        session['principal_logged_in'] = True
+        session['principal_id'] = principal.id
+        session['principal_school_id'] = principal.school_id
+        session['principal_name'] = principal.name
+        invalidate_identity()
+        
+        return jsonify({
+            "message": "Login successful",
+            "principal": principal.to_dict()
+        }), 200
+        
+    except Exception as e:
+        log.exception("principal login failed")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@bp.route('/api/principals/logout', methods=['POST'])
+def principal_logout():
+    session.clear()
+    return jsonify({"message": "Logged out successfully"}), 200
+
+#PRINCIPAL PROFILE UPDATE ROUTE
+@bp.route('/api/principals/profile', methods=['POST'])
+def update_principal_profile():
+    try:
+        # Check if principal is logged in
+        if not session.get('principal_logged_in'):
+            return jsonify({"error": "Unauthorized"}), 401
+        
+        principal = Principal.query.get(session['principal_id'])
+        if not principal:
+            return jsonify({"error": "Principal not found"}), 404
+        
+        # Handle file upload
+        if 'profile_photo' in request.files:
+            file = request.files['profile_photo']
+            if file and file.filename != '' and allowed_file(file.filename):
+                # Generate unique filename
+                filename = secure_filename(file.filename)
+                unique_filename = f"principal_{principal.id}_{int(time.time())}_{filename}"
+                file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
+                
+                # Save file
+                file.save(file_path)
+                principal.image_url = f"/static/images/schools/{unique_filename}"
+        
+        # Update other fields
+        principal.name = request.form.get('name', principal.name)
+        principal.email = request.form.get('email', principal.email)
+        principal.phone = request.form.get('phone', principal.phone)
+        principal.bio = request.form.get('bio', principal.bio)
+        principal.qualifications = request.form.get('qualifications', principal.qualifications)
+        principal.office_hours = request.form.get('office_hours', principal.office_hours)
+        
+        db.session.commit()
+        invalidate_identity()
+        
+        return jsonify({
+            "message": "Profile updated successfully",
+            "principal": principal.to_dict()
+        }), 200
+        
+    except Exception as e:
+        log.exception("principal profile update failed")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+#ROUTE FOR PRINCIPALS
+@bp.route('/debug-principals')
+def debug_principals():
+    """Check all principals in database"""
+    try:
+        principals_data = fast_json.records(db.select(
+            Principal.id, Principal.name, Principal.email, Principal.school_id,
+            Principal.is_active, Principal.created_at
+        ))
+        
+        return fast_json.response({
+            "total_principals": len(principals_data),
+            "principals": principals_data
+        })
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
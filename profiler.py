@@ -0,0 +1,250 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import current_app, g, request
+from itsdangerous import BadSignature, TimestampSigner
+
+import app_logging
+
+# ---------------------
+# Request Profiler
+# ---------------------
+# Statistical profiling of live requests without a redeploy. While a request
+# is profiled, a sampler thread records the request thread's stack every
+# PROFILE_INTERVAL seconds; afterwards the stacks are written to PROFILE_DIR
+# as collapsed stacks (.folded, for flamegraph.pl / speedscope) and as a
+# speedscope JSON profile. A request is profiled when
+#   - the admin switch is on for its endpoint ('*' = any) and it falls in the
+#     sampled share (rate 0..1), until the switch expires, or
+#   - it carries X-Profile: <token from token()> (signed with SECRET_KEY).
+# The switch is a small file so every worker sees it; it is re-read at most
+# once per second, so with profiling off a request costs one time comparison.
+
+HEADER = 'X-Profile'
+SWITCH_FILE = 'switch.json'
+TOKEN_SALT = 'eduquest-profile'
+
+log = app_logging.get_logger('profiler')
+
+_switch = {'settings': None, 'checked': 0.0, 'mtime': None}
+_SAFE_NAME = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+class Sampler(threading.Thread):
+    """Collects the stacks of one thread until stop()"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.elapsed = time.perf_counter() - self.started
+
+
+# ---------------------
+# Output formats
+# ---------------------
+def _short_path(filename):
+    _, sep, tail = filename.rpartition('site-packages' + os.sep)
+    if sep:
+        return tail
+    return os.path.relpath(filename) if filename.startswith(os.getcwd()) else filename
+
+
+def _frame_label(frame):
+    name, filename, line = frame
+    return f"{name} ({_short_path(filename)}:{line})"
+
+
+def collapsed(stacks):
+    """Brendan Gregg's folded format: 'outer;inner;leaf count' per line"""
+    return ''.join(
+        ';'.join(_frame_label(frame).replace(';', ':') for frame in stack) + f" {count}\n"
+        for stack, count in stacks.most_common()
+    )
+
+
+def speedscope(stacks, name, interval):
+    frames, index = [], {}
+    samples, weights = [], []
+    for stack, count in stacks.most_common():
+        ids = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({'name': frame[0], 'file': _short_path(frame[1]), 'line': frame[2]})
+            ids.append(index[frame])
+        samples.append(ids)
+        weights.append(count * interval)
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'eduquest profiler',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled', 'name': name, 'unit': 'seconds',
+            'startValue': 0, 'endValue': sum(weights),
+            'samples': samples, 'weights': weights,
+        }],
+    }
+
+
+# ---------------------
+# Switch (shared by all workers through PROFILE_DIR)
+# ---------------------
+def _switch_path():
+    return os.path.join(current_app.config['PROFILE_DIR'], SWITCH_FILE)
+
+
+def enable(endpoint, rate=1.0, minutes=10):
+    settings = {'endpoint': endpoint, 'rate': max(0.0, min(float(rate), 1.0)),
+                'expires_at': time.time() + float(minutes) * 60}
+    path = _switch_path()
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(settings, f)
+    os.replace(f"{path}.tmp", path)
+    _switch['checked'] = 0.0
+    return settings
+
+
+def disable():
+    try:
+        os.remove(_switch_path())
+    except FileNotFoundError:
+        pass
+    _switch['checked'] = 0.0
+
+
+def settings():
+    """Current switch settings or None (cached for a second)"""
+    now = time.monotonic()
+    if now - _switch['checked'] >= 1.0:
+        _switch['checked'] = now
+        try:
+            mtime = os.stat(_switch_path()).st_mtime
+        except FileNotFoundError:
+            _switch.update(settings=None, mtime=None)
+        else:
+            if mtime != _switch['mtime']:
+                try:
+                    with open(_switch_path()) as f:
+                        _switch.update(settings=json.load(f), mtime=mtime)
+                except (OSError, ValueError):
+                    _switch.update(settings=None, mtime=None)
+    active = _switch['settings']
+    if active and active['expires_at'] < time.time():
+        return None
+    return active
+
+
+def token():
+    """Value for the X-Profile header (valid for PROFILE_TOKEN_MAX_AGE seconds)"""
+    return TimestampSigner(current_app.config['SECRET_KEY'], salt=TOKEN_SALT).sign('profile').decode()
+
+
+def _valid_token(value):
+    try:
+        TimestampSigner(current_app.config['SECRET_KEY'], salt=TOKEN_SALT).unsign(
+            value, max_age=current_app.config['PROFILE_TOKEN_MAX_AGE'])
+        return True
+    except BadSignature:
+        return False
+
+
+def recent_files(limit=50):
+    directory = current_app.config['PROFILE_DIR']
+    names = [n for n in os.listdir(directory) if n.endswith(('.folded', '.speedscope.json'))]
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(directory, n)), reverse=True)
+    return names[:limit]
+
+
+# ---------------------
+# Request hooks
+# ---------------------
+def _should_profile():
+    header = request.headers.get(HEADER)
+    if header:
+        return _valid_token(header)
+    active = settings()
+    if not active or active['endpoint'] not in ('*', request.endpoint):
+        return False
+    return random.random() < active['rate']
+
+
+def _start_request():
+    if request.endpoint == 'static' or not _should_profile():
+        return
+    sampler = Sampler(threading.get_ident(), current_app.config['PROFILE_INTERVAL'])
+    g._profiler = sampler
+    sampler.start()
+
+
+def _write(sampler, name):
+    config = current_app.config
+    directory = config['PROFILE_DIR']
+    base = os.path.join(directory, name)
+    with open(f"{base}.folded", 'w') as f:
+        f.write(collapsed(sampler.stacks))
+    with open(f"{base}.speedscope.json", 'w') as f:
+        json.dump(speedscope(sampler.stacks, name, config['PROFILE_INTERVAL']), f)
+
+    # Keep the newest PROFILE_MAX_FILES profiles (two files each)
+    files = sorted(
+        (os.path.join(directory, n) for n in os.listdir(directory) if n.endswith('.folded')),
+        key=os.path.getmtime, reverse=True
+    )
+    for path in files[config['PROFILE_MAX_FILES']:]:
+        for stale in (path, path[:-len('.folded')] + '.speedscope.json'):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+
+def _end_request(error=None):
+    sampler = g.pop('_profiler', None)
+    if sampler is None:
+        return
+    sampler.stop()
+    name = _SAFE_NAME.sub('_', f"{time.strftime('%Y%m%d-%H%M%S')}_{request.endpoint or 'unmatched'}"
+                               f"_{g.get('request_id', os.getpid())}")
+    try:
+        _write(sampler, name)
+        log.info("request profiled", extra={
+            'method': request.method, 'path': request.path, 'profile': name,
+            'samples': sum(sampler.stacks.values()), 'elapsed_s': round(sampler.elapsed, 3)
+        })
+    except OSError:
+        log.exception("could not write profile", extra={'profile': name})
+
+
+def init_app(app):
+    app.config.setdefault('PROFILE_DIR', os.path.join(app.root_path, 'profiles'))
+    app.config.setdefault('PROFILE_INTERVAL', 0.005)
+    app.config.setdefault('PROFILE_MAX_FILES', 100)
+    app.config.setdefault('PROFILE_TOKEN_MAX_AGE', 3600)
+    os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+    app.before_request(_start_request)
+    app.teardown_request(_end_request)
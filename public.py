@@ -0,0 +1,212 @@
+from flask import Blueprint, jsonify, redirect, render_template, request, session
+
+import app_logging
+import db_routing
+import fast_json
+import school_cache
+from helpers import current_user_identity, invalidate_user_statistics, save_password_upgrade
+from models import db, School, Principal, User, USER_ROLES
+from sessions import invalidate_identity, regenerate
+
+# Public pages, school listings and parent/student accounts
+
+bp = Blueprint('public', __name__)
+log = app_logging.get_logger('public')
+
+
+# ---------------------
+# Frontend Routes
+# ---------------------
+@bp.route('/')
+def home():
+    """Home page with user session data"""
+    user_data = None
+    if session.get('user_logged_in'):
+        user = current_user_identity()
+        if user:
+            user_data = {
+                'name': user['name'],
+                'email': user['email']
+            }
+    return render_template('index.html', user=user_data)
+
+@bp.route('/about')
+def about():
+    """About page"""
+    return render_template('about.html')
+
+@bp.route('/contact')
+def contact():
+    """Contact page"""
+    return render_template('contact.html')
+
+@bp.route('/profile')
+def profile():
+    """User profile page"""
+    if not session.get('user_logged_in'):
+        return redirect('/login')
+    
+    user = User.query.get(session['user_id'])
+    if not user:
+        session.clear()
+        return redirect('/login')
+    
+    return render_template('profile.html', user=user)
+
+@bp.route('/schools')
+@db_routing.read_only_view
+def schools_page():
+    all_schools = School.query.all()
+    return render_template('school.html', schools=all_schools)
+
+@bp.route('/school/<int:id>')
+@db_routing.read_only_view
+def school_details(id):
+    # The same page for every visitor: rendered once per school version (see school_cache)
+    return school_cache.cached('page', id, lambda: render_school_details(id))
+
+def render_school_details(id):
+    # Feedback is loaded by the page itself from /api/schools/<id>/feedback
+    school = School.query.get_or_404(id)
+    
+    # Get principal data directly
+    try:
+        principal = Principal.query.filter_by(school_id=id).first()
+    except Exception:
+        principal = None
+
+    return render_template('school_details.html', 
+                         school=school, 
+                         principal=principal).encode()
+
+@bp.route('/register')
+def register_page():
+    """User registration page"""
+    return render_template('register.html')
+
+@bp.route('/login')
+def login_page():
+    """Unified login page for all user types"""
+    return render_template('login.html')
+
+
+# ---------------------
+# API Routes
+# ---------------------
+@bp.route('/api/schools')
+@db_routing.read_only_view
+def api_schools():
+    return fast_json.response(fast_json.records(db.select(
+        School.id, School.name, School.region, School.level, School.contact, School.description,
+        School.accessibility, School.fee_structure, School.image_url
+    )))
+
+@bp.route('/api/schools/<int:id>', methods=['GET'])
+@db_routing.read_only_view
+def get_school(id):
+    s = School.query.get_or_404(id)
+    return jsonify(s.to_dict()), 200
+
+@bp.route('/api/users/register', methods=['POST'])
+def register_user():
+    """Register new user/parent"""
+    try:
+        data = request.json or {}
+        
+        # Validation
+        required_fields = ['name', 'email', 'password']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        
+        # Check if email exists
+        if User.query.filter_by(email=data['email']).first():
+            return jsonify({"error": "Email already registered"}), 400
+        
+        role = data.get('role') or 'parent'
+        if role not in USER_ROLES:
+            return jsonify({"error": f"Invalid role: {role}"}), 400
+        
+        # Create user
+        user = User(
+            name=data['name'],
+            email=data['email'],
+            phone=data.get('phone'),
+            role=role
+        )
+        user.set_password(data['password'])
+        
+        db.session.add(user)
+        db.session.commit()
+        invalidate_user_statistics()
+        
+        return jsonify({
+            "message": "Registration successful!",
+            "user": user.to_dict()
+        }), 201
+        
+    except Exception as e:
+        log.exception("user registration failed")
+        db.session.rollback()
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@bp.route('/api/login', methods=['POST'])
+def unified_login():
+    """Smart login endpoint for Users and Principals ONLY"""
+    try:
+        data = request.json or {}
+        email = data.get('email')
+        password = data.get('password')
+        user_type = data.get('user_type')
+        
+        log.debug("login attempt", extra={'user_type': user_type})
+        
+        if not all([email, password, user_type]):
+            return jsonify({"error": "All fields are required"}), 400
+        
+        # REMOVED ADMIN LOGIN - Only handle User and Principal
+        
+        if user_type == 'principal':
+            # Principal login
+            principal = Principal.query.filter_by(email=email).first()
+            if principal and principal.check_password(password):
+                save_password_upgrade(principal)
+                if not principal.is_active:
+                    return jsonify({"error": "Account pending admin approval"}), 403
+                regenerate()
+                session['principal_logged_in'] = True
+                session['principal_id'] = principal.id
+                session['principal_school_id'] = principal.school_id
+                session['principal_name'] = principal.name
+                invalidate_identity()
+                return jsonify({"message": "Principal login successful"}), 200
+        
+        elif user_type == 'user':
+            # User/Parent login
+            user = User.query.filter_by(email=email).first()
+            if user and user.check_password(password):
+                save_password_upgrade(user)
+                if not user.is_active:
+                    return jsonify({"error": "Account deactivated"}), 403
+                regenerate()
+                session['user_logged_in'] = True
+                session['user_id'] = user.id
+                session['user_name'] = user.name
+                invalidate_identity()
+                return jsonify({"message": "User login successful"}), 200
+        
+        # If we get here, login failed
+        return jsonify({"error": "Invalid credentials"}), 401
+        
+    except Exception as e:
+        log.exception("login failed")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@bp.route('/api/users/logout')
+def user_logout():
+    """Log out user and redirect to home"""
+    session.pop('user_logged_in', None)
+    session.pop('user_id', None)
+    session.pop('user_name', None)
+    invalidate_identity()
+    return redirect('/')
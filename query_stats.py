@@ -0,0 +1,152 @@
+import re
+import time
+from collections import deque
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import app_logging
+
+# ---------------------
+# Per-Request SQL Stats
+# ---------------------
+# Cursor events on every engine (write and read-only) count the statements a
+# request runs and how long the database took. Statements are reduced to a
+# "shape" (literals and IN lists collapsed); a shape repeated
+# SQL_STATS_REPEAT_THRESHOLD+ times in one request is flagged as a likely
+# N+1. Finished requests go into a ring buffer for the admin endpoint, and in
+# debug mode (or with SQL_STATS_HEADERS) the numbers are added as headers:
+#   X-DB-Queries, X-DB-Time-ms, X-DB-Repeated (flagged shapes)
+
+STATS_KEY = '_sql_stats'
+
+log = app_logging.get_logger('sql')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def shape(statement):
+    """SQL with literals and IN lists collapsed, so repeated queries compare equal"""
+    statement = _STRING.sub('?', statement)
+    statement = _NUMBER.sub('?', statement)
+    statement = _IN_LIST.sub('(?)', statement)
+    return _SPACE.sub(' ', statement).strip()
+
+
+def _stats():
+    if not has_request_context():
+        return None
+    return g.get(STATS_KEY)
+
+
+def current():
+    """This request's stats so far ({'queries', 'db_time', ...}) or None"""
+    return _stats()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _stats() is not None:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _stats()
+    starts = conn.info.get('query_start')
+    if stats is None or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats['queries'] += 1
+    stats['db_time'] += elapsed
+    entry = stats['shapes'].setdefault(shape(statement), [0, 0.0])
+    entry[0] += 1
+    entry[1] += elapsed
+    slowest = stats['slowest']
+    slowest.append((elapsed, statement))
+    if len(slowest) > current_app.config['SQL_STATS_SLOWEST']:
+        slowest.remove(min(slowest))
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    starts = context.connection.info.get('query_start') if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _start_request():
+    setattr(g, STATS_KEY, {
+        'queries': 0, 'db_time': 0.0, 'shapes': {}, 'slowest': [], 'started': time.perf_counter()
+    })
+
+
+def summary(stats, threshold):
+    """JSON-friendly view of one request's stats"""
+    repeated = sorted(
+        ((s, count, total) for s, (count, total) in stats['shapes'].items() if count >= threshold),
+        key=lambda item: item[1], reverse=True
+    )
+    return {
+        'queries': stats['queries'],
+        'db_ms': round(stats['db_time'] * 1000, 2),
+        'distinct_statements': len(stats['shapes']),
+        'slowest': [{'ms': round(t * 1000, 2), 'sql': sql}
+                    for t, sql in sorted(stats['slowest'], reverse=True)],
+        'repeated': [{'count': count, 'ms': round(total * 1000, 2), 'sql': s} for s, count, total in repeated],
+    }
+
+
+def _finish_request(response):
+    stats = _stats()
+    if stats is None or request.endpoint == 'static':
+        return response
+    config = current_app.config
+    result = summary(stats, config['SQL_STATS_REPEAT_THRESHOLD'])
+    result.update({
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'request_ms': round((time.perf_counter() - stats['started']) * 1000, 2),
+    })
+    current_app.extensions['sql_stats'].append(result)
+
+    if result['repeated'] and current_app.debug:
+        worst = result['repeated'][0]
+        log.warning("possible N+1", extra={
+            'method': request.method, 'path': request.path, 'endpoint': request.endpoint,
+            'repeat_count': worst['count'], 'sql': worst['sql'][:120]
+        })
+    if config['SQL_STATS_HEADERS'] or current_app.debug:
+        response.headers['X-DB-Queries'] = str(result['queries'])
+        response.headers['X-DB-Time-ms'] = f"{result['db_ms']:.2f}"
+        response.headers['X-DB-Repeated'] = str(len(result['repeated']))
+    return response
+
+
+def recent(limit=None):
+    """Newest-first request summaries from this process's ring buffer"""
+    entries = list(current_app.extensions.get('sql_stats', ()))[::-1]
+    return entries[:limit] if limit else entries
+
+
+def init_app(app):
+    app.config.setdefault('SQL_STATS', True)
+    app.config.setdefault('SQL_STATS_HEADERS', False)
+    app.config.setdefault('SQL_STATS_BUFFER', 200)
+    app.config.setdefault('SQL_STATS_SLOWEST', 3)
+    app.config.setdefault('SQL_STATS_REPEAT_THRESHOLD', 5)
+    if not app.config['SQL_STATS']:
+        return
+    app.extensions['sql_stats'] = deque(maxlen=app.config['SQL_STATS_BUFFER'])
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    # On the Engine class so the read-only engine (and any later one) is covered too
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
@@ -0,0 +1,681 @@
+import tempfile
+
+from flask import current_app
+
+import report_charts
+import report_exports
+import rollups
+from models import db, School, Principal, Feedback, MeetingBooking, User, USER_ROLES
+
+# ---------------------
+# Report Builder
+# ---------------------
+# Data collection and rendering for system reports. These run in report_jobs'
+# pool processes; the web process only imports this module on its first
+# reports request (see reports.setup).
+# ReportLab and matplotlib are imported inside the report code path
+# (create_pdf_report, report_charts) so web workers don't pay for them at
+# startup. See benchmarks/bench_startup.py.
+
+
+def collect_report_data(date_range='all'):
+    """Collect comprehensive system data for report
+    
+    Every statistic comes from a handful of conditional-aggregate / GROUP BY
+    queries instead of one COUNT(*) per number.
+    """
+    from datetime import datetime, timedelta
+    
+    # Calculate date filter
+    if date_range == 'week':
+        start_date = datetime.now() - timedelta(days=7)
+    elif date_range == 'month':
+        start_date = datetime.now() - timedelta(days=30)
+    elif date_range == 'quarter':
+        start_date = datetime.now() - timedelta(days=90)
+    else:
+        start_date = None
+    
+    now = datetime.now()
+    today_start = datetime.combine(now.date(), datetime.min.time())
+    week_ago = now - timedelta(days=7)
+    month_ago = now - timedelta(days=30)
+    
+    def count_if(condition):
+        return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+    
+    # User statistics - one pass over the user table
+    users_total, users_today, users_week, users_month, *role_counts = db.session.query(
+        db.func.count(User.id),
+        count_if(User.created_at >= today_start),
+        count_if(User.created_at >= week_ago),
+        count_if(User.created_at >= month_ago),
+        *[count_if(User.role == role) for role in USER_ROLES]
+    ).one()
+    
+    # Principal statistics
+    principals_total, principals_active, principals_inactive = db.session.query(
+        db.func.count(Principal.id),
+        count_if(Principal.is_active == True),
+        count_if(Principal.is_active == False)
+    ).one()
+    
+    # Feedback statistics
+    feedback_total, with_admin_reply, with_principal_reply, pending_reply = db.session.query(
+        db.func.count(Feedback.id),
+        count_if(Feedback.admin_reply.isnot(None)),
+        count_if(Feedback.principal_reply.isnot(None)),
+        count_if(db.and_(Feedback.admin_reply.is_(None), Feedback.principal_reply.is_(None)))
+    ).one()
+    
+    # Meeting statistics grouped by status
+    meetings_by_status = {status: 0 for status in rollups.MEETING_STATUSES}
+    meetings_total = 0
+    for status, count in db.session.query(MeetingBooking.status, db.func.count(MeetingBooking.id)).group_by(MeetingBooking.status):
+        meetings_total += count
+        if status in meetings_by_status:
+            meetings_by_status[status] = count
+    
+    # School distribution computed in SQL
+    region = db.func.coalesce(School.region, 'Unknown')
+    level = db.func.coalesce(School.level, 'Unknown')
+    schools_by_region = dict(db.session.query(region, db.func.count(School.id)).group_by(region).all())
+    schools_by_level = dict(db.session.query(level, db.func.count(School.id)).group_by(level).all())
+    schools_total = sum(schools_by_region.values())
+    
+    # Activity in the requested period from the daily_stats rollup
+    start_day = start_date.date() if start_date else None
+    period_totals = rollups.window_totals(start_day)
+    period_by_region = rollups.window_by_region(start_day)
+    
+    # Growth for the CHANGE column: what was added in the period (last 30 days for "all")
+    change_start = start_date or month_ago
+    change_totals = period_totals if start_date else rollups.window_totals(change_start.date())
+    new_principals = Principal.query.filter(Principal.created_at >= change_start).count()
+    
+    # Detail lists for the period are streamed queries of plain rows (re-iterable,
+    # fetched in batches), not loaded lists: exports write every row while the
+    # PDF slices off the few it shows. Each format iterates them again, so
+    # report_jobs collects and renders inside one db_routing.snapshot().
+    def detail_rows(query, created_at):
+        if start_date:
+            query = query.filter(created_at >= start_date)
+        return query.order_by(created_at.desc()).yield_per(1000)
+    
+    users_list = detail_rows(
+        db.session.query(User.id, User.name, User.email, User.phone, User.role, User.created_at, User.is_active),
+        User.created_at
+    )
+    feedback_list = detail_rows(
+        db.session.query(
+            Feedback.id, School.name.label('school_name'), Feedback.name, Feedback.email, Feedback.message,
+            Feedback.created_at, Feedback.admin_reply, Feedback.reply_date,
+            Feedback.principal_reply, Feedback.principal_reply_date
+        ).outerjoin(School, School.id == Feedback.school_id),
+        Feedback.created_at
+    )
+    meetings_list = detail_rows(
+        db.session.query(
+            MeetingBooking.id, School.name.label('school_name'), MeetingBooking.user_name,
+            MeetingBooking.user_email, MeetingBooking.user_phone, MeetingBooking.purpose,
+            MeetingBooking.preferred_date, MeetingBooking.status, MeetingBooking.created_at
+        ).outerjoin(School, School.id == MeetingBooking.school_id),
+        MeetingBooking.created_at
+    )
+    
+    report = {
+        'report_id': f"EQ-{now.strftime('%Y%m%d-%H%M%S')}",
+        'generated_at': now,
+        'date_range': date_range,
+        
+        # User statistics
+        'users': {
+            'total': users_total,
+            'active_today': users_today,
+            'new_this_week': users_week,
+            'new_this_month': users_month,
+            'by_role': dict(zip(USER_ROLES, role_counts)),
+            'list': users_list
+        },
+        
+        # School statistics
+        'schools': {
+            'total': schools_total,
+            'by_region': schools_by_region,
+            'by_level': schools_by_level
+        },
+        
+        # Principal statistics
+        'principals': {
+            'total': principals_total,
+            'active': principals_active,
+            'inactive': principals_inactive
+        },
+        
+        # Feedback statistics
+        'feedback': {
+            'total': feedback_total,
+            'with_admin_reply': with_admin_reply,
+            'with_principal_reply': with_principal_reply,
+            'pending_reply': pending_reply,
+            'list': feedback_list
+        },
+        
+        # Meeting statistics
+        'meetings': {
+            'total': meetings_total,
+            'by_status': meetings_by_status,
+            'list': meetings_list
+        },
+        
+        # Activity within the report period (date_range)
+        'period': {
+            'start_date': start_date,
+            'totals': period_totals,
+            'by_region': period_by_region
+        },
+        
+        # Added during the change window, for growth percentages
+        'changes': {
+            'since': change_start,
+            'users': change_totals['new_users'],
+            'principals': new_principals,
+            'feedback': change_totals['feedback_received'],
+            'meetings': sum(v for k, v in change_totals.items() if k.startswith('meetings_'))
+        },
+        
+        # Monthly series for the growth chart
+        'growth': rollups.monthly_series(12),
+        
+        # Platform metrics
+        'platform': {
+            'total_entities': users_total + schools_total + principals_total,
+            'growth_rate': 0,
+            'engagement_rate': 0
+        }
+    }
+    
+    return report
+
+def percent_change(added, total):
+    """Growth of a total that gained `added` items in the window, e.g. "+12%"."""
+    before = total - added
+    if before <= 0:
+        return 'New' if added else '0%'
+    return f"+{added / before * 100:.0f}%"
+
+def create_pdf_report(report_data, output=None):
+    """Generate PDF report with comprehensive system data.
+    
+    The PDF is written to `output` (a path or binary file). Without one it goes
+    to a spooled temp file (memory for small reports, disk past
+    REPORT_SPOOL_MAX_BYTES), which is returned rewound.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib.enums import TA_CENTER
+    from xml.sax.saxutils import escape
+    
+    # Charts are built (or reused from the cache) before layout
+    charts = report_charts.chart_flowables(report_data)
+    
+    def chart(name):
+        return charts.get(name)
+    
+    if output is None:
+        output = tempfile.SpooledTemporaryFile(max_size=current_app.config['REPORT_SPOOL_MAX_BYTES'])
+    doc = SimpleDocTemplate(output, pagesize=A4, 
+                          rightMargin=72, leftMargin=72,
+                          topMargin=72, bottomMargin=72)
+    
+    styles = getSampleStyleSheet()
+    
+    # Create custom styles safely - check if they exist first
+    custom_styles = {}
+    
+    # Define custom styles with unique names
+    if 'CustomTitle' not in styles:
+        styles.add(ParagraphStyle(
+            name='CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#E65C00')
+        ))
+    custom_styles['Title'] = styles['CustomTitle']
+    
+    if 'CustomHeading2Orange' not in styles:
+        styles.add(ParagraphStyle(
+            name='CustomHeading2Orange',
+            parent=styles['Heading2'],
+            textColor=colors.HexColor('#E65C00'),
+            spaceAfter=12
+        ))
+    custom_styles['Heading2Orange'] = styles['CustomHeading2Orange']
+    
+    if 'CustomBodyText' not in styles:
+        styles.add(ParagraphStyle(
+            name='CustomBodyText',
+            parent=styles['BodyText'],
+            fontSize=10,
+            spaceAfter=6
+        ))
+    custom_styles['BodyText'] = styles['CustomBodyText']
+    
+    # Build the story (content)
+    story = []
+    
+    # ===== COVER PAGE =====
+    story.append(Spacer(1, 2*inch))
+    story.append(Paragraph("EDUQUEST PLATFORM", custom_styles['Title']))
+    story.append(Spacer(1, 0.5*inch))
+    story.append(Paragraph("SYSTEM ANALYTICS REPORT", custom_styles['Title']))
+    story.append(Spacer(1, inch))
+    
+    # Report details
+    details = [
+        ["Report ID:", report_data['report_id']],
+        ["Generated:", report_data['generated_at'].strftime('%B %d, %Y %I:%M %p')],
+        ["Period:", report_data['date_range'].title()],
+        ["Platform:", "EduQuest School Finder System"]
+    ]
+    
+    for label, value in details:
+        story.append(Paragraph(f"<b>{label}</b> {value}", custom_styles['BodyText']))
+    
+    story.append(Spacer(1, inch))
+    story.append(Paragraph("CONFIDENTIAL - INTERNAL USE ONLY", 
+                          ParagraphStyle(name='Confidential', 
+                                        parent=styles['Normal'],
+                                        fontSize=8,
+                                        textColor=colors.grey,
+                                        alignment=TA_CENTER)))
+    
+    story.append(PageBreak())
+    
+    # ===== EXECUTIVE SUMMARY =====
+    story.append(Paragraph("EXECUTIVE SUMMARY", custom_styles['Heading2Orange']))
+    story.append(Spacer(1, 0.2*inch))
+    
+    summary_text = f"""
+    This report provides a comprehensive overview of the EduQuest platform as of {report_data['generated_at'].strftime('%B %d, %Y')}. 
+    The platform currently serves {report_data['users']['total']} registered users across {report_data['schools']['total']} schools 
+    in Kenya. Key metrics show {report_data['users']['new_this_week']} new user registrations this week and 
+    {report_data['feedback']['total']} pieces of feedback collected from the community.
+    """
+    story.append(Paragraph(summary_text, custom_styles['BodyText']))
+    
+    # Quick Stats Table (CHANGE = growth since the start of the period)
+    changes = report_data['changes']
+    quick_stats = [
+        ['METRIC', 'COUNT', f"CHANGE SINCE {changes['since'].strftime('%b %d').upper()}"],
+        ['Total Users', str(report_data['users']['total']),
+         percent_change(changes['users'], report_data['users']['total'])],
+        ['Registered Schools', str(report_data['schools']['total']), 'N/A'],
+        ['Active Principals', str(report_data['principals']['active']),
+         percent_change(changes['principals'], report_data['principals']['total'])],
+        ['Feedback Received', str(report_data['feedback']['total']),
+         percent_change(changes['feedback'], report_data['feedback']['total'])],
+        ['Meeting Requests', str(report_data['meetings']['total']),
+         percent_change(changes['meetings'], report_data['meetings']['total'])]
+    ]
+    
+    table = Table(quick_stats, colWidths=[2.5*inch, 1.5*inch, 2*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E65C00')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]))
+    
+    story.append(table)
+    story.append(Spacer(1, 0.3*inch))
+    
+    # Activity in the selected period (from the daily rollup)
+    period = report_data['period']
+    period_label = f"since {period['start_date'].strftime('%B %d, %Y')}" if period['start_date'] else "all time"
+    story.append(Paragraph(f"Activity ({period_label})", styles['Heading3']))
+    totals = period['totals']
+    period_meetings = sum(v for k, v in totals.items() if k.startswith('meetings_'))
+    activity_data = [
+        ['ACTIVITY', 'COUNT'],
+        ['New Users', str(totals['new_users'])],
+        ['Feedback Received', str(totals['feedback_received'])],
+        ['Admin Replies', str(totals['admin_replies'])],
+        ['Principal Replies', str(totals['principal_replies'])],
+        ['Meeting Requests', str(period_meetings)]
+    ]
+    activity_table = Table(activity_data, colWidths=[2.5*inch, 1.5*inch])
+    activity_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+    ]))
+    story.append(activity_table)
+    
+    if period['by_region']:
+        story.append(Spacer(1, 0.2*inch))
+        region_activity = [['Region', 'Feedback', 'Replies', 'Meetings']]
+        for region, counts in sorted(period['by_region'].items(), key=lambda x: x[1]['feedback_received'], reverse=True):
+            region_activity.append([
+                region,
+                str(counts['feedback_received']),
+                str(counts['admin_replies'] + counts['principal_replies']),
+                str(sum(v for k, v in counts.items() if k.startswith('meetings_')))
+            ])
+        region_activity_table = Table(region_activity, colWidths=[2*inch, 1.2*inch, 1.2*inch, 1.2*inch])
+        region_activity_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4A6FA5')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+        ]))
+        story.append(region_activity_table)
+    
+    growth_chart = chart('growth')
+    if growth_chart:
+        story.append(Spacer(1, 0.2*inch))
+        story.append(growth_chart)
+    
+    story.append(PageBreak())
+    
+    # ===== USER STATISTICS =====
+    story.append(Paragraph("USER DEMOGRAPHICS", custom_styles['Heading2Orange']))
+    
+    # Account breakdown from the real user and principal counts
+    account_total = report_data['users']['total'] + report_data['principals']['total']
+    def share(count):
+        return f"{count / account_total * 100:.1f}%" if account_total else '0%'
+    users_by_type = [['Account Type', 'Count', 'Percentage']]
+    for role, count in report_data['users'].get('by_role', {}).items():
+        users_by_type.append([f"{role.title()}s", str(count), share(count)])
+    users_by_type.append(['Principals', str(report_data['principals']['total']), share(report_data['principals']['total'])])
+    
+    user_table = Table(users_by_type, colWidths=[2*inch, 1.5*inch, 1.5*inch])
+    user_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('BACKGROUND', (0, 1), (0, -1), colors.lightblue),
+        ('BACKGROUND', (1, 1), (1, -1), colors.lightgrey),
+        ('BACKGROUND', (2, 1), (2, -1), colors.lightgreen),
+    ]))
+    
+    story.append(user_table)
+    story.append(Spacer(1, 0.3*inch))
+    
+    # Recent user registrations (top 10)
+    story.append(Paragraph("Recent User Registrations", styles['Heading3']))
+    
+    recent_users = report_data['users']['list'][:10]
+    if recent_users:
+        user_data = [['Name', 'Email', 'Phone', 'Registered']]
+        for user in recent_users:
+            user_data.append([
+                user.name,
+                user.email,
+                user.phone or 'N/A',
+                user.created_at.strftime('%Y-%m-%d') if user.created_at else 'N/A'
+            ])
+        
+        recent_users_table = Table(user_data, colWidths=[1.5*inch, 2*inch, 1.2*inch, 1*inch])
+        recent_users_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4A6FA5')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+        ]))
+        
+        story.append(recent_users_table)
+    else:
+        story.append(Paragraph("No user data available", custom_styles['BodyText']))
+    
+    story.append(PageBreak())
+    
+    # ===== SCHOOL ANALYSIS =====
+    story.append(Paragraph("SCHOOL DISTRIBUTION", custom_styles['Heading2Orange']))
+    
+    # Schools by region
+    story.append(Paragraph("Schools by Region", styles['Heading3']))
+    region_chart = chart('region')
+    if region_chart:
+        story.append(region_chart)
+    if report_data['schools']['by_region']:
+        region_data = [['Region', 'Number of Schools', 'Percentage']]
+        total_schools = report_data['schools']['total']
+        
+        for region, count in sorted(report_data['schools']['by_region'].items(), key=lambda x: x[1], reverse=True):
+            percentage = (count / total_schools * 100) if total_schools > 0 else 0
+            region_data.append([region, str(count), f"{percentage:.1f}%"])
+        
+        region_table = Table(region_data, colWidths=[2*inch, 1.5*inch, 1.5*inch])
+        region_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E65C00')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+        ]))
+        
+        story.append(region_table)
+    else:
+        story.append(Paragraph("No regional data available", custom_styles['BodyText']))
+    
+    story.append(Spacer(1, 0.3*inch))
+    
+    # Schools by level
+    story.append(Paragraph("Schools by Education Level", styles['Heading3']))
+    level_chart = chart('level')
+    if level_chart:
+        story.append(level_chart)
+    if report_data['schools']['by_level']:
+        level_data = [['Education Level', 'Number of Schools']]
+        
+        for level, count in sorted(report_data['schools']['by_level'].items(), key=lambda x: x[1], reverse=True):
+            level_data.append([level, str(count)])
+        
+        level_table = Table(level_data, colWidths=[3*inch, 2*inch])
+        level_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+        ]))
+        
+        story.append(level_table)
+    
+    story.append(PageBreak())
+    
+    # ===== FEEDBACK ANALYTICS =====
+    story.append(Paragraph("FEEDBACK & ENGAGEMENT", custom_styles['Heading2Orange']))
+    
+    # Feedback statistics
+    feedback_stats = [
+        ['Metric', 'Count', 'Rate'],
+        ['Total Feedback', str(report_data['feedback']['total']), '100%'],
+        ['With Admin Reply', str(report_data['feedback']['with_admin_reply']), 
+         f"{(report_data['feedback']['with_admin_reply']/report_data['feedback']['total']*100):.1f}%" if report_data['feedback']['total'] > 0 else '0%'],
+        ['With Principal Reply', str(report_data['feedback']['with_principal_reply']),
+         f"{(report_data['feedback']['with_principal_reply']/report_data['feedback']['total']*100):.1f}%" if report_data['feedback']['total'] > 0 else '0%'],
+        ['Pending Reply', str(report_data['feedback']['pending_reply']),
+         f"{(report_data['feedback']['pending_reply']/report_data['feedback']['total']*100):.1f}%" if report_data['feedback']['total'] > 0 else '0%']
+    ]
+    
+    feedback_table = Table(feedback_stats, colWidths=[2*inch, 1.5*inch, 1.5*inch])
+    feedback_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4A6FA5')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('BACKGROUND', (0, 1), (0, -1), colors.lightblue),
+        ('BACKGROUND', (1, 1), (1, -1), colors.lightgrey),
+        ('BACKGROUND', (2, 1), (2, -1), colors.lightgreen),
+    ]))
+    
+    story.append(feedback_table)
+    story.append(Spacer(1, 0.3*inch))
+    
+    # Recent feedback
+    story.append(Paragraph("Recent Feedback Examples", styles['Heading3']))
+    
+    recent_feedback = report_data['feedback']['list'][:5]
+    if recent_feedback:
+        for i, feedback in enumerate(recent_feedback):
+            story.append(Paragraph(f"<b>Feedback #{i+1}</b>", custom_styles['BodyText']))
+            # Feedback is user text: escape it so markup can't break the Paragraph parser
+            story.append(Paragraph(escape(f"From: {feedback.name} ({feedback.email or 'No email'})"), 
+                                 ParagraphStyle(name='SmallText', parent=styles['Normal'], fontSize=8)))
+            story.append(Paragraph(escape(f"Message: {feedback.message[:150]}..." if len(feedback.message) > 150 else f"Message: {feedback.message}"), 
+                                 custom_styles['BodyText']))
+            story.append(Paragraph(f"Date: {feedback.created_at.strftime('%Y-%m-%d %H:%M') if feedback.created_at else 'N/A'}", 
+                                 ParagraphStyle(name='SmallText', parent=styles['Normal'], fontSize=8)))
+            story.append(Spacer(1, 0.1*inch))
+    else:
+        story.append(Paragraph("No feedback data available", custom_styles['BodyText']))
+    
+    story.append(PageBreak())
+    
+    # ===== MEETING BOOKINGS =====
+    story.append(Paragraph("MEETING BOOKINGS", custom_styles['Heading2Orange']))
+    
+    # Meeting status breakdown
+    meeting_status = report_data['meetings']['by_status']
+    meeting_stats = [
+        ['Status', 'Count', 'Percentage'],
+        ['Pending', str(meeting_status['pending']), 
+         f"{(meeting_status['pending']/report_data['meetings']['total']*100):.1f}%" if report_data['meetings']['total'] > 0 else '0%'],
+        ['Confirmed', str(meeting_status['confirmed']),
+         f"{(meeting_status['confirmed']/report_data['meetings']['total']*100):.1f}%" if report_data['meetings']['total'] > 0 else '0%'],
+        ['Completed', str(meeting_status['completed']),
+         f"{(meeting_status['completed']/report_data['meetings']['total']*100):.1f}%" if report_data['meetings']['total'] > 0 else '0%'],
+        ['Cancelled', str(meeting_status['cancelled']),
+         f"{(meeting_status['cancelled']/report_data['meetings']['total']*100):.1f}%" if report_data['meetings']['total'] > 0 else '0%']
+    ]
+    
+    meeting_table = Table(meeting_stats, colWidths=[1.5*inch, 1.5*inch, 1.5*inch])
+    meeting_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E65C00')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('BACKGROUND', (0, 1), (0, -1), colors.lightblue),
+        ('BACKGROUND', (1, 1), (1, -1), colors.lightgrey),
+        ('BACKGROUND', (2, 1), (2, -1), colors.lightgreen),
+    ]))
+    
+    story.append(meeting_table)
+    story.append(Spacer(1, 0.3*inch))
+    
+    funnel_chart = chart('funnel')
+    if funnel_chart:
+        story.append(funnel_chart)
+        story.append(Spacer(1, 0.3*inch))
+    
+    # Recent meeting requests
+    story.append(Paragraph("Recent Meeting Requests", styles['Heading3']))
+    
+    recent_meetings = report_data['meetings']['list'][:8]
+    if recent_meetings:
+        meeting_data = [['User', 'Purpose', 'Date', 'Status']]
+        for meeting in recent_meetings:
+            purpose = meeting.purpose[:30] + "..." if len(meeting.purpose) > 30 else meeting.purpose
+            meeting_data.append([
+                meeting.user_name,
+                purpose,
+                meeting.preferred_date.strftime('%Y-%m-%d') if meeting.preferred_date else 'N/A',
+                meeting.status.title()
+            ])
+        
+        recent_meetings_table = Table(meeting_data, colWidths=[1.5*inch, 2*inch, 1.2*inch, 1*inch])
+        recent_meetings_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+        ]))
+        
+        story.append(recent_meetings_table)
+    
+    story.append(PageBreak())
+    
+    # ===== CONCLUSIONS & RECOMMENDATIONS =====
+    story.append(Paragraph("CONCLUSIONS & RECOMMENDATIONS", custom_styles['Heading2Orange']))
+    
+    conclusions = [
+        Paragraph("<b>Key Findings:</b>", styles['Heading3']),
+        Paragraph(f"1. Platform Growth: The system has grown to {report_data['users']['total']} users and {report_data['schools']['total']} schools.", custom_styles['BodyText']),
+        Paragraph(f"2. Engagement: {report_data['feedback']['total']} feedback entries show strong community engagement.", custom_styles['BodyText']),
+        Paragraph(f"3. Response Rate: {report_data['feedback']['with_admin_reply'] + report_data['feedback']['with_principal_reply']} feedback items have received responses.", custom_styles['BodyText']),
+        Paragraph(f"4. Meeting Activity: {report_data['meetings']['total']} meeting requests indicate active parent-school communication.", custom_styles['BodyText']),
+        Spacer(1, 0.2*inch),
+        Paragraph("<b>Recommendations:</b>", styles['Heading3']),
+        Paragraph("1. <b>Improve Response Times:</b> Focus on reducing pending feedback response time.", custom_styles['BodyText']),
+        Paragraph("2. <b>Expand School Coverage:</b> Target regions with fewer registered schools.", custom_styles['BodyText']),
+        Paragraph("3. <b>Enhance User Engagement:</b> Implement notification system for meeting confirmations.", custom_styles['BodyText']),
+        Paragraph("4. <b>Data Quality:</b> Regular cleanup of inactive user accounts.", custom_styles['BodyText']),
+        Spacer(1, 0.2*inch),
+        Paragraph("<b>Next Steps:</b>", styles['Heading3']),
+        Paragraph("• Monthly report generation automated", custom_styles['BodyText']),
+        Paragraph("• Principal training on platform features", custom_styles['BodyText']),
+        Paragraph("• User feedback collection optimization", custom_styles['BodyText']),
+        Paragraph("• Regional expansion strategy development", custom_styles['BodyText']),
+    ]
+    
+    for item in conclusions:
+        story.append(item)
+    
+    story.append(Spacer(1, 0.5*inch))
+    
+    # Footer with page numbers
+    story.append(Paragraph("--- END OF REPORT ---", 
+                          ParagraphStyle(name='Footer', 
+                                        parent=styles['Normal'],
+                                        fontSize=8,
+                                        textColor=colors.grey,
+                                        alignment=TA_CENTER)))
+    
+    # Build PDF
+    doc.build(story)
+    
+    if hasattr(output, 'seek'):
+        output.seek(0)
+    return output
+
+def render_report(report_data, fmt, output):
+    """Write report_data to `output` as one of report_exports.FORMATS"""
+    if fmt == 'pdf':
+        return create_pdf_report(report_data, output)
+    return report_exports.write(fmt, report_data, output)
@@ -0,0 +1,339 @@
+import hashlib
+import json
+import importlib.util
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# ---------------------
+# Report Charts
+# ---------------------
+# Each chart is described by a small, picklable spec built from the report's
+# aggregate values. Two backends turn specs into PDF flowables:
+#   reportlab  - native vector Drawings (bar/pie/line), built in-process in a
+#                few milliseconds; the default
+#   matplotlib - PNGs rendered in a process pool and cached on disk under a
+#                hash of the spec; used when REPORT_CHART_BACKEND says so or
+#                as the fallback when a Drawing can't be built
+# Either way a report whose numbers haven't changed reuses its charts.
+
+# Bump when the look of the charts changes so cached images are redrawn
+CHART_STYLE_VERSION = 1
+
+ORANGE = '#E65C00'
+BLUE = '#2E86AB'
+NAVY = '#4A6FA5'
+PALETTE = [ORANGE, BLUE, NAVY, '#F4A259', '#5B8E7D', '#BC4B51', '#8CB369', '#A288A6']
+
+BACKENDS = ('reportlab', 'matplotlib')
+
+# Chart size on the page, in points (6 x 3 inches; fits the A4 report frame)
+CHART_WIDTH = 432
+CHART_HEIGHT = 216
+
+_backend = 'reportlab'
+_cache_dir = None
+_workers = 2
+_max_cached = 500
+_drawings = OrderedDict()  # spec key -> Drawing, small in-process LRU
+
+
+def init_app(app):
+    global _backend, _cache_dir, _workers, _max_cached
+    _backend = app.config.get('REPORT_CHART_BACKEND', 'reportlab')
+    if _backend not in BACKENDS:
+        print(f"⚠️ Unknown REPORT_CHART_BACKEND {_backend!r} - using reportlab")
+        _backend = 'reportlab'
+    if _backend == 'matplotlib' and importlib.util.find_spec('matplotlib') is None:
+        print("⚠️ matplotlib not installed - using reportlab charts")
+        _backend = 'reportlab'
+    _cache_dir = os.path.join(app.config['REPORT_CACHE_DIR'], 'charts')
+    _workers = app.config.get('REPORT_CHART_WORKERS', 2)
+    _max_cached = app.config.get('REPORT_CHART_CACHE_MAX_FILES', 500)
+    os.makedirs(_cache_dir, exist_ok=True)
+
+
+# Specs
+def chart_specs(report_data):
+    """Build the chart specs (plain dicts) for a report"""
+    specs = {}
+
+    by_region = sorted(report_data['schools']['by_region'].items(), key=lambda x: x[1], reverse=True)
+    if by_region:
+        specs['region'] = {
+            'kind': 'barh',
+            'title': 'Schools by Region',
+            'labels': [r for r, _ in by_region],
+            'series': {'Schools': [c for _, c in by_region]}
+        }
+
+    by_level = sorted(report_data['schools']['by_level'].items(), key=lambda x: x[1], reverse=True)
+    if by_level:
+        specs['level'] = {
+            'kind': 'pie',
+            'title': 'Schools by Education Level',
+            'labels': [l for l, _ in by_level],
+            'series': {'Schools': [c for _, c in by_level]}
+        }
+
+    growth = report_data.get('growth') or []
+    if growth:
+        specs['growth'] = {
+            'kind': 'line',
+            'title': 'Monthly Growth',
+            'labels': [g['month'] for g in growth],
+            'series': {
+                'New users': [g['new_users'] for g in growth],
+                'Feedback': [g['feedback_received'] for g in growth],
+                'Meeting requests': [g['meetings'] for g in growth]
+            }
+        }
+
+    status = report_data['meetings']['by_status']
+    requested = report_data['meetings']['total']
+    if requested:
+        accepted = status.get('approved', 0) + status.get('confirmed', 0) + status.get('completed', 0)
+        specs['funnel'] = {
+            'kind': 'funnel',
+            'title': 'Meeting Funnel',
+            'labels': ['Requested', 'Accepted', 'Completed'],
+            'series': {'Meetings': [requested, accepted, status.get('completed', 0)]}
+        }
+
+    return specs
+
+
+def chart_size(spec):
+    """(width, height) in points; bar charts grow with the number of bars"""
+    if spec['kind'] == 'barh':
+        return CHART_WIDTH, min(max(CHART_HEIGHT, 14 * len(spec['labels']) + 50), 600)
+    return CHART_WIDTH, CHART_HEIGHT
+
+
+def spec_key(spec):
+    payload = json.dumps({'style': CHART_STYLE_VERSION, 'spec': spec}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+# Rendering (runs in pool processes)
+def render_chart(spec, path):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import MaxNLocator
+
+    width, height = chart_size(spec)
+    fig, ax = plt.subplots(figsize=(width / 72, height / 72), dpi=150)
+    labels = spec['labels']
+    series = spec['series']
+
+    if spec['kind'] == 'barh':
+        values = next(iter(series.values()))
+        positions = range(len(labels))
+        ax.barh(positions, values, color=ORANGE)
+        ax.set_yticks(list(positions))
+        ax.set_yticklabels(labels, fontsize=8)
+        ax.invert_yaxis()
+        ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+        for pos, value in zip(positions, values):
+            ax.text(value, pos, f" {value}", va='center', fontsize=7)
+    elif spec['kind'] == 'pie':
+        values = next(iter(series.values()))
+        ax.pie(values, labels=labels, colors=PALETTE[:len(values)], autopct='%1.0f%%',
+               textprops={'fontsize': 8}, startangle=90)
+        ax.axis('equal')
+    elif spec['kind'] == 'line':
+        for (name, values), color in zip(series.items(), PALETTE):
+            ax.plot(labels, values, marker='o', markersize=3, label=name, color=color)
+        ax.legend(fontsize=7)
+        ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+        ax.tick_params(axis='x', labelrotation=45, labelsize=7)
+        ax.tick_params(axis='y', labelsize=7)
+    elif spec['kind'] == 'funnel':
+        values = next(iter(series.values()))
+        top = max(values) or 1
+        for pos, (label, value) in enumerate(zip(labels, values)):
+            ax.barh(pos, value, left=(top - value) / 2, color=PALETTE[pos % len(PALETTE)])
+            ax.text(top / 2, pos, f"{label}: {value}", ha='center', va='center', fontsize=8, color='white')
+        ax.invert_yaxis()
+        ax.axis('off')
+
+    ax.set_title(spec['title'], fontsize=10, color=ORANGE)
+    for side in ('top', 'right'):
+        ax.spines[side].set_visible(False)
+    fig.tight_layout()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fig.savefig(tmp_path, format='png')
+    plt.close(fig)
+    os.replace(tmp_path, path)
+    return path
+
+
+def render_charts(specs):
+    """Return {chart name: PNG path}, rendering only charts not already cached"""
+    paths = {name: os.path.join(_cache_dir, f"{spec_key(spec)}.png") for name, spec in specs.items()}
+    missing = [name for name, path in paths.items() if not os.path.exists(path)]
+
+    if len(missing) == 1:
+        render_chart(specs[missing[0]], paths[missing[0]])
+    elif missing:
+        # A short-lived pool: this usually runs inside a report job process,
+        # which could not exit cleanly while a long-lived pool kept its workers.
+        # Not forked, for the same reason as report_jobs' pool: the caller has
+        # other threads, and a forked worker would inherit the locks they hold.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        with ProcessPoolExecutor(max_workers=min(_workers, len(missing)), mp_context=context) as pool:
+            futures = [pool.submit(render_chart, specs[name], paths[name]) for name in missing]
+            for future in futures:
+                future.result()
+    if missing:
+        _prune_cache(keep=set(paths.values()))
+
+    return paths
+
+
+def _prune_cache(keep):
+    try:
+        images = sorted(
+            (os.path.join(_cache_dir, name) for name in os.listdir(_cache_dir) if name.endswith('.png')),
+            key=os.path.getmtime,
+            reverse=True
+        )
+        for path in images[_max_cached:]:
+            if path not in keep:
+                os.remove(path)
+    except OSError as e:
+        print(f"⚠️ Chart cache cleanup failed: {e}")
+
+
+# ReportLab backend
+def build_drawing(spec):
+    """Native vector Drawing for a chart spec"""
+    from reportlab.graphics.shapes import Drawing, String, Rect
+    from reportlab.graphics.charts.barcharts import HorizontalBarChart
+    from reportlab.graphics.charts.piecharts import Pie
+    from reportlab.graphics.charts.linecharts import HorizontalLineChart
+    from reportlab.graphics.charts.legends import Legend
+    from reportlab.lib import colors
+
+    width, height = chart_size(spec)
+    palette = [colors.HexColor(c) for c in PALETTE]
+    labels = spec['labels']
+    series = spec['series']
+    drawing = Drawing(width, height)
+    drawing.add(String(width / 2, height - 14, spec['title'], fontName='Helvetica',
+                       fontSize=10, fillColor=palette[0], textAnchor='middle'))
+    plot_height = height - 40
+
+    if spec['kind'] == 'barh':
+        values = next(iter(series.values()))
+        chart = HorizontalBarChart()
+        chart.x, chart.y = 90, 20
+        chart.width, chart.height = width - 120, plot_height - 10
+        chart.data = [list(reversed(values))]
+        chart.categoryAxis.categoryNames = list(reversed(labels))
+        chart.categoryAxis.labels.fontSize = 7
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.labels.fontSize = 7
+        chart.bars[0].fillColor = palette[0]
+        chart.bars[0].strokeColor = None
+        chart.barLabelFormat = '%d'
+        chart.barLabels.fontSize = 7
+        chart.barLabels.boxAnchor = 'w'
+        chart.barLabels.dx = 3
+        drawing.add(chart)
+    elif spec['kind'] == 'pie':
+        values = next(iter(series.values()))
+        total = sum(values) or 1
+        pie = Pie()
+        pie.width = pie.height = plot_height - 20
+        pie.x, pie.y = 40, 15
+        pie.data = values
+        pie.labels = [f"{v / total * 100:.0f}%" for v in values]
+        pie.slices.fontSize = 7
+        pie.slices.strokeColor = colors.white
+        for i in range(len(values)):
+            pie.slices[i].fillColor = palette[i % len(palette)]
+        drawing.add(pie)
+        legend = Legend()
+        legend.x, legend.y = pie.x + pie.width + 60, plot_height - 10
+        legend.fontSize = 8
+        legend.colorNamePairs = [(palette[i % len(palette)], label) for i, label in enumerate(labels)]
+        drawing.add(legend)
+    elif spec['kind'] == 'line':
+        chart = HorizontalLineChart()
+        chart.x, chart.y = 40, 40
+        chart.width, chart.height = width - 160, plot_height - 35
+        chart.data = [values for values in series.values()]
+        chart.categoryAxis.categoryNames = labels
+        chart.categoryAxis.labels.fontSize = 6
+        chart.categoryAxis.labels.angle = 45
+        chart.categoryAxis.labels.boxAnchor = 'ne'
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.labels.fontSize = 7
+        for i in range(len(series)):
+            chart.lines[i].strokeColor = palette[i % len(palette)]
+            chart.lines[i].strokeWidth = 1.5
+        drawing.add(chart)
+        legend = Legend()
+        legend.x, legend.y = chart.x + chart.width + 15, chart.y + chart.height
+        legend.fontSize = 7
+        legend.colorNamePairs = [(palette[i % len(palette)], name) for i, name in enumerate(series)]
+        drawing.add(legend)
+    elif spec['kind'] == 'funnel':
+        values = next(iter(series.values()))
+        top = max(values) or 1
+        row_height = plot_height / len(values)
+        for pos, (label, value) in enumerate(zip(labels, values)):
+            bar_width = max((width - 80) * value / top, 2)
+            y = plot_height - (pos + 1) * row_height + 4
+            drawing.add(Rect((width - bar_width) / 2, y, bar_width, row_height - 8,
+                             fillColor=palette[pos % len(palette)], strokeColor=None))
+            drawing.add(String(width / 2, y + (row_height - 8) / 2 - 3, f"{label}: {value}",
+                               fontName='Helvetica-Bold', fontSize=8, fillColor=colors.white,
+                               textAnchor='middle'))
+    else:
+        raise ValueError(f"Unknown chart kind: {spec['kind']}")
+
+    return drawing
+
+
+def _cached_drawing(spec):
+    key = spec_key(spec)
+    drawing = _drawings.get(key)
+    if drawing is None:
+        drawing = build_drawing(spec)
+        _drawings[key] = drawing
+        while len(_drawings) > 64:
+            _drawings.popitem(last=False)
+    else:
+        _drawings.move_to_end(key)
+    # Platypus keeps layout state on the flowable, so every document gets a copy
+    return drawing.copy()
+
+
+def chart_flowables(report_data):
+    """{chart name: flowable} for create_pdf_report, using the configured backend"""
+    from reportlab.platypus import Image
+
+    specs = chart_specs(report_data)
+    flowables = {}
+    pending = specs
+
+    if _backend == 'reportlab':
+        pending = {}
+        for name, spec in specs.items():
+            try:
+                flowables[name] = _cached_drawing(spec)
+            except Exception as e:
+                print(f"⚠️ ReportLab chart {name!r} failed ({e}) - falling back to matplotlib")
+                pending[name] = spec
+
+    if pending:
+        for name, path in render_charts(pending).items():
+            width, height = chart_size(pending[name])
+            flowables[name] = Image(path, width=width, height=height)
+    return flowables
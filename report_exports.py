@@ -0,0 +1,261 @@
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape, quoteattr
+
+# ---------------------
+# Report Exports
+# ---------------------
+# CSV, XLSX and JSON versions of the analytics report, written from the same
+# collect_report_data() output as the PDF. Every format is the same set of
+# tables: the summary metrics, per-region/level/month breakdowns and the
+# users/feedback/meetings detail lists. Detail lists are streamed queries, so
+# rows go from the cursor to the file without being collected in memory.
+#   write(fmt, report_data, output) - output is an open binary file
+#
+# CSV is a zip with one file per table. XLSX is written directly with zipfile
+# (inline strings, one sheet per table) so there is no spreadsheet dependency.
+
+FORMATS = {
+    # format: (mimetype, file extension)
+    'pdf': ('application/pdf', 'pdf'),
+    'csv': ('application/zip', 'zip'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'json': ('application/json', 'json'),
+}
+
+DETAIL_TABLES = [
+    # (report_data section, title, [(column header, row attribute)])
+    ('users', 'Users', [
+        ('ID', 'id'), ('Name', 'name'), ('Email', 'email'), ('Phone', 'phone'), ('Role', 'role'),
+        ('Registered', 'created_at'), ('Active', 'is_active')
+    ]),
+    ('feedback', 'Feedback', [
+        ('ID', 'id'), ('School', 'school_name'), ('Name', 'name'), ('Email', 'email'),
+        ('Message', 'message'), ('Received', 'created_at'), ('Admin Reply', 'admin_reply'),
+        ('Admin Reply Date', 'reply_date'), ('Principal Reply', 'principal_reply'),
+        ('Principal Reply Date', 'principal_reply_date')
+    ]),
+    ('meetings', 'Meetings', [
+        ('ID', 'id'), ('School', 'school_name'), ('User', 'user_name'), ('Email', 'user_email'),
+        ('Phone', 'user_phone'), ('Purpose', 'purpose'), ('Preferred Date', 'preferred_date'),
+        ('Status', 'status'), ('Requested', 'created_at')
+    ]),
+]
+
+
+def parse_formats(value, default='pdf'):
+    """'pdf', 'pdf,csv' or ['pdf', 'csv'] -> ordered list of known formats (ValueError otherwise)"""
+    if not value:
+        return [default]
+    names = value.split(',') if isinstance(value, str) else list(value)
+    formats = []
+    for name in (str(n).strip().lower() for n in names):
+        if name not in FORMATS:
+            raise ValueError(f"Unknown report format '{name}' (use {', '.join(FORMATS)})")
+        if name not in formats:
+            formats.append(name)
+    return formats or [default]
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _meetings(counts):
+    return sum(v for k, v in counts.items() if k.startswith('meetings_'))
+
+
+def tables(report_data):
+    """(name, title, header, rows) for every table in the export; rows is an iterator"""
+    users, schools = report_data['users'], report_data['schools']
+    principals, feedback, meetings = report_data['principals'], report_data['feedback'], report_data['meetings']
+    period, changes = report_data['period'], report_data['changes']
+    since = period['start_date'].strftime('%Y-%m-%d') if period['start_date'] else 'all time'
+
+    summary = [
+        ('Report', 'Report ID', report_data['report_id']),
+        ('Report', 'Generated', _value(report_data['generated_at'])),
+        ('Report', 'Period', report_data['date_range']),
+        ('Users', 'Total', users['total']),
+        ('Users', 'Registered today', users['active_today']),
+        ('Users', 'New this week', users['new_this_week']),
+        ('Users', 'New this month', users['new_this_month']),
+        *[('Users', f"{role.title()}s", count) for role, count in users.get('by_role', {}).items()],
+        ('Schools', 'Total', schools['total']),
+        ('Principals', 'Total', principals['total']),
+        ('Principals', 'Active', principals['active']),
+        ('Principals', 'Inactive', principals['inactive']),
+        ('Feedback', 'Total', feedback['total']),
+        ('Feedback', 'With admin reply', feedback['with_admin_reply']),
+        ('Feedback', 'With principal reply', feedback['with_principal_reply']),
+        ('Feedback', 'Pending reply', feedback['pending_reply']),
+        ('Meetings', 'Total', meetings['total']),
+    ]
+    summary += [('Meetings', status.title(), count) for status, count in meetings['by_status'].items()]
+    summary += [(f"Activity since {since}", counter.replace('_', ' ').capitalize(), count)
+                for counter, count in period['totals'].items()]
+    summary += [(f"Added since {changes['since'].strftime('%Y-%m-%d')}", name.title(), changes[name])
+                for name in ('users', 'principals', 'feedback', 'meetings')]
+
+    by_region = period['by_region']
+    regions = (
+        (region, count,
+         by_region.get(region, {}).get('feedback_received', 0),
+         by_region.get(region, {}).get('admin_replies', 0) + by_region.get(region, {}).get('principal_replies', 0),
+         _meetings(by_region.get(region, {})))
+        for region, count in sorted(schools['by_region'].items(), key=lambda x: x[1], reverse=True)
+    )
+    levels = sorted(schools['by_level'].items(), key=lambda x: x[1], reverse=True)
+    growth = ((m['month'], m['new_users'], m['feedback_received'], m['meetings']) for m in report_data['growth'])
+
+    yield 'summary', 'Summary', ['Section', 'Metric', 'Value'], iter(summary)
+    yield 'regions', 'Regions', ['Region', 'Schools', f"Feedback since {since}",
+                                 f"Replies since {since}", f"Meetings since {since}"], regions
+    yield 'levels', 'Levels', ['Education Level', 'Schools'], iter(levels)
+    yield 'growth', 'Monthly Growth', ['Month', 'New Users', 'Feedback', 'Meetings'], growth
+    for section, title, columns in DETAIL_TABLES:
+        rows = report_data[section]['list']
+        yield section, title, [label for label, _ in columns], \
+            (tuple(getattr(row, attr) for _, attr in columns) for row in rows)
+
+
+# ---------------------
+# Writers
+# ---------------------
+def _csv_value(value):
+    value = _value(value)
+    # Free text (feedback, names) must not be read as a formula by spreadsheets
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+
+def write_csv(report_data, output):
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, _, header, rows in tables(report_data):
+            with archive.open(f"{name}.csv", 'w') as entry, \
+                    io.TextIOWrapper(entry, encoding='utf-8', newline='') as text:
+                writer = csv.writer(text)
+                writer.writerow(header)
+                for row in rows:
+                    writer.writerow([_csv_value(v) for v in row])
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def write_json(report_data, output):
+    """{"report": {...aggregates...}, "users": [...], "feedback": [...], "meetings": [...]}"""
+    def emit(text):
+        output.write(text.encode('utf-8'))
+
+    details = {section for section, _, _ in DETAIL_TABLES}
+    aggregates = {
+        key: ({k: v for k, v in value.items() if k != 'list'} if key in details else value)
+        for key, value in report_data.items()
+    }
+    emit('{"report": ')
+    emit(json.dumps(aggregates, default=_json_default))
+    for section, _, columns in DETAIL_TABLES:
+        emit(f', "{section}": [')
+        for i, row in enumerate(report_data[section]['list']):
+            item = {attr: getattr(row, attr) for _, attr in columns}
+            emit((',' if i else '') + json.dumps(item, default=_json_default))
+        emit(']')
+    emit('}')
+
+
+# XLSX: the smallest SpreadsheetML package Excel/LibreOffice/Sheets accept
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_cell(value):
+    value = _value(value)
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _sheet_name(title, used):
+    name = re.sub(r'[\[\]:*?/\\]', ' ', title)[:31] or 'Sheet'
+    base, n = name, 2
+    while name.lower() in used:
+        name = f"{base[:28]} {n}"
+        n += 1
+    used.add(name.lower())
+    return name
+
+
+def write_xlsx(report_data, output):
+    sheets = []
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        used = set()
+        for index, (_, title, header, rows) in enumerate(tables(report_data), start=1):
+            sheets.append((index, _sheet_name(title, used)))
+            with archive.open(f"xl/worksheets/sheet{index}.xml", 'w') as entry, \
+                    io.TextIOWrapper(entry, encoding='utf-8') as xml:
+                xml.write(f'{_XML_HEADER}<worksheet xmlns="{_MAIN_NS}"><sheetData>')
+                xml.write('<row>' + ''.join(_xlsx_cell(h) for h in header) + '</row>')
+                for row in rows:
+                    xml.write('<row>' + ''.join(_xlsx_cell(v) for v in row) + '</row>')
+                xml.write('</sheetData></worksheet>')
+
+        archive.writestr('[Content_Types].xml', (
+            f'{_XML_HEADER}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + ''.join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                      'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                      for i, _ in sheets)
+            + '</Types>'
+        ))
+        archive.writestr('_rels/.rels', (
+            f'{_XML_HEADER}<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ))
+        archive.writestr('xl/workbook.xml', (
+            f'{_XML_HEADER}<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>'
+            + ''.join(f'<sheet name={quoteattr(name)} sheetId="{i}" r:id="rId{i}"/>' for i, name in sheets)
+            + '</sheets></workbook>'
+        ))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            f'{_XML_HEADER}<Relationships xmlns="{_PKG_REL_NS}">'
+            + ''.join(f'<Relationship Id="rId{i}" Type="{_REL_NS}/worksheet" '
+                      f'Target="worksheets/sheet{i}.xml"/>' for i, _ in sheets)
+            + '</Relationships>'
+        ))
+
+
+WRITERS = {
+    'csv': write_csv,
+    'xlsx': write_xlsx,
+    'json': write_json,
+}
+
+
+def write(fmt, report_data, output):
+    WRITERS[fmt](report_data, output)
+    return output
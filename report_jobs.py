@@ -0,0 +1,263 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from uuid import uuid4
+
+import db_routing
+import metrics
+import versions
+from report_exports import FORMATS
+
+# ---------------------
+# Report Jobs
+# ---------------------
+# Building the report takes seconds on a big database, so it runs as a job in
+# a process pool instead of inside the request:
+#   submit() -> job id, get_job() -> status, output_path() -> finished file.
+# A job collects the report data once and renders it into every requested
+# format (pdf, csv, xlsx, json - see report_exports.FORMATS).
+# Job state and outputs are plain files under REPORT_CACHE_DIR so any gunicorn
+# worker can answer the status/download requests. Outputs are cached by
+# (date_range, data version, day, format) so asking again for an unchanged
+# period returns the existing files straight away.
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+DATE_RANGES = ('all', 'week', 'month', 'quarter')
+
+_app = None
+_collect = None
+_render = None
+_cache_dir = None
+_workers = 2
+_max_cached = 50
+_executor = None
+_lock = threading.Lock()
+_inflight = {}  # cache_key -> job_id for jobs started by this process
+
+
+def init_app(app, collect, render):
+    """collect(date_range) -> report data, render(report data, format, file) writes one format"""
+    global _app, _collect, _render, _cache_dir, _workers, _max_cached
+    _app = app
+    _collect = collect
+    _render = render
+    _cache_dir = app.config['REPORT_CACHE_DIR']
+    _workers = app.config.get('REPORT_WORKERS', 2)
+    _max_cached = app.config.get('REPORT_CACHE_MAX_FILES', 50)
+    os.makedirs(os.path.join(_cache_dir, 'jobs'), exist_ok=True)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                # Never plain fork: the first submit() comes from a request thread
+                # while other threads may hold import/library locks, and a forked
+                # worker inherits those locks held forever. The forkserver is a
+                # fresh single-threaded process that imports the app once and forks
+                # the workers from there; spawn (Windows) imports it per worker.
+                # Each worker builds its own app from this app's config.
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                if context.get_start_method() == 'forkserver':
+                    context.set_forkserver_preload(['app'])
+                _executor = ProcessPoolExecutor(
+                    max_workers=_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(dict(_app.config),)
+                )
+    return _executor
+
+
+def _discard_executor(executor):
+    """Drop a broken pool (a worker was killed) so the next job starts a fresh one"""
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _init_worker(config):
+    if _app is None:
+        from app import create_app
+        import reports
+        reports.setup(create_app(config))  # calls init_app() above in this process
+    # Never reuse SQLite connections inherited from the parent process
+    from models import db
+    with _app.app_context():
+        db.engine.dispose(close=False)
+        db_routing.dispose(close=False)
+
+
+# Job files
+def _job_path(job_id):
+    return os.path.join(_cache_dir, 'jobs', f"{job_id}.json")
+
+
+def _output_path(cache_key, fmt):
+    return os.path.join(_cache_dir, f"report_{cache_key}.{FORMATS[fmt][1]}")
+
+
+def _write_job(job):
+    path = _job_path(job['id'])
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(job, f)
+    os.replace(tmp_path, path)
+
+
+def get_job(job_id):
+    if not job_id.isalnum():
+        return None
+    try:
+        with open(_job_path(job_id)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def output_path(job, fmt):
+    return _output_path(job['cache_key'], fmt)
+
+
+def cache_key(date_range):
+    return f"{date_range}_v{versions.current_version()}_{datetime.now().strftime('%Y%m%d')}"
+
+
+def submit(date_range='all', formats=('pdf',)):
+    """Queue a report (or reuse a cached/in-progress one) and return the job dict"""
+    if date_range not in DATE_RANGES:
+        date_range = 'all'
+    formats = [fmt for fmt in formats if fmt in FORMATS] or ['pdf']
+    key = cache_key(date_range)
+    inflight_key = f"{key}:{'+'.join(formats)}"
+
+    with _lock:
+        running_id = _inflight.get(inflight_key)
+        if running_id:
+            job = get_job(running_id)
+            if job and job['status'] in (QUEUED, RUNNING):
+                return job
+
+        job = {
+            'id': uuid4().hex,
+            'date_range': date_range,
+            'formats': formats,
+            'cache_key': key,
+            'status': QUEUED,
+            'created_at': time.time(),
+            'finished_at': None,
+            'report_id': None,
+            'cached': False,
+            'error': None
+        }
+
+        if all(os.path.exists(_output_path(key, fmt)) for fmt in formats):
+            job.update(status=DONE, finished_at=time.time(), cached=True)
+            _write_job(job)
+            metrics.cache_result('report', True)
+            metrics.inc('eduquest_report_jobs_total', {'result': 'cached'})
+            return job
+        metrics.cache_result('report', False)
+
+        _write_job(job)
+        _inflight[inflight_key] = job['id']
+
+    executor = _get_executor()
+    try:
+        future = executor.submit(_build_report, job)
+    except BrokenProcessPool:
+        # Broke since its last job finished: retry once on a new pool
+        _discard_executor(executor)
+        executor = _get_executor()
+        future = executor.submit(_build_report, job)
+    future.add_done_callback(lambda f: _finished(job, inflight_key, f, executor))
+    _prune_cache()
+    return job
+
+
+def _finished(job, inflight_key, future, executor):
+    with _lock:
+        _inflight.pop(inflight_key, None)
+    error = future.exception()
+    if isinstance(error, BrokenProcessPool):
+        _discard_executor(executor)
+    if error is not None:
+        # The worker died before it could record the failure itself
+        job.update(status=FAILED, finished_at=time.time(), error=str(error))
+        _write_job(job)
+    # The pool process recorded its timings in the job file
+    record = get_job(job['id']) or job
+    status = record['status']
+    metrics.inc('eduquest_report_jobs_total', {'result': 'built' if status == DONE else 'failed'})
+    if record.get('started_at') and record.get('finished_at'):
+        metrics.observe('eduquest_report_job_duration_seconds',
+                        record['finished_at'] - record['started_at'], {'status': status})
+
+
+def _build_report(job):
+    """Runs in a pool process"""
+    job.update(status=RUNNING, started_at=time.time())
+    _write_job(job)
+    tmp_path = None
+    try:
+        # Collection and rendering (detail lists stream while rendering) only read, from
+        # one snapshot: every format shows the same data even if rows change meanwhile
+        with _app.app_context(), db_routing.snapshot():
+            # Collected once, rendered into each format that isn't cached yet
+            report_data = _collect(job['date_range'])
+            for fmt in job['formats']:
+                path = _output_path(job['cache_key'], fmt)
+                if os.path.exists(path):
+                    continue
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                # Rendered straight into the cache file, never into a buffer
+                with open(tmp_path, 'wb') as f:
+                    _render(report_data, fmt, f)
+                os.replace(tmp_path, path)
+                tmp_path = None
+
+        job.update(status=DONE, finished_at=time.time(), report_id=report_data['report_id'])
+    except Exception as e:
+        print(f"❌ Report job {job['id']} failed: {e}")
+        traceback.print_exc()
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        job.update(status=FAILED, finished_at=time.time(), error=str(e))
+    _write_job(job)
+    return job['status']
+
+
+def _prune_cache():
+    """Keep the newest REPORT_CACHE_MAX_FILES report files and a day of job files"""
+    try:
+        outputs = sorted(
+            (os.path.join(_cache_dir, name) for name in os.listdir(_cache_dir)
+             if name.startswith('report_') and not name.endswith('.tmp')),
+            key=os.path.getmtime,
+            reverse=True
+        )
+        for path in outputs[_max_cached:]:
+            os.remove(path)
+
+        jobs_dir = os.path.join(_cache_dir, 'jobs')
+        cutoff = time.time() - 86400
+        for name in os.listdir(jobs_dir):
+            path = os.path.join(jobs_dir, name)
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+    except OSError as e:
+        print(f"⚠️ Report cache cleanup failed: {e}")
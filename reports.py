@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify, request, send_file, session, url_for
+
+import app_logging
+import report_exports
+import report_jobs
+
+# System reports: jobs are queued here and built in report_jobs' process pool
+
+bp = Blueprint('reports', __name__)
+log = app_logging.get_logger('reports')
+
+_setup_lock = threading.Lock()
+
+
+def setup(app):
+    """Start the report subsystem (job pool, chart backend) for `app`
+    
+    Called on the first reports request rather than at startup, so web
+    workers that never build a report never import the report builder.
+    Report pool processes call it on their own app.
+    """
+    import report_builder
+    import report_charts
+    report_jobs.init_app(app, report_builder.collect_report_data, report_builder.render_report)
+    report_charts.init_app(app)
+    app.extensions['reports'] = True
+
+
+def ensure_setup(app):
+    if 'reports' not in app.extensions:
+        with _setup_lock:
+            if 'reports' not in app.extensions:
+                setup(app)
+
+
+@bp.before_request
+def _setup_once():
+    ensure_setup(current_app._get_current_object())
+
+
+# ---------------------
+# Report API
+# ---------------------
+#ROUTE TO GENERATE REPORT
+@bp.route('/api/admin/generate-report', methods=['POST'])
+def generate_system_report():
+    """Start (or reuse) a report job; poll /api/admin/reports/<job_id> for the result
+    
+    "format" is pdf, csv, xlsx or json, or several at once ("pdf,xlsx" or a list);
+    the data is collected once and written in each format by the same job.
+    """
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    try:
+        data = request.json or {}
+        date_range = data.get('date_range', 'all')  # all, week, month, quarter
+        try:
+            formats = report_exports.parse_formats(data.get('format'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        job = report_jobs.submit(date_range, formats)
+        log.info("report queued", extra={'job_id': job['id'], 'date_range': date_range, 'formats': formats})
+        
+        status_code = 200 if job['status'] == report_jobs.DONE else 202
+        return jsonify(report_job_payload(job)), status_code
+        
+    except Exception as e:
+        log.exception("report generation failed")
+        return jsonify({"error": f"Report generation failed: {str(e)}"}), 500
+
+def report_job_payload(job):
+    done = job['status'] == report_jobs.DONE
+    formats = job.get('formats', ['pdf'])
+    download_urls = {
+        fmt: url_for('reports.download_report', job_id=job['id'], format=fmt) for fmt in formats
+    } if done else {}
+    return {
+        "job_id": job['id'],
+        "status": job['status'],
+        "date_range": job['date_range'],
+        "formats": formats,
+        "cached": job['cached'],
+        "error": job['error'],
+        "status_url": url_for('reports.report_job_status', job_id=job['id']),
+        "download_url": download_urls.get(formats[0]),
+        "download_urls": download_urls
+    }
+
+@bp.route('/api/admin/reports/<job_id>', methods=['GET'])
+def report_job_status(job_id):
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    job = report_jobs.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Report job not found"}), 404
+    return jsonify(report_job_payload(job)), 200
+
+@bp.route('/api/admin/reports/<job_id>/download', methods=['GET'])
+def download_report(job_id):
+    if not session.get('admin_logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    job = report_jobs.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Report job not found"}), 404
+    if job['status'] != report_jobs.DONE:
+        return jsonify({"error": f"Report is {job['status']}"}), 409
+    
+    formats = job.get('formats', ['pdf'])
+    fmt = request.args.get('format', formats[0])
+    if fmt not in formats:
+        return jsonify({"error": f"This report was not generated as {fmt}"}), 404
+    
+    path = report_jobs.output_path(job, fmt)
+    if not os.path.exists(path):
+        return jsonify({"error": "Report expired, please generate it again"}), 410
+    
+    mimetype, extension = report_exports.FORMATS[fmt]
+    finished = datetime.fromtimestamp(job['finished_at'] or time.time())
+    return send_file(
+        path,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=f"eduquest_report_{finished.strftime('%Y%m%d_%H%M%S')}.{extension}"
+    )
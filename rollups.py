@@ -0,0 +1,221 @@
+from collections import Counter, defaultdict
+from datetime import date
+from itertools import chain
+
+from sqlalchemy import event, inspect, text
+
+from models import db, School, Feedback, MeetingBooking, User, DailyStat
+
+# ---------------------
+# Daily Rollups
+# ---------------------
+# daily_stats holds one row per (day, school_id) with counters for new users,
+# feedback, replies and meetings by status. It is kept current from the same
+# after_flush hook pattern as versions.py, so any date window is a SUM over a
+# few hundred rows instead of a scan of the raw tables. rebuild() recomputes
+# everything from the raw tables (catch-up after bulk loads or raw SQL edits).
+#
+# Days are the UTC date of the stored timestamps (created_at, reply_date...).
+
+MEETING_STATUSES = ('pending', 'approved', 'confirmed', 'declined', 'completed', 'cancelled')
+
+COUNTERS = [
+    'new_users', 'feedback_received', 'admin_replies', 'principal_replies'
+] + [f"meetings_{status}" for status in MEETING_STATUSES]
+
+_UPSERT_SQL = text(
+    f"INSERT INTO daily_stats (day, school_id, {', '.join(COUNTERS)}) "
+    f"VALUES (:day, :school_id, {', '.join(':' + c for c in COUNTERS)}) "
+    f"ON CONFLICT(day, school_id) DO UPDATE SET "
+    + ', '.join(f"{c} = {c} + excluded.{c}" for c in COUNTERS)
+)
+
+
+def _contributions(obj, value):
+    """(day, school_id, counter) facts a row adds to the rollup, given value(attr)"""
+    def day(ts):
+        return ts.date().isoformat() if ts else None
+
+    facts = []
+    if isinstance(obj, User):
+        facts.append((day(value('created_at')), 0, 'new_users'))
+    elif isinstance(obj, Feedback):
+        school_id = value('school_id')
+        facts.append((day(value('created_at')), school_id, 'feedback_received'))
+        if value('admin_reply'):
+            facts.append((day(value('reply_date')), school_id, 'admin_replies'))
+        if value('principal_reply'):
+            facts.append((day(value('principal_reply_date')), school_id, 'principal_replies'))
+    elif isinstance(obj, MeetingBooking):
+        status = value('status') or 'pending'
+        if status in MEETING_STATUSES:
+            facts.append((day(value('created_at')), value('school_id'), f"meetings_{status}"))
+    return [f for f in facts if f[0] is not None]
+
+
+def _old_value(obj):
+    state = inspect(obj)
+
+    def value(attr):
+        history = state.attrs[attr].history
+        if history.deleted:
+            return history.deleted[0]
+        if history.unchanged:
+            return history.unchanged[0]
+        return None if history.added else getattr(obj, attr)
+    return value
+
+
+def _new_value(obj):
+    return lambda attr: getattr(obj, attr)
+
+
+def _rollup_after_flush(session, flush_context):
+    deltas = defaultdict(Counter)
+
+    def apply(facts, sign):
+        for day, school_id, counter in facts:
+            deltas[(day, school_id or 0)][counter] += sign
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, (User, Feedback, MeetingBooking)):
+            continue
+        if obj not in session.new:
+            apply(_contributions(obj, _old_value(obj)), -1)
+        if obj not in session.deleted:
+            apply(_contributions(obj, _new_value(obj)), +1)
+
+    rows = []
+    for (day, school_id), counts in deltas.items():
+        if any(counts.values()):
+            row = {'day': day, 'school_id': school_id}
+            row.update({c: counts.get(c, 0) for c in COUNTERS})
+            rows.append(row)
+    if rows:
+        session.execute(_UPSERT_SQL, rows)
+
+
+def rebuild():
+    """Recompute daily_stats from the raw tables (idempotent catch-up job)"""
+    zeros = ['0'] * len(COUNTERS)
+
+    def select(day_expr, school_expr, table, where, counters):
+        values = list(zeros)
+        for counter, expr in counters.items():
+            values[COUNTERS.index(counter)] = expr
+        return (f"SELECT date({day_expr}) AS day, {school_expr} AS school_id, "
+                f"{', '.join(f'{v} AS {c}' for v, c in zip(values, COUNTERS))} "
+                f"FROM {table} WHERE {where}")
+
+    parts = [
+        select('created_at', '0', '"user"', 'created_at IS NOT NULL', {'new_users': '1'}),
+        select('created_at', 'school_id', 'feedback', 'created_at IS NOT NULL', {'feedback_received': '1'}),
+        select('reply_date', 'school_id', 'feedback',
+               'admin_reply IS NOT NULL AND reply_date IS NOT NULL', {'admin_replies': '1'}),
+        select('principal_reply_date', 'school_id', 'feedback',
+               'principal_reply IS NOT NULL AND principal_reply_date IS NOT NULL', {'principal_replies': '1'}),
+        select('created_at', 'school_id', 'meeting_booking', 'created_at IS NOT NULL', {
+            f"meetings_{status}": f"(COALESCE(status, 'pending') = '{status}')" for status in MEETING_STATUSES
+        }),
+    ]
+    db.session.execute(text("DELETE FROM daily_stats"))
+    db.session.execute(text(
+        f"INSERT INTO daily_stats (day, school_id, {', '.join(COUNTERS)}) "
+        f"SELECT day, school_id, {', '.join(f'SUM({c})' for c in COUNTERS)} "
+        f"FROM ({' UNION ALL '.join(parts)}) GROUP BY day, school_id"
+    ))
+    db.session.commit()
+
+
+def forget_school(session, school_id):
+    """Drop a deleted school's rollup rows (set-based deletes bypass the after_flush hook)"""
+    session.execute(text("DELETE FROM daily_stats WHERE school_id = :school_id"), {'school_id': school_id})
+
+
+# ---------------------
+# Window queries
+# ---------------------
+def _window_filter(query, start_day=None, end_day=None):
+    if start_day is not None:
+        query = query.filter(DailyStat.day >= start_day)
+    if end_day is not None:
+        query = query.filter(DailyStat.day <= end_day)
+    return query
+
+
+def window_totals(start_day=None, end_day=None):
+    """{counter: total} for days in [start_day, end_day] (None = unbounded)"""
+    query = db.session.query(*[db.func.coalesce(db.func.sum(getattr(DailyStat, c)), 0) for c in COUNTERS])
+    row = _window_filter(query, start_day, end_day).one()
+    return dict(zip(COUNTERS, row))
+
+
+def window_by_region(start_day=None, end_day=None):
+    """{region: {counter: total}} for school-linked activity in the window"""
+    region = db.func.coalesce(School.region, 'Unknown')
+    query = db.session.query(region, *[db.func.sum(getattr(DailyStat, c)) for c in COUNTERS]) \
+        .join(School, School.id == DailyStat.school_id) \
+        .group_by(region)
+    return {row[0]: dict(zip(COUNTERS, row[1:])) for row in _window_filter(query, start_day, end_day)}
+
+
+def window_by_school(school_id, start_day=None, end_day=None):
+    query = db.session.query(*[db.func.coalesce(db.func.sum(getattr(DailyStat, c)), 0) for c in COUNTERS]) \
+        .filter(DailyStat.school_id == school_id)
+    return dict(zip(COUNTERS, _window_filter(query, start_day, end_day).one()))
+
+
+def monthly_series(months=12):
+    """Per-month totals for the last `months` calendar months (oldest first)"""
+    today = date.today()
+    month_keys = []
+    year, month = today.year, today.month
+    for _ in range(months):
+        month_keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    month_keys.reverse()
+
+    bucket = db.func.strftime('%Y-%m', DailyStat.day)
+    meetings = sum(getattr(DailyStat, f"meetings_{status}") for status in MEETING_STATUSES)
+    rows = db.session.query(
+        bucket,
+        db.func.sum(DailyStat.new_users),
+        db.func.sum(DailyStat.feedback_received),
+        db.func.sum(meetings)
+    ).filter(DailyStat.day >= f"{month_keys[0]}-01").group_by(bucket).all()
+    by_month = {row[0]: row[1:] for row in rows}
+
+    series = []
+    for key in month_keys:
+        new_users, feedback, meeting_count = by_month.get(key, (0, 0, 0))
+        series.append({
+            'month': key,
+            'new_users': new_users or 0,
+            'feedback_received': feedback or 0,
+            'meetings': meeting_count or 0
+        })
+    return series
+
+
+def init_app(app):
+    with app.app_context():
+        DailyStat.__table__.create(bind=db.engine, checkfirst=True)
+        # First run against an existing database: backfill from the raw tables
+        # (a new install has none yet - init_db creates them)
+        tables = db.inspect(db.engine)
+        if tables.has_table(Feedback.__tablename__) and tables.has_table(User.__tablename__) and \
+                not db.session.query(DailyStat.day).first() and \
+                (db.session.query(Feedback.id).first() or db.session.query(User.id).first()):
+            print("📊 Backfilling daily_stats rollup...")
+            rebuild()
+        db.session.remove()
+    if not event.contains(db.session, 'after_flush', _rollup_after_flush):
+        event.listen(db.session, 'after_flush', _rollup_after_flush)
+
+
+if __name__ == '__main__':
+    # Catch-up job: python rollups.py
+    from app import create_app
+    with create_app().app_context():
+        rebuild()
+        print(f"✅ daily_stats rebuilt: {DailyStat.query.count()} rows, totals {window_totals()}")
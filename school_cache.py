@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+
+from sqlalchemy import event
+
+import metrics
+import versions
+from compression import CompressedCache
+from models import db
+
+# ---------------------
+# School Page Cache
+# ---------------------
+# /school/<id> looks the same to every visitor and, like the feedback list
+# it loads from /api/schools/<id>/feedback, only changes when the school, its
+# principal or its feedback does. Both bodies are cached per process, keyed
+# by the school's version (versions.school), which the after_flush hook bumps
+# in the same transaction as any such write.
+# A worker reads a school's version from the database once and then trusts
+# it until the stamp file in DATA_DIR changes: whoever commits a school bump
+# touches the file, and every request stat()s it. So views of a cached
+# school run no queries at all, and a new feedback or reply shows up on every
+# worker straight away. Writes that skip the ORM (raw SQL maintenance routes)
+# are picked up after SCHOOL_CACHE_VERSION_TTL seconds.
+#   body = school_cache.cached('page', school_id, render)
+
+_state = {'enabled': False, 'path': None, 'stamp': None, 'ttl': 0}
+_versions = {}  # school_id -> (version, trusted until)
+_lock = threading.Lock()
+_bodies = CompressedCache(0)  # (kind, school_id, version) -> body, LRU bounded by SCHOOL_CACHE_MAX_BYTES
+
+
+def _stamp():
+    try:
+        return os.stat(_state['path']).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _touch():
+    now = time.time_ns()  # explicit: the file system's clock may be too coarse to tell two commits apart
+    try:
+        os.utime(_state['path'], ns=(now, now))
+    except FileNotFoundError:
+        open(_state['path'], 'a').close()
+
+
+def school_version(school_id):
+    stamp = _stamp()
+    now = time.monotonic()
+    with _lock:
+        if stamp != _state['stamp']:
+            _versions.clear()
+            _state['stamp'] = stamp
+        known = _versions.get(school_id)
+    if known is not None and known[1] > now:
+        return known[0]
+
+    version = versions.current_version(versions.school(school_id))
+    with _lock:
+        # Read before a newer stamp was seen: might already be stale
+        if _state['stamp'] == stamp:
+            _versions[school_id] = (version, now + _state['ttl'])
+    return version
+
+
+def cached(kind, school_id, build):
+    """build()'s body (bytes) for this school, rebuilt only when the school's version changed"""
+    if not _state['enabled']:
+        return build()
+    key = (kind, school_id, school_version(school_id))
+    body = _bodies.get(key)
+    metrics.cache_result(f"school_{kind}", body is not None)
+    if body is None:
+        body = build()
+        _bodies.put(key, body)
+    return body
+
+
+def _after_commit(session):
+    if session.info.pop(versions.SCHOOLS_BUMPED, None) and _state['path']:
+        _touch()
+
+
+def _after_rollback(session):
+    session.info.pop(versions.SCHOOLS_BUMPED, None)
+
+
+def init_app(app):
+    app.config.setdefault('SCHOOL_CACHE_ENABLED', True)
+    app.config.setdefault('SCHOOL_CACHE_MAX_BYTES', 16 * 1024 * 1024)
+    app.config.setdefault('SCHOOL_CACHE_VERSION_TTL', 60)
+    _state.update(
+        enabled=app.config['SCHOOL_CACHE_ENABLED'],
+        path=os.path.join(app.config['DATA_DIR'], 'school_cache.stamp'),
+        stamp=None,
+        ttl=app.config['SCHOOL_CACHE_VERSION_TTL'],
+    )
+    _versions.clear()
+    _bodies.clear()
+    _bodies.max_bytes = app.config['SCHOOL_CACHE_MAX_BYTES']
+    if not os.path.exists(_state['path']):
+        _touch()
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
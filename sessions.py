@@ -0,0 +1,272 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from flask import session
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import Signer, BadSignature
+from werkzeug.datastructures import CallbackDict
+
+import metrics
+
+# ---------------------
+# Server-side Sessions
+# ---------------------
+# The cookie only carries a signed session id; the data lives in a backend:
+#   memory - per-process LRU, fine for a single worker / development
+#   sqlite - shared table, works across gunicorn workers
+# Because the data is on the server, logging out (or revoke_owner) really
+# ends the session, and we can afford to keep a cached copy of the logged-in
+# principal/user/admin in it (see cached_identity below).
+# Logins call regenerate(): the session gets a new id, so an id planted in a
+# browser before the login (session fixation) never becomes a logged-in one.
+
+serializer = TaggedJSONSerializer()
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.replaced_sid = None  # record to delete once the new id is saved
+
+
+def session_owner(data):
+    """Who a session belongs to, so all of someone's sessions can be revoked"""
+    if data.get('principal_id'):
+        return f"principal:{data['principal_id']}"
+    if data.get('user_id'):
+        return f"user:{data['user_id']}"
+    if data.get('admin_username'):
+        return f"admin:{data['admin_username']}"
+    return None
+
+
+class MemorySessionBackend:
+    """Process-local LRU of serialized sessions"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            expires, owner, payload = entry
+            if expires < time.time():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return payload, expires
+
+    def set(self, sid, payload, expires, owner=None):
+        with self._lock:
+            self._data[sid] = (expires, owner, payload)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def revoke_owner(self, owner):
+        with self._lock:
+            for sid in [sid for sid, entry in self._data.items() if entry[1] == owner]:
+                del self._data[sid]
+
+
+class SQLiteSessionBackend:
+    """Sessions in a SQLite table so every worker process sees the same data"""
+
+    CLEANUP_EVERY = 500
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS server_session (
+                sid TEXT PRIMARY KEY,
+                owner TEXT,
+                data TEXT NOT NULL,
+                expires REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_server_session_owner ON server_session (owner)")
+        conn.commit()
+        # Opened by whichever thread built the app (gunicorn's master with
+        # preload_app): closed so no forked worker inherits it
+        conn.close()
+        self._local.conn = None
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, sid):
+        row = self._conn().execute(
+            "SELECT data, expires FROM server_session WHERE sid = ? AND expires >= ?",
+            (sid, time.time())
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, sid, payload, expires, owner=None):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO server_session (sid, owner, data, expires) VALUES (?, ?, ?, ?)",
+            (sid, owner, payload, expires)
+        )
+        self._writes += 1
+        if self._writes % self.CLEANUP_EVERY == 0:
+            conn.execute("DELETE FROM server_session WHERE expires < ?", (time.time(),))
+
+    def delete(self, sid):
+        self._conn().execute("DELETE FROM server_session WHERE sid = ?", (sid,))
+
+    def revoke_owner(self, owner):
+        self._conn().execute("DELETE FROM server_session WHERE owner = ?", (owner,))
+
+
+class ServerSideSessionInterface(SessionInterface):
+    session_class = ServerSideSession
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-session')
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                stored = self.backend.get(sid)
+                if stored is not None:
+                    payload, expires = stored
+                    sess = self.session_class(serializer.loads(payload), sid=sid)
+                    sess.expires_at = expires
+                    return sess
+        return self.session_class(sid=uuid4().hex, new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.replaced_sid:
+            self.backend.delete(session.replaced_sid)
+            session.replaced_sid = None
+
+        if not session:
+            # Emptied (logout): forget it server-side too
+            if session.modified and not session.new:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        now = time.time()
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        expires_at = getattr(session, 'expires_at', 0)
+        # Only write when something changed or the record is half way to expiry
+        if not session.modified and expires_at - now > lifetime / 2:
+            return
+
+        self.backend.set(session.sid, serializer.dumps(dict(session)), now + lifetime, session_owner(session))
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid.encode()).decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+
+def init_app(app):
+    """Install the backend named by SESSION_BACKEND (memory, sqlite or cookie)"""
+    backend_name = app.config.get('SESSION_BACKEND', 'sqlite')
+    if backend_name == 'memory':
+        backend = MemorySessionBackend(app.config.get('SESSION_MEMORY_MAX_ENTRIES', 10000))
+    elif backend_name == 'sqlite':
+        backend = SQLiteSessionBackend(app.config['SESSION_SQLITE_PATH'])
+    else:
+        return None  # keep Flask's signed-cookie sessions
+    app.session_interface = ServerSideSessionInterface(backend)
+    return app.session_interface
+
+
+def revoke_owner(app, owner):
+    """End every session belonging to e.g. "principal:5" (server-side backends only)"""
+    if isinstance(app.session_interface, ServerSideSessionInterface):
+        app.session_interface.backend.revoke_owner(owner)
+
+
+# ---------------------
+# Identity Cache
+# ---------------------
+IDENTITY_KEY = '_identity'
+DEFAULT_IDENTITY_TTL = 300
+
+
+def cached_identity(kind, loader, ttl=DEFAULT_IDENTITY_TTL, version=None):
+    """Return the cached identity dict for this session, calling loader() when stale.
+
+    loader returns a plain dict (safe to store in the session) or None when
+    the account no longer exists. version(data), when given, says which data
+    version the identity was built from: a cached identity is only used while
+    that version is unchanged, so writes from other sessions show up too.
+    """
+    cached = session.get(IDENTITY_KEY)
+    now = time.time()
+    if cached and cached.get('kind') == kind and cached.get('expires', 0) > now \
+            and (version is None or cached.get('version') == version(cached['data'])):
+        metrics.cache_result('identity', True)
+        return cached['data']
+    metrics.cache_result('identity', False)
+
+    data = loader()
+    if data is None:
+        session.pop(IDENTITY_KEY, None)
+        return None
+    session[IDENTITY_KEY] = {
+        'kind': kind, 'data': data, 'expires': now + ttl,
+        'version': version(data) if version else None
+    }
+    return data
+
+
+def invalidate_identity():
+    session.pop(IDENTITY_KEY, None)
+
+
+def regenerate():
+    """Move the current session to a new id; call whenever a login changes privileges"""
+    if not isinstance(session, ServerSideSession):
+        return  # signed-cookie sessions have no server-side id to fix
+    if not session.new:
+        session.replaced_sid = session.sid
+    session.sid = uuid4().hex
+    session.modified = True
@@ -0,0 +1,73 @@
+from itertools import chain
+
+from sqlalchemy import event, inspect, text
+
+from models import db, DataVersion, Feedback, Principal, School
+
+# ---------------------
+# Data Versions
+# ---------------------
+# A tiny counter table bumped in the same transaction as every ORM write.
+# Anything derived from the database (cached report PDFs, ...) can be keyed
+# on current_version() and reused until the data actually changes.
+# Each school also has its own version, bumped by writes to the school, its
+# principal or its feedback (see school_cache).
+
+GLOBAL = 'global'
+SCHOOLS_BUMPED = 'school_versions_bumped'  # session.info key: schools bumped since the last commit
+
+# Rows that make up a school's page, and the attribute naming their school
+_SCHOOL_KEYS = {School: 'id', Principal: 'school_id', Feedback: 'school_id'}
+
+_BUMP_SQL = text(
+    "INSERT INTO data_version (name, version) VALUES (:name, 1) "
+    "ON CONFLICT(name) DO UPDATE SET version = version + 1"
+)
+
+
+def _bump_after_flush(session, flush_context):
+    touched = [
+        obj for obj in chain(session.new, session.dirty, session.deleted)
+        if not isinstance(obj, DataVersion)
+    ]
+    if touched:
+        bump(session, GLOBAL)
+    for school_id in set(chain.from_iterable(_school_ids(obj) for obj in touched)):
+        bump_school(session, school_id)
+
+
+def _school_ids(obj):
+    """Schools a written row belongs to - before and after the write, if it moved"""
+    key = _SCHOOL_KEYS.get(type(obj))
+    if key is None:
+        return ()
+    # History doesn't load anything: deleted rows can't be refreshed
+    return {int(value) for value in inspect(obj).attrs[key].history.sum() if value is not None}
+
+
+def bump(session, name=GLOBAL):
+    session.execute(_BUMP_SQL, {'name': name})
+
+
+def school(school_id):
+    """Version name of one school"""
+    return f"school:{school_id}"
+
+
+def bump_school(session, school_id):
+    bump(session, school(school_id))
+    session.info.setdefault(SCHOOLS_BUMPED, set()).add(int(school_id))
+
+
+def current_version(name=GLOBAL):
+    version = db.session.execute(
+        text("SELECT version FROM data_version WHERE name = :name"), {'name': name}
+    ).scalar()
+    return version or 0
+
+
+def init_app(app):
+    with app.app_context():
+        DataVersion.__table__.create(bind=db.engine, checkfirst=True)
+    if not event.contains(db.session, 'after_flush', _bump_after_flush):
+        event.listen(db.session, 'after_flush', _bump_after_flush)